@@ -0,0 +1,219 @@
+# planet_assets.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the asset build for the Planets game.
+
+The image files are much bigger than they are drawn: a planet's picture is the
+same file whether its radius is 30 or 350, and the backgrounds are large JPEG
+files scaled to the window when drawn. Decoding a whole file to draw it small
+wastes time when a level starts and memory while it is played.
+
+The asset build goes through every level in the registry and makes, for every
+(image, size) pair the game draws, a copy of the image scaled to exactly that
+size. Scaling is done on premultiplied colors, so that transparent pixels do not
+bleed dark fringes into the edges of planets, and the result is saved with plain
+alpha, which is what game2d draws with. The copies are saved as PNG files in
+ASSET_DIR, named by a hash of the source file's contents and the size, and listed
+in the manifest ASSET_MANIFEST. Run it from the command line:
+
+    python planet_assets.py [--force]
+
+It only scales images whose contents have changed since the last build, unless
+--force is given.
+
+At run time, asset_source gives the file to draw for an image at a size: the
+scaled copy if the manifest has one made from the current file, or the original
+file otherwise, so the game works the same before the build is run."""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from planet_constants import *
+from planet_levels import get_registry
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def size_key(size):
+    """Returns the size (width, height) as whole numbers of pixels.
+    """
+    return (max(1, int(round(size[0]))), max(1, int(round(size[1]))))
+
+
+def entry_name(source, size):
+    """Returns the manifest name of the image file source drawn at size.
+    """
+    width, height = size_key(size)
+    return '%s|%d|%d' % (source, width, height)
+
+
+def file_hash(path):
+    """Returns the SHA-1 hash of the contents of the file path, as hex.
+    """
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(1 << 16), b''):
+            h.update(data)
+    return h.hexdigest()
+
+
+def used_images():
+    """Returns a sorted list of every (file, size) pair drawn by the game: the
+    title background and the images of every level in the registry.
+    """
+    from planet_textures import level_images
+    pairs = set([(TITLE_BACKGROUND, (GAME_WIDTH, GAME_HEIGHT))])
+    registry = get_registry()
+    for n in range(1, len(registry) + 1):
+        for source, size in level_images(registry.spec(n)):
+            pairs.add((source, size_key(size)))
+    return sorted(pairs)
+
+
+def scale_image(path, size, out):
+    """Saves the image file path scaled to size as a PNG file out.
+
+    The scaling is done on premultiplied colors (mode RGBa), then the colors are
+    divided by alpha again for saving.
+    """
+    picture = Image.open(path)
+    picture.draft('RGB', size)
+    picture = picture.convert('RGBA').convert('RGBa')
+    picture = picture.resize(size_key(size), Image.LANCZOS).convert('RGBA')
+    temp = out + '.tmp.png'
+    picture.save(temp, optimize=True)
+    os.replace(temp, out)
+
+
+def read_manifest(path=ASSET_MANIFEST):
+    """Returns the manifest dict in the file path, or an empty dict if it is
+    missing or cannot be read.
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+
+def build(pairs=None, force=False, log=None):
+    """Makes the scaled copy of every (file, size) tuple in pairs (used_images()
+    if None) that is not already in ASSET_DIR, writes the manifest and returns it.
+    If pairs is given, their entries are added to the manifest already written;
+    otherwise the manifest is made anew, with only the images used now.
+
+    Each manifest entry holds the copy's file name, the source file's hash, and
+    its modification time and length, which asset_source checks to know the copy
+    is current. If force is True, every copy is made again. log, if given, is
+    called with a line of text for each image.
+    """
+    if Image == None:
+        raise ImportError('the asset build needs Pillow')
+    if not os.path.isdir(ASSET_DIR):
+        os.makedirs(ASSET_DIR)
+    manifest = read_manifest(ASSET_MANIFEST) if pairs != None else {}
+    if pairs == None:
+        pairs = used_images()
+    hashes = {}
+    for source, size in pairs:
+        path = os.path.join(IMAGE_DIR, source)
+        if not os.path.exists(path):
+            if log != None:
+                log('missing %s' % source)
+            continue
+        if source not in hashes:
+            hashes[source] = file_hash(path)
+        width, height = size_key(size)
+        name = '%s-%dx%d.png' % (hashes[source], width, height)
+        out = os.path.join(ASSET_DIR, name)
+        made = False
+        if force or not os.path.exists(out):
+            scale_image(path, size, out)
+            made = True
+        stat = os.stat(path)
+        manifest[entry_name(source, size)] = {'file': name, 'hash': hashes[source],
+                                              'mtime': stat.st_mtime, 'length': stat.st_size}
+        if log != None:
+            log('%-6s %s at %dx%d' % ('scaled' if made else 'kept', source, width, height))
+    temp = ASSET_MANIFEST + '.tmp'
+    with open(temp, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(temp, ASSET_MANIFEST)
+    global _MANIFEST
+    _MANIFEST = None
+    _SOURCES.clear()
+    return manifest
+
+
+#: the manifest read by asset_source, or None until it is first needed
+_MANIFEST = None
+#: maps a manifest name to the file asset_source returned for it
+_SOURCES = {}
+
+
+def asset_source(source, size):
+    """Returns the image file to draw for the image file source at size: the path
+    of its scaled copy if the asset build made one from the current file, or
+    source itself otherwise. The answer for each image and size is worked out
+    once and then remembered.
+    """
+    name = entry_name(source, size)
+    if name not in _SOURCES:
+        _SOURCES[name] = _find_source(source, name)
+    return _SOURCES[name]
+
+
+def _find_source(source, name):
+    """Helper to asset_source.
+    Returns the file to draw for the image file source with manifest name name.
+    """
+    global _MANIFEST
+    if _MANIFEST == None:
+        _MANIFEST = read_manifest(ASSET_MANIFEST) if ASSETS else {}
+    entry = _MANIFEST.get(name)
+    if entry == None:
+        return source
+    try:
+        stat = os.stat(os.path.join(IMAGE_DIR, source))
+    except OSError:
+        return source
+    if stat.st_mtime != entry['mtime'] or stat.st_size != entry['length']:
+        return source
+    path = os.path.join(ASSET_DIR, entry['file'])
+    if not os.path.exists(path):
+        return source
+    return path
+
+
+def asset_images(keys):
+    """Returns the list of (file, size) tuples keys with each file replaced by the
+    file asset_source draws it from, for the texture cache.
+    """
+    return [(asset_source(source, size), size) for source, size in keys]
+
+
+def main(argv=None):
+    """Runs the asset build with the command line arguments argv (sys.argv if
+    None) and returns the exit status.
+    """
+    parser = argparse.ArgumentParser(description='Scale the game images to the sizes they are drawn at.')
+    parser.add_argument('--force', action='store_true', help='scale every image again')
+    args = parser.parse_args(argv)
+    if Image == None:
+        print('the asset build needs Pillow (pip install Pillow)')
+        return 1
+    start = time.perf_counter()
+    manifest = build(force=args.force, log=print)
+    print('%d images in %s, %.2f s' % (len(manifest), ASSET_DIR, time.perf_counter() - start))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,334 @@
+# planet_batch.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains a headless batch engine for the Planets game.
+
+The function rollout flies many ships through one level at the same time. Every
+ship has its own row of thrust codes (see planet_kernel), and all ships are
+advanced together in NumPy arrays using the same rules as planet_physics.step:
+move, gravity, thrust, the velocity flip at the screen edge, the wormhole latch,
+then finish and collision. A ship stops as soon as it finishes or crashes.
+
+Nothing in this module draws or reads the keyboard, so it can be used to test
+thrust programs or tune levels much faster than playing them."""
+
+import numpy as np
+from planet_constants import *
+from planet_kernel import *
+from planet_physics import *
+
+
+class BatchResult(object):
+    """The outcome of a batch rollout of N ships.
+
+    ATTRIBUTES:
+        outcome     [int array] RUNNING, FINISHED or CRASHED for each ship
+        steps       [int array] the number of steps each ship flew; for a ship that
+            finished or crashed this includes the final step
+        x           [float array] final x position of each ship
+        y           [float array] final y position of each ship
+        xv          [float array] final x velocity of each ship
+        yv          [float array] final y velocity of each ship
+        angle       [int array] final orientation of each ship
+        teleporting [bool array] final teleport latch of each ship
+    """
+
+    def __init__(self, n):
+        """Initializer: Creates an empty result for n ships.
+        """
+        self.outcome = np.zeros(n, dtype=np.int8)
+        self.steps = np.zeros(n, dtype=np.int32)
+        self.x = np.zeros(n)
+        self.y = np.zeros(n)
+        self.xv = np.zeros(n)
+        self.yv = np.zeros(n)
+        self.angle = np.zeros(n, dtype=int)
+        self.teleporting = np.zeros(n, dtype=bool)
+
+
+def rollout(play, codes, block=None, substeps=SUBSTEPS, method=INTEGRATOR, swept=SWEPT, start=None):
+    """Returns a BatchResult for flying one ship per row of codes through play.
+
+    PARAMETERS:
+        play    [Play or Level object] the level to fly through; it is only read,
+            never changed
+        codes   [(N, T) array of ints in 0..15] the thrust code of ship i at step t
+        block   [int>0 or None] the number of ships advanced together; larger
+            blocks are faster but need more memory (block times the number of
+            planets); None picks the most that keep about BATCH_CELLS numbers in
+            each working array
+        substeps [int>0] the number of substeps per tick, as in planet_physics.step
+        method  [EULER or VERLET] the integrator, as in planet_physics.step
+        swept   [bool] True to test collisions along each step's path, as in
+            planet_physics.step
+        start   [BatchResult or None] the state ship i starts in, from row i of
+            start, or None to start every ship at rest at the start point
+    """
+    level = play if isinstance(play, Level) else play.get_level()
+    codes = np.asarray(codes, dtype=np.uint8)
+    if codes.ndim == 1:
+        codes = codes.reshape(1, -1)
+    n = codes.shape[0]
+    if block == None:
+        block = max(BATCH_MIN, BATCH_CELLS // max(1, len(level.table.px), len(level.table.wx)))
+    result = BatchResult(n)
+    for lo in range(0, n, block):
+        hi = min(n, lo + block)
+        _rollout_block(level, codes[lo:hi], result, lo, substeps, method, swept, start)
+    return result
+
+
+#: levels with fewer planets than this lay out gravity one row per planet (see
+#: _gravity)
+_SEQUENTIAL = 8
+
+
+def _gravity(level, x, y):
+    """Helper to _rollout_block.
+    Returns a tuple (ax, ay, hit, d2) of arrays: the gravity on a ship at each
+    point (x[i],y[i]), whether that point is inside a planet, and the squared
+    distance from each planet to it (one row per planet, one column per point),
+    or None for d2.
+
+    With fewer than _SEQUENTIAL planets the arrays are laid out one row per
+    planet, so the sums run down the short axis with whole rows at a time; NumPy
+    adds so few numbers one after another, as it does for a single ship, so the
+    result is the same to the last bit. Otherwise they are laid out one row per
+    ship, like the single ship's array.
+
+    If the level has a gravity lattice or a Barnes-Hut tree, gravity comes from
+    it and the hit test is done a slice of planets at a time, so memory stays
+    bounded for levels with thousands of planets; d2 is then None.
+    """
+    table = level.table
+    if level.lattice != None or level.tree != None:
+        if level.lattice != None:
+            ax, ay = level.lattice.interpolate(x, y)
+        else:
+            ax, ay = level.tree.accel(x, y)
+        hit = np.zeros(len(x), dtype=bool)
+        for lo in range(0, len(table.px), 1024):
+            dx = x[:, None] - table.px[lo:lo+1024]
+            dy = y[:, None] - table.py[lo:lo+1024]
+            hit |= (dx*dx + dy*dy < table.r2[lo:lo+1024]).any(axis=1)
+        return (ax, ay, hit, None)
+    if len(table.px) == 0:
+        zero = np.zeros(len(x))
+        return (zero, zero, np.zeros(len(x), dtype=bool), None)
+    if len(table.px) < _SEQUENTIAL:
+        dx = x - table.px[:, None]
+        dy = y - table.py[:, None]
+        d2 = dx*dx + dy*dy
+        k = table.gm[:, None] / (d2*np.sqrt(d2))
+        return (-(k*dx).sum(axis=0), -(k*dy).sum(axis=0), (d2 < table.r2[:, None]).any(axis=0), d2)
+    dx = x[:, None] - table.px
+    dy = y[:, None] - table.py
+    d2 = dx*dx + dy*dy
+    k = table.gm / (d2*np.sqrt(d2))
+    return (-(k*dx).sum(axis=1), -(k*dy).sum(axis=1), (d2 < table.r2).any(axis=1), d2.T)
+
+
+def _near(d2, r, reach):
+    """Helper to _rollout_block.
+    Returns the indices of the paths that may touch a circle, where d2 holds the
+    squared distance from each circle (one row each) to the end of each path
+    (one column each), r the circles' radii and reach the length of each path. A path that ends
+    farther than its length from every circle cannot touch any of them, so the
+    sweeps skip it; reach should include a pixel more, for rounding.
+    """
+    bound = r[:, None] + reach
+    return np.flatnonzero((d2 < bound*bound).any(axis=0))
+
+
+def _sweep_planets(table, x0, y0, x1, y1, d2=None, r=None, reach=None):
+    """Helper to _rollout_block.
+    Returns the earliest time in [0,1] at which each path from (x0[i],y0[i]) to
+    (x1[i],y1[i]) is inside a planet, or inf.
+
+    d2, r and reach are as in _near; if d2 is not None, only the paths near a
+    planet are swept.
+    """
+    t = np.full(len(x0), np.inf)
+    if len(table.px) == 0:
+        return t
+    rows = slice(None) if d2 is None else _near(d2, r, reach)
+    cut = sweep_circles(x0[rows], y0[rows], x1[rows], y1[rows],
+                        table.px[:, None], table.py[:, None], table.r2[:, None])
+    t[rows] = cut.min(axis=0)
+    return t
+
+
+def _sweep_finish(level, x0, y0, x1, y1, reach):
+    """Helper to _rollout_block.
+    Returns the earliest time in [0,1] at which each path from (x0[i],y0[i]) to
+    (x1[i],y1[i]) is inside the finish, or inf. Only the paths whose ends are
+    within their length of the finish are swept.
+    """
+    t = np.full(len(x0), np.inf)
+    rows = np.flatnonzero((np.abs(x1 - level.finishx) < level.finishw + reach) &
+                          (np.abs(y1 - level.finishy) < level.finishh + reach))
+    if len(rows) > 0:
+        t[rows] = sweep_box(x0[rows], y0[rows], x1[rows], y1[rows], level.finishx, level.finishy,
+                            level.finishw, level.finishh)
+    return t
+
+
+def _rollout_block(level, codes, result, offset, substeps, method, swept, start=None):
+    """Helper to the function rollout.
+    Flies the ships of one block and writes their final state into result,
+    starting at row offset. Ships that stop are removed from the working arrays
+    so that later steps only touch ships that are still flying.
+
+    Every addition to the velocity is done in the same order as in
+    planet_physics.advance, so each ship follows exactly the path that
+    planet_physics.step would give it. Swept tests only sweep the ships whose
+    paths end near a planet, wormhole or the finish (see _near).
+    """
+    t = level.table
+    n, steps = codes.shape
+    h = 1.0/substeps
+    verlet = method == VERLET
+    radius = np.sqrt(t.r2)
+    worm_radius = np.sqrt(t.wr2)
+    idx = np.arange(n)
+    if start == None:
+        x = np.full(n, level.startx)
+        y = np.full(n, level.starty)
+        xv = np.zeros(n)
+        yv = np.zeros(n)
+        angle = np.zeros(n, dtype=int)
+        tele = np.zeros(n, dtype=bool)
+    else:
+        rows = slice(offset, offset + n)
+        x = start.x[rows].astype(float)
+        y = start.y[rows].astype(float)
+        xv = start.xv[rows].astype(float)
+        yv = start.yv[rows].astype(float)
+        angle = start.angle[rows].astype(int)
+        tele = start.teleporting[rows].astype(bool)
+    gx, gy, hit, d2 = _gravity(level, x, y)
+    worms = len(t.wx) > 0
+    for tick in range(steps):
+        if len(idx) == 0:
+            break
+        code = codes[idx, tick]
+        tax = THRUST_AX[code]
+        tay = THRUST_AY[code]
+        turn = THRUST_ANGLE[code]
+        angle = np.where(turn >= 0, turn, angle)
+        for sub in range(substeps):
+            # advance: move, gravity, thrust, bounce
+            if swept:
+                px = x.copy()
+                py = y.copy()
+            if verlet:
+                xv += 0.5*h*gx
+                yv += 0.5*h*gy
+                xv += 0.5*h*tax
+                yv += 0.5*h*tay
+                x += h*xv
+                y += h*yv
+                gx, gy, hit, d2 = _gravity(level, x, y)
+                xv += 0.5*h*gx
+                yv += 0.5*h*gy
+                xv += 0.5*h*tax
+                yv += 0.5*h*tay
+            else:
+                x += h*xv
+                y += h*yv
+                gx, gy, hit, d2 = _gravity(level, x, y)
+                xv += h*gx
+                yv += h*gy
+                xv += h*tax
+                yv += h*tay
+            np.negative(xv, out=xv, where=(x < 0) | (x > GAME_WIDTH))
+            np.negative(yv, out=yv, where=(y < 0) | (y > GAME_HEIGHT))
+            if swept:
+                reach = np.hypot(x - px, y - py) + 1.0
+                tp = _sweep_planets(t, px, py, x, y, d2, radius, reach)
+                tf = _sweep_finish(level, px, py, x, y, reach)
+            # teleport
+            if worms:
+                dx = x - t.wx[:, None]
+                dy = y - t.wy[:, None]
+                w2 = dx*dx + dy*dy
+                inside = w2 < t.wr2[:, None]
+                touching = inside.any(axis=0)
+                if swept:
+                    near = _near(w2, worm_radius, reach)
+                    near = near[~tele[near]]
+                    tw = sweep_circles(px[near], py[near], x[near], y[near],
+                                       t.wx[:, None], t.wy[:, None], t.wr2[:, None])
+                    first = tw.argmin(axis=0)
+                    tw = tw[first, np.arange(len(first))]
+                    enter = (tw != np.inf) & (tw <= tp[near]) & (tw <= tf[near])
+                    jump = np.zeros(len(x), dtype=bool)
+                    jump[near[enter]] = True
+                    first = first[enter]
+                else:
+                    jump = touching & ~tele
+                    first = inside[:, jump].argmax(axis=0)
+                if jump.any():
+                    sister = t.sister[first]
+                    x[jump] = t.wx[sister]
+                    y[jump] = t.wy[sister]
+                    hit[jump] = level.warp_hit[first]
+                    if verlet:
+                        jx, jy, jhit, jd2 = _gravity(level, x[jump], y[jump])
+                        gx[jump] = jx
+                        gy[jump] = jy
+                    if swept:
+                        # the rest of the path starts at the sister wormhole, as in step
+                        px[jump] = x[jump]
+                        py[jump] = y[jump]
+                        tp[jump] = np.where(level.warp_hit[first], 0.0, np.inf)
+                        tf[jump] = sweep_box(x[jump], y[jump], x[jump], y[jump], level.finishx, level.finishy, level.finishw, level.finishh)
+                tele = jump | (tele & touching)
+            # finished, then collided
+            if swept:
+                done = (tf <= 1.0) & (tf <= tp)
+                impact = ~done & (tp <= 1.0)
+                if impact.any():
+                    x[impact] = px[impact] + tp[impact]*(x[impact] - px[impact])
+                    y[impact] = py[impact] + tp[impact]*(y[impact] - py[impact])
+                crash = ~done & (impact | hit | off_screen(x, y))
+            else:
+                done = (np.abs(x - level.finishx) < level.finishw) & (np.abs(y - level.finishy) < level.finishh)
+                crash = ~done & (hit | off_screen(x, y))
+            stop = done | crash
+            if stop.any():
+                rows = idx[stop] + offset
+                result.outcome[rows] = np.where(done[stop], FINISHED, CRASHED)
+                result.steps[rows] = tick + 1
+                _store(result, rows, x[stop], y[stop], xv[stop], yv[stop], angle[stop], tele[stop])
+                keep = ~stop
+                idx = idx[keep]
+                x = x[keep]
+                y = y[keep]
+                xv = xv[keep]
+                yv = yv[keep]
+                gx = gx[keep]
+                gy = gy[keep]
+                angle = angle[keep]
+                tele = tele[keep]
+                tax = tax[keep]
+                tay = tay[keep]
+                if len(idx) == 0:
+                    break
+    rows = idx + offset
+    result.outcome[rows] = RUNNING
+    result.steps[rows] = steps
+    _store(result, rows, x, y, xv, yv, angle, tele)
+
+
+def _store(result, rows, x, y, xv, yv, angle, tele):
+    """Helper to _rollout_block.
+    Copies the final state of some ships into the given rows of result.
+    """
+    result.x[rows] = x
+    result.y[rows] = y
+    result.xv[rows] = xv
+    result.yv[rows] = yv
+    result.angle[rows] = angle
+    result.teleporting[rows] = tele
@@ -0,0 +1,364 @@
+# planet_bench.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the benchmark suite for the Planets game.
+
+Every benchmark times one hot path on one scene. The scenes are every level in
+the registry plus synthetic levels with 10, 100, 1,000 and 10,000 planets, made
+from a fixed seed so that they are the same on every run. The paths are:
+
+    gravity, collided, teleport, finished, advance, step
+                the planet_physics functions, which need no display
+    Play._gravity, Play.planet_collide, Play.teleport, Play.finish,
+    Play.update_ship
+                the same work through a Play object and its models
+    frame       one frame of the ACTIVE state: the clock, one Play.tick, and
+                drawing the background and the Play
+
+The Play paths and the frame need game2d; without it they are left out. Each path
+runs on a fixed list of ship positions outside the planets, so that the cached
+kernel results of planet_physics are not reused from one call to the next.
+
+Run it from the command line:
+
+    python planet_bench.py run [--quick] [--output FILE] [--save]
+    python planet_bench.py compare NEW [--baseline FILE] [--threshold 0.2]
+
+run prints a table and writes the results as JSON (to BENCH_DIR/latest.json by
+default); --save also makes them the baseline. compare exits with status 1 if any
+path in NEW is slower than its baseline by more than the threshold (0.2 is 20%),
+or if either file cannot be read. The baseline in BENCH_DIR holds the physics
+paths only, measured on the machine named in its meta; make a new one with --save
+before comparing on another machine."""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+from planet_constants import *
+from planet_physics import *
+from planet_levels import *
+
+#: the planet counts of the synthetic scenes
+SYNTHETIC = [10, 100, 1000, 10000]
+#: the physics paths, as functions of (level, body, code)
+PHYSICS_PATHS = [
+    ('gravity', lambda level, body, code: gravity(level, body)),
+    ('collided', lambda level, body, code: collided(level, body, SWEPT)),
+    ('teleport', lambda level, body, code: teleport(level, body, SWEPT)),
+    ('finished', lambda level, body, code: finished(level, body, SWEPT)),
+    ('advance', lambda level, body, code: advance(level, body, code)),
+    ('step', lambda level, body, code: step(level, body, code)),
+]
+
+
+def synthetic_spec(count, seed=0):
+    """Returns a LevelSpec with count planets scattered over the game window, and
+    two wormhole pairs. The planets get smaller as there are more of them, so that
+    there is room to fly between them.
+    """
+    rng = np.random.RandomState(seed)
+    size = max(2.0, min(60.0, 0.5*(GAME_WIDTH*GAME_HEIGHT/count)**0.5 / 3.0))
+    planets = []
+    start = (50.0, 50.0)
+    finish = (GAME_WIDTH - 50.0, GAME_HEIGHT - 50.0)
+    while len(planets) < count:
+        x = float(rng.uniform(0, GAME_WIDTH))
+        y = float(rng.uniform(0, GAME_HEIGHT))
+        r = float(rng.uniform(0.5*size, size))
+        if min((x - start[0])**2 + (y - start[1])**2, (x - finish[0])**2 + (y - finish[1])**2) < (r + 80)**2:
+            continue
+        planets.append((x, y, float(rng.uniform(0.0, 1.0))/count**0.5, r, 'mars.png'))
+    wormholes = [((0.25*GAME_WIDTH, 0.5*GAME_HEIGHT), (0.75*GAME_WIDTH, 0.5*GAME_HEIGHT)),
+                 ((0.5*GAME_WIDTH, 0.2*GAME_HEIGHT), (0.5*GAME_WIDTH, 0.8*GAME_HEIGHT))]
+    return LevelSpec('P%d' % count, '', 'space1.jpg', start, finish, planets, wormholes)
+
+
+def scenes(quick=False):
+    """Returns a list of the (name, LevelSpec) tuples to benchmark: every level in
+    the registry, then the synthetic scenes. If quick is True, the largest
+    synthetic scene is left out.
+    """
+    registry = get_registry()
+    result = []
+    for n in range(1, len(registry) + 1):
+        result.append((registry.name(n), registry.spec(n)))
+    for count in SYNTHETIC:
+        if quick and count > 1000:
+            continue
+        result.append(('P%d' % count, synthetic_spec(count)))
+    return result
+
+
+def sample_points(level, count=256, seed=1):
+    """Returns a list of count (x, y, xv, yv) tuples: ship positions inside the
+    game window that are not inside a planet, with small random velocities.
+    """
+    rng = np.random.RandomState(seed)
+    t = level.table
+    points = []
+    while len(points) < count:
+        x = float(rng.uniform(0, GAME_WIDTH))
+        y = float(rng.uniform(0, GAME_HEIGHT))
+        if len(t.px) > 0 and bool(((x - t.px)**2 + (y - t.py)**2 < t.r2).any()):
+            continue
+        points.append((x, y, float(rng.normal(0, 2)), float(rng.normal(0, 2))))
+    return points
+
+
+def time_calls(call, points, quick=False):
+    """Returns a tuple (median, best) of the time in microseconds of one call of
+    call(point), measured over the list points.
+
+    The number of calls per measurement is chosen so that a measurement takes at
+    least 20 ms (5 ms if quick), and the measurement is repeated 7 times (3 if
+    quick). The garbage collector is off while timing.
+    """
+    target = 0.005 if quick else 0.02
+    repeat = 3 if quick else 7
+    number = 1
+    while True:
+        spent = _measure(call, points, number)
+        if spent >= target or number >= 1 << 20:
+            break
+        number *= 2 if spent == 0 else max(2, min(10, int(target / spent) + 1))
+    times = sorted(_measure(call, points, number) / number * 1e6 for i in range(repeat))
+    return (times[len(times)//2], times[0])
+
+
+def _measure(call, points, number):
+    """Helper to time_calls.
+    Returns the seconds taken by number calls of call, cycling through points.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        size = len(points)
+        start = time.perf_counter()
+        for i in range(number):
+            call(points[i % size])
+        return time.perf_counter() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def physics_benchmarks(name, spec, quick=False):
+    """Returns a dict mapping 'name/path' to its timing dict for every path in
+    PHYSICS_PATHS on the scene spec.
+    """
+    level = spec.to_level()
+    points = sample_points(level)
+    body = level.new_body()
+    results = {}
+    for path, work in PHYSICS_PATHS:
+        def call(p, work=work):
+            body.x, body.y, body.xv, body.yv = p
+            body.px = body.x - body.xv
+            body.py = body.y - body.yv
+            body.teleporting = False
+            work(level, body, KEY_UP)
+        median, best = time_calls(call, points, quick)
+        results['%s/%s' % (name, path)] = {'us': median, 'best': best}
+    return results
+
+
+def play_benchmarks(name, spec, quick=False):
+    """Returns a dict mapping 'name/path' to its timing dict for the Play paths
+    and the frame on the scene spec, or an empty dict if game2d is missing.
+    """
+    try:
+        from planet_play import make_play
+        from game2d import GImage
+    except ImportError:
+        return {}
+    play = make_play(spec)
+    ship = play.get_ship()
+    body = ship.get_body()
+    points = sample_points(play.get_level())
+    keys = _Keys(KEY_UP)
+    view = _NullView()
+    background = GImage(x=0.5*GAME_WIDTH, y=0.5*GAME_HEIGHT, width=GAME_WIDTH,
+                        height=GAME_HEIGHT, source=spec.background)
+    clock = Clock()
+
+    def frame():
+        for i in range(clock.ticks(TICK)):
+            play.tick(keys)
+        background.draw(view)
+        play.draw(view)
+
+    paths = [('Play._gravity', play._gravity), ('Play.planet_collide', play.planet_collide),
+             ('Play.teleport', play.teleport), ('Play.finish', play.finish),
+             ('Play.update_ship', lambda: play.update_ship(keys)), ('frame', frame)]
+    results = {}
+    for path, work in paths:
+        def call(p, work=work):
+            body.xv = p[2]
+            body.yv = p[3]
+            ship.set_position(p[0], p[1])
+            body.px = body.x - body.xv
+            body.py = body.y - body.yv
+            body.teleporting = False
+            work()
+        median, best = time_calls(call, points, quick)
+        results['%s/%s' % (name, path)] = {'us': median, 'best': best}
+    return results
+
+
+class _Keys(object):
+    """A stand-in for GInput that always holds the arrow keys of one thrust code,
+    so that the Play paths and the frame can run without a keyboard.
+    """
+
+    def __init__(self, code):
+        self._down = set()
+        for key, bit in (('up', KEY_UP), ('down', KEY_DOWN), ('left', KEY_LEFT), ('right', KEY_RIGHT)):
+            if code & bit:
+                self._down.add(key)
+        self.key_count = len(self._down)
+
+    def is_key_down(self, key):
+        return key in self._down
+
+
+class _NullView(object):
+    """A stand-in for GView that draws nothing, so that the frame measures the
+    game's own drawing work and not the graphics card.
+    """
+
+    def draw(self, cmd):
+        pass
+
+
+def run_suite(quick=False, play=True, out=sys.stdout):
+    """Runs every benchmark and returns the results as a dict with the keys
+    'meta' (the machine and versions) and 'results' (one timing dict per
+    'scene/path'). A line is written to out for each scene.
+    """
+    results = {}
+    for name, spec in scenes(quick):
+        start = time.perf_counter()
+        results.update(physics_benchmarks(name, spec, quick))
+        if play:
+            results.update(play_benchmarks(name, spec, quick))
+        if out != None:
+            out.write('%-8s %6.2f s\n' % (name, time.perf_counter() - start))
+            out.flush()
+    meta = {'python': platform.python_version(), 'numpy': np.__version__,
+            'machine': platform.machine(), 'system': platform.system(),
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'quick': quick}
+    return {'meta': meta, 'results': results}
+
+
+def table(data):
+    """Returns the results in data as text, one row per scene and one column per
+    path, in microseconds.
+    """
+    rows = {}
+    paths = []
+    for key, value in data['results'].items():
+        scene, path = key.split('/', 1)
+        rows.setdefault(scene, {})[path] = value['us']
+        if path not in paths:
+            paths.append(path)
+    widths = [max(9, len(p) + 2) for p in paths]
+    lines = ['%-8s' % 'us' + ''.join(p.rjust(w) for p, w in zip(paths, widths))]
+    for scene in rows:
+        cells = [('%.2f' % rows[scene][p] if p in rows[scene] else '-').rjust(w) for p, w in zip(paths, widths)]
+        lines.append('%-8s' % scene + ''.join(cells))
+    return '\n'.join(lines)
+
+
+def compare(new, base, threshold=BENCH_THRESHOLD):
+    """Returns a tuple (lines, failed): a line of text for every path in both
+    new and base with the ratio of their times, and the number of paths that are
+    slower by more than threshold.
+    """
+    lines = []
+    failed = 0
+    for key in sorted(new['results']):
+        if key not in base['results']:
+            continue
+        now = new['results'][key]['us']
+        then = base['results'][key]['us']
+        ratio = now / then if then > 0 else 1.0
+        mark = ''
+        if ratio > 1 + threshold:
+            mark = '  REGRESSION'
+            failed += 1
+        elif ratio < 1 - threshold:
+            mark = '  faster'
+        lines.append('%-30s %10.2f %10.2f %7.2fx%s' % (key, then, now, ratio, mark))
+    return (lines, failed)
+
+
+def _load(path):
+    """Returns the JSON results in the file path.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save(data, path):
+    """Writes the results data as JSON to the file path.
+    """
+    folder = os.path.dirname(path)
+    if folder != '' and not os.path.isdir(folder):
+        os.makedirs(folder)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+
+
+def main(argv=None):
+    """Runs the suite with the command line arguments argv (sys.argv if None) and
+    returns the exit status.
+    """
+    parser = argparse.ArgumentParser(description='Planets benchmarks.')
+    commands = parser.add_subparsers(dest='command')
+    run = commands.add_parser('run', help='run the benchmarks')
+    run.add_argument('--quick', action='store_true', help='fewer repeats, no 10k scene')
+    run.add_argument('--output', default=os.path.join(BENCH_DIR, 'latest.json'))
+    run.add_argument('--save', action='store_true', help='also save the results as the baseline')
+    run.add_argument('--physics-only', action='store_true', help='leave out the Play paths')
+    check = commands.add_parser('compare', help='compare results with the baseline')
+    check.add_argument('new', nargs='?', default=os.path.join(BENCH_DIR, 'latest.json'))
+    check.add_argument('--baseline', default=BENCH_BASELINE)
+    check.add_argument('--threshold', type=float, default=BENCH_THRESHOLD)
+    args = parser.parse_args(argv)
+    if args.command == 'compare':
+        try:
+            new = _load(args.new)
+        except (IOError, ValueError) as e:
+            print('cannot read the results %s: %s' % (args.new, e))
+            print('make them with: python planet_bench.py run')
+            return 1
+        try:
+            base = _load(args.baseline)
+        except (IOError, ValueError) as e:
+            print('cannot read the baseline %s: %s' % (args.baseline, e))
+            print('make one with: python planet_bench.py run --save')
+            return 1
+        lines, failed = compare(new, base, args.threshold)
+        print('%-30s %10s %10s %8s' % ('path', 'base us', 'new us', 'ratio'))
+        print('\n'.join(lines))
+        print('%d of %d paths regressed by more than %d%%' % (failed, len(lines), round(100*args.threshold)))
+        return 1 if failed > 0 else 0
+    if args.command != 'run':
+        parser.print_help()
+        return 2
+    data = run_suite(args.quick, not args.physics_only)
+    print(table(data))
+    _save(data, args.output)
+    if args.save:
+        _save(data, BENCH_BASELINE)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,7 +2,14 @@
 # Zachary Mayle
 # 5/29/16
 
-from game2d import *
+"""This module contains the constants for the Planets game. It does not import
+game2d, so the physics modules can use it without the rendering stack. The
+on-screen messages are in planet_messages.py."""
+
+import os
+
+#: folder this file is in; the asset and cache folders are inside it
+HOME = os.path.dirname(os.path.abspath(__file__))
 
 ##### Game Specs
 #: width of the game display
@@ -24,6 +31,8 @@ SHIP_ACCEL_1 = 0.1
 SHIP_ACCEL_2 = 0.1*(2.0**0.5) / 2.0
 #: image for the ship
 SHIP_IMAGE = "spaceship.png"
+#: image for the ship while it thrusts; if the file is missing, SHIP_IMAGE is used
+SHIP_THRUST_IMAGE = "spaceship-thrust.png"
 
 
 ##### Wormhole Specs
@@ -54,6 +63,113 @@ FINISH_PIC = "earth.png"
 ##### Physics Specs
 #: Gravitational Constant
 G = 0.7*5000.0   #5000.0
+#: length of one physics tick in seconds; speeds are in pixels per tick
+TICK = 1.0/60.0
+#: the most ticks simulated in one frame, so a long stall does not make the game
+#: spend several frames catching up
+MAX_TICKS = 8
+#: True if the ship is drawn between its last two ticks, for smooth motion
+INTERPOLATE = True
+#: True if the ticks of a level run on their own thread instead of in update
+SIM_THREAD = False
+#: name of the original integrator: move, then add gravity and thrust
+EULER = 'euler'
+#: name of the velocity Verlet (leapfrog) integrator
+VERLET = 'verlet'
+#: integrator used by the game
+INTEGRATOR = EULER
+#: number of substeps per physics tick
+SUBSTEPS = 1
+#: True if planets, wormholes and the finish are tested along the whole path of
+#: each step, instead of only at the end of it; off by default, since it changes
+#: how some runs on the shipped levels end
+SWEPT = False
+
+
+##### Barnes-Hut Specs
+#: True if levels with many massive planets use Barnes-Hut quadtree gravity
+BARNES_HUT = False
+#: opening angle for Barnes-Hut gravity; smaller is more accurate and slower
+BH_THETA = 0.5
+#: levels with fewer massive planets than this always use the exact sum
+BH_MIN = 512
+#: the most planets in one leaf of the quadtree
+BH_LEAF = 8
+#: the deepest a quadtree may grow
+BH_DEPTH = 24
+
+
+##### Gravity Lattice Specs
+#: True if levels use a precomputed gravity lattice instead of summing planets
+LATTICE = False
+#: distance between neighboring lattice samples
+LATTICE_STEP = 5.0
+#: how far the lattice reaches past each edge of the game window
+LATTICE_MARGIN = 0.1*GAME_HEIGHT
+#: number of random points used to measure a lattice's interpolation error
+LATTICE_SAMPLES = 2000
+#: folder where lattices are cached
+LATTICE_DIR = os.path.join(HOME, 'Cache', 'Lattices')
+
+
+##### Spatial Index Specs
+#: levels with at least this many planets and wormholes use a spatial grid
+GRID_MIN = 32
+#: width and height of a grid cell
+GRID_CELL = 100.0
+#: the most grid queries remembered before the query cache is cleared
+GRID_CACHE = 4096
+#: levels with at most this many planets and wormholes sweep a single ship in
+#: plain Python, which is faster than NumPy for so few bodies
+SCALAR_MAX = 16
+
+
+##### Batch Specs
+#: the most numbers (ships times planets) in each working array of a batch
+#: rollout; larger is faster until the arrays outgrow the CPU caches
+BATCH_CELLS = 2**17
+#: the fewest ships a batch rollout advances together
+BATCH_MIN = 256
+
+
+##### Input Specs
+#: bit set in a thrust code while the up arrow key is held
+KEY_UP = 1
+#: bit set in a thrust code while the down arrow key is held
+KEY_DOWN = 2
+#: bit set in a thrust code while the left arrow key is held
+KEY_LEFT = 4
+#: bit set in a thrust code while the right arrow key is held
+KEY_RIGHT = 8
+
+
+##### Outcome Specs
+#: the ship is still flying
+RUNNING = 0
+#: the ship reached the finish point
+FINISHED = 1
+#: the ship hit a planet or left the screen
+CRASHED = 2
+
+
+##### Preview Specs
+#: True if the game starts with the trajectory preview on
+PREVIEW = False
+#: the key that turns the trajectory preview on and off
+PREVIEW_KEY = 'v'
+#: the number of ticks ahead the trajectory preview shows
+PREVIEW_STEPS = 300
+#: the diameter of the mark where the previewed path crashes or finishes
+PREVIEW_MARK = 14
+
+
+##### Rewind Specs
+#: seconds of ticks kept for rewinding
+REWIND_SECONDS = 10.0
+#: the key held to rewind
+REWIND_KEY = 'z'
+#: the number of ticks gone back for each tick the rewind key is held
+REWIND_SPEED = 2
 
 
 ##### State Specs
@@ -64,56 +180,157 @@ ACTIVE = 3
 FAIL = 4
 CONTINUE = 5
 COMPLETE = 6
-
-##### Messages
-#: list of title screen messages
-clear = colormodel.RGB(0,0,0,0)
-gray = colormodel.RGB(0,0,0, a= 100)
-TITLE_1 = GLabel(text="PLANETS",font_size=120,font_name="good times rg.ttf",\
-                 x=.5*GAME_WIDTH,y=.65*GAME_HEIGHT,linecolor=colormodel.BLUE,fillcolor=clear)
-TITLE_2 = GLabel(text="USE DIRECTIONAL PAD TO NAVIGATE YOUR SHIP TO THE FINISH",\
-                 font_size=24,font_name="good times rg.ttf",\
-                 x=.5*GAME_WIDTH,y=.4*GAME_HEIGHT,linecolor=colormodel.WHITE,fillcolor=gray)
-TITLE_3 = GLabel(text="Tap a key to pick a level:",\
-                 font_size=24,font_name="good times rg.ttf",\
-                 x=.5*GAME_WIDTH,y=.2*GAME_HEIGHT,linecolor=colormodel.WHITE,fillcolor=gray)
-TITLE_4 = GLabel(text="1   2   3   4   5   6   7   8   9\nA   B   C   D\nX   Y",\
-                 font_size=24,font_name="good times rg.ttf",\
-                 x=.5*GAME_WIDTH,y=.1*GAME_HEIGHT,linecolor=colormodel.WHITE,fillcolor=gray)
-#: ready state message
-READY_1 = GLabel(text="TO INFINITY AND BEYOND!",font_size=48,font_name="good times rg.ttf",\
-                 x=.5*GAME_WIDTH,y=.5*GAME_HEIGHT,linecolor=colormodel.WHITE,fillcolor=gray)
-#: fail state message
-FAIL_1 = GLabel(text="EPIC FAIL",font_size=48,font_name="good times rg.ttf",\
-                x=.5*GAME_WIDTH,y=.6*GAME_HEIGHT,linecolor=colormodel.WHITE,fillcolor=gray)
-FAIL_2 = GLabel(text="PRESS SPACE TO TRY AGAIN\nPRESS M TO RETURN TO MENU",\
-                font_size=36,font_name="good times rg.ttf",\
-                x=.5*GAME_WIDTH,y=.3*GAME_HEIGHT,linecolor=colormodel.WHITE,fillcolor=gray)
-#: complete state messages
-COMPLETE_1 = GLabel(text="YOU WIN!",font_size=72,font_name="good times rg.ttf",\
-                x=.5*GAME_WIDTH,y=.6*GAME_HEIGHT,linecolor=colormodel.BLUE,fillcolor=gray)
-COMPLETE_2 = GLabel(text="PRESS SPACE TO PROCEED TO NEXT LEVEL\nPRESS M TO RETURN TO MENU",\
-                font_size=36,font_name="good times rg.ttf",\
-                x=.5*GAME_WIDTH,y=.3*GAME_HEIGHT,linecolor=colormodel.BLUE,fillcolor=gray)
+REPLAY = 7
 
 ##### Backgrounds
 #: title screen background
 TITLE_BACKGROUND = "Quasar.jpg"
-#: level 1 background
-L1_BACKGROUND = "Hubble1.jpg"
-#: level 2 background
-L2_BACKGROUND = "space1.jpg"
 
-L3_BACKGROUND = "space2.jpg"
 
-L4_BACKGROUND = "space3.jpg"
+##### Texture Specs
+#: folder holding the image files
+IMAGE_DIR = os.path.join(HOME, 'Images')
+#: most bytes of decoded images kept in the texture cache
+TEXTURE_BUDGET = 96*1024*1024
+#: most preloaded images decoded in one frame
+TEXTURE_PUMP = 1
+
+
+##### Layer Specs
+#: True if the things that do not move in a level are drawn as cached layers
+LAYERS = True
+#: folder where the painted layers are kept
+LAYER_DIR = os.path.join(HOME, 'Cache', 'Layers')
+
+
+##### Sprite Specs
+#: True if the ship is drawn from a sprite atlas of pre-rotated frames
+SPRITES = True
+#: folder where the sprite atlases are kept
+SPRITE_DIR = os.path.join(HOME, 'Cache', 'Sprites')
+#: the number of orientations of the ship, 45 degrees apart
+SHIP_TURNS = 8
+
+
+##### Asset Specs
+#: True if images are drawn from the copies made by the asset build, when they exist
+ASSETS = True
+#: folder where the asset build saves images scaled to the size they are drawn at
+ASSET_DIR = os.path.join(HOME, 'Cache', 'Assets')
+#: file listing the scaled images, made by the asset build
+ASSET_MANIFEST = os.path.join(ASSET_DIR, 'assets.json')
+
+
+##### Level File Specs
+#: folder holding the level files
+LEVEL_DIR = os.path.join(HOME, 'Levels')
+#: file listing the levels in play order, with the title screen key for each
+LEVEL_REGISTRY = os.path.join(LEVEL_DIR, 'levels.json')
+#: compiled copy of every level, rebuilt when a level file changes
+LEVEL_CACHE = os.path.join(HOME, 'Cache', 'levels.bin')
+
+
+##### Replay Specs
+#: folder where replays are saved
+REPLAY_DIR = os.path.join(HOME, 'Replays')
+#: folder of golden replays checked by planet_regress
+GOLDEN_DIR = os.path.join(HOME, 'Golden')
+#: how far, in pixels, a replay's final position may move and still match
+REGRESS_TOLERANCE = 1e-6
+
+
+##### Ghost Specs
+#: True if the ship races against ghosts of earlier runs
+GHOSTS = True
+#: folder of other players' replays, raced against as ghosts on their levels
+GHOST_DIR = os.path.join(HOME, 'Ghosts')
+#: the most ghosts raced against at once
+GHOST_MAX = 64
+#: how opaque ghosts are drawn, from 0 (invisible) to 1
+GHOST_OPACITY = 0.4
+
+
+##### Solver Specs
+#: the numbers of ships the solver keeps after each move, one search each
+SOLVE_WIDTHS = (256, 1024)
+#: the numbers of ticks each move is held for, one search each
+SOLVE_HOLDS = (4, 8, 16)
+#: the longest flight the solver looks for, in ticks
+SOLVE_MAX_TICKS = 3600
+#: the solver merges ships whose positions round to the same cell of this many
+#: pixels...
+SOLVE_CELL = 8.0
+#: ...and whose velocities round to the same multiple of this many pixels per tick
+SOLVE_SPEED = 0.5
+#: room, in pixels, the solver's distance to the finish leaves around planets
+SOLVE_MARGIN = 16.0
+
+
+##### Generator Specs
+#: folder where generated levels are kept, one file per seed
+GEN_DIR = os.path.join(HOME, 'Cache', 'Generated')
+#: the fewest and most planets placed in a generated level
+GEN_PLANETS = (2, 7)
+#: the smallest and largest radius of a generated planet
+GEN_RADIUS = (30.0, 220.0)
+#: the smallest and largest mass of a generated planet
+GEN_MASS = (0.0, 10.0)
+#: the chance that a generated level has a pair of wormholes
+GEN_WORMHOLES = 0.5
+#: the strongest pull of gravity on the ship at the start of a generated level
+#: (the hardest built-in levels pull about 0.22)
+GEN_PULL = 0.25
+#: the room, in pixels, kept between planets and the start, finish, wormholes,
+#: the edges of the screen and each other
+GEN_CLEARANCE = 40.0
+#: the shortest distance between the start and the finish of a generated level
+GEN_TRIP = 700.0
+#: the most places tried for each planet of a generated level
+GEN_TRIES = 16
+#: the most layouts tried for one seed
+GEN_ATTEMPTS = 256
+#: the number of flights used to measure a generated level's difficulty
+GEN_FLIGHTS = 256
+#: the chance that each move of the solver's flight is swapped for a random one
+#: when measuring difficulty
+GEN_SLIP = 0.2
+
+
+##### Environment Specs
+#: the number of nearest planets in an environment observation
+ENV_PLANETS = 4
+#: the number of nearest wormholes in an environment observation
+ENV_WORMHOLES = 1
+#: the most ticks in one episode before it is cut off
+ENV_MAX_TICKS = 3600
+#: the reward for reaching the finish
+ENV_FINISH_REWARD = 1.0
+#: the reward for crashing
+ENV_CRASH_REWARD = -1.0
+#: the reward for every tick played
+ENV_TICK_REWARD = -0.001
+
+
+##### Benchmark Specs
+#: folder where benchmark results are written
+BENCH_DIR = os.path.join(HOME, 'Benchmarks')
+#: the stored results that new benchmark results are compared with
+BENCH_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+#: how much slower (0.2 is 20%) a path may get before compare reports it
+BENCH_THRESHOLD = 0.2
+
 
-L5_BACKGROUND = "space4.jpg"
-#: background list
-BACKGROUNDS = [TITLE_BACKGROUND, L1_BACKGROUND, L2_BACKGROUND, L3_BACKGROUND,\
-               L4_BACKGROUND, L5_BACKGROUND, L1_BACKGROUND, L2_BACKGROUND, L3_BACKGROUND,\
-               L4_BACKGROUND, L5_BACKGROUND, L1_BACKGROUND, L2_BACKGROUND, L3_BACKGROUND,\
-               L4_BACKGROUND, L5_BACKGROUND]
+##### Profiler Specs
+#: True if the game starts with the frame profiler and its overlay on
+PROFILE = False
+#: upper edges, in milliseconds, of the frame time histogram bins
+PROFILE_BINS = [2.0, 4.0, 8.0, 12.0, 16.7, 20.0, 25.0, 33.3, 50.0, 66.7, 100.0, 250.0]
+#: the number of slowest frames kept whole
+PROFILE_WORST = 10
+#: folder where profiles are written
+PROFILE_DIR = os.path.join(HOME, 'Profiles')
+#: seconds between updates of the overlay text
+PROFILE_OVERLAY = 0.5
 
 
 ##### Songs
@@ -121,5 +338,11 @@ BACKGROUNDS = [TITLE_BACKGROUND, L1_BACKGROUND, L2_BACKGROUND, L3_BACKGROUND,\
 SONGS = ["Nigel_Good_-_It_Starts.wav", "Nigel_Good_-_This_Is_Forever.wav", "An_Adventure.wav", "Stellar.wav"]
 #: list of song volumes, each specific to the corresponding song in the above list
 SOUND_VOLUME = [1.0, 1.0, 1.0, 1.0]
-#: list of the song lengths, in seconds
-SOUND_LENGTH = [106.0, 178.0, 111.0, 194.0]
\ No newline at end of file
+#: list of the song lengths, in seconds; only used if a song's WAV header cannot be read
+SOUND_LENGTH = [106.0, 178.0, 111.0, 194.0]
+#: folder holding the sound files
+SOUND_DIR = os.path.join(HOME, 'Sounds')
+#: bytes read at a time when prefetching the next song
+MUSIC_CHUNK = 256*1024
+#: seconds before the end of a song at which the next song is read
+MUSIC_PREFETCH = 10.0
\ No newline at end of file
@@ -0,0 +1,407 @@
+# planet_env.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the training environments for the Planets game.
+
+A PlanetEnv plays one level as an episode, in the reset/step style of
+reinforcement learning libraries:
+
+    env = PlanetEnv(level)
+    obs = env.reset()
+    obs, reward, done, info = env.step(action)
+
+The action is a number from 0 to 8 that picks one of the nine thrust codes the
+arrow keys can give (ACTIONS): coasting, or thrusting in one of the eight
+directions. The episode ends when the ship reaches the finish, crashes into a
+planet or off the screen, or has flown ENV_MAX_TICKS ticks. The observation is
+a float32 array of obs_size() numbers:
+
+    x, y, xv, yv, angle, teleporting, finish x - x, finish y - y
+    for each of the ENV_PLANETS nearest planets (nearest surface first):
+        planet x - x, planet y - y, radius, G times mass
+    for each of the ENV_WORMHOLES nearest wormholes:
+        wormhole x - x, wormhole y - y, exit x - x, exit y - y
+
+Rows for planets or wormholes the level does not have are zero.
+
+A PlanetEnv can wrap a Play, in which case each step is a tick of that Play
+(with its recorder, rewind and preview), or a Level or LevelSpec, in which case
+it runs the same physics headless, without game2d.
+
+A VecEnv runs many headless environments at once, split among worker processes.
+The actions, observations, rewards and ends all live in one block of
+multiprocessing.shared_memory that every process maps, so a step sends nothing
+between processes but two waits on a Barrier: nothing is pickled. An episode
+that ends is reset at once by its worker, so every environment is always
+running. Run it from the command line to measure its speed:
+
+    python planet_env.py [--envs K] [--workers W] [--steps N]"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from planet_constants import *
+from planet_physics import *
+from planet_levels import *
+from planet_solve import MOVES
+
+#: the thrust code of each action
+ACTIONS = MOVES
+
+# The commands a VecEnv gives its workers
+_CLOSE = 0
+_RESET = 1
+_STEP = 2
+
+
+def obs_size(planets=ENV_PLANETS, worms=ENV_WORMHOLES):
+    """Returns the number of values in an observation with planets planets and
+    worms wormholes.
+    """
+    return 8 + 4*planets + 4*worms
+
+
+def _level(level):
+    """Returns the Level for level, a Level, a LevelSpec or the name of a level in
+    the registry.
+    """
+    if isinstance(level, Level):
+        return level
+    if isinstance(level, str):
+        registry = get_registry()
+        number = registry.find_name(level)
+        if number == 0:
+            raise ValueError('there is no level named %s' % level)
+        level = registry.spec(number)
+    return level.to_level()
+
+
+class PlanetEnv(object):
+    """One level played as a reinforcement learning environment.
+
+    ATTRIBUTES:
+        level   [Level object] the level played
+        ticks   [int] the ticks played in this episode
+        outcome [int] RUNNING, or FINISHED or CRASHED once the episode has ended
+        max_ticks [int>0] the most ticks in one episode
+        _play   [Play object or None] the Play stepped, if there is one
+        _body   [Body object] the ship flown
+        _settings [tuple] (substeps, method, swept) used by step when there is
+            no Play
+        _planets [int>=0] the number of planets in an observation
+        _worms  [int>=0] the number of wormholes in an observation
+    """
+
+    def __init__(self, play, max_ticks=ENV_MAX_TICKS, planets=ENV_PLANETS, worms=ENV_WORMHOLES,
+                 substeps=SUBSTEPS, method=INTEGRATOR, swept=SWEPT):
+        """Initializer: Creates an environment for play, a Play, a Level, a
+        LevelSpec or the name of a level in the registry. substeps, method and
+        swept are as in planet_physics.step; a Play uses its own.
+        """
+        self._play = None
+        if hasattr(play, 'tick_code'):
+            self._play = play
+            self.level = play.get_level()
+        else:
+            self.level = _level(play)
+        self.max_ticks = max_ticks
+        self._settings = (substeps, method, swept)
+        self._planets = planets
+        self._worms = worms
+        self._body = None
+        self.reset()
+
+
+    def reset(self):
+        """Starts a new episode and returns its first observation.
+        """
+        if self._play != None:
+            self._play.reset()
+            self._body = self._play.get_ship().get_body()
+        else:
+            self._body = self.level.new_body()
+        self.ticks = 0
+        self.outcome = RUNNING
+        return self.observe()
+
+
+    def step(self, action):
+        """Plays one tick with action action and returns a tuple (obs, reward,
+        done, info), where info is a dict with the 'outcome' and the 'ticks'
+        played in the episode.
+        """
+        reward, done = self.act(action)
+        return (self.observe(), reward, done, {'outcome': self.outcome, 'ticks': self.ticks})
+
+
+    def act(self, action):
+        """Plays one tick with action action and returns a tuple (reward, done),
+        without making an observation.
+        """
+        code = int(ACTIONS[action])
+        if self._play != None:
+            outcome = self._play.tick_code(code)
+        else:
+            substeps, method, swept = self._settings
+            outcome = step(self.level, self._body, code, substeps, method, swept)
+        self.ticks += 1
+        self.outcome = outcome
+        if outcome == FINISHED:
+            return (ENV_FINISH_REWARD, True)
+        elif outcome == CRASHED:
+            return (ENV_CRASH_REWARD, True)
+        return (ENV_TICK_REWARD, self.ticks >= self.max_ticks)
+
+
+    def observe(self, out=None):
+        """Returns the observation of the ship now, written into the float32
+        array out if it is not None.
+        """
+        if out is None:
+            out = np.zeros(obs_size(self._planets, self._worms), dtype=np.float32)
+        body = self._body
+        level = self.level
+        t = level.table
+        x = body.x
+        y = body.y
+        out[:8] = (x, y, body.xv, body.yv, body.angle, body.teleporting,
+                   level.finishx - x, level.finishy - y)
+        out[8:] = 0.0
+        pos = 8
+        if self._planets > 0 and len(t.px) > 0:
+            dx = t.px - x
+            dy = t.py - y
+            r = np.sqrt(t.r2)
+            near = np.argsort(np.sqrt(dx*dx + dy*dy) - r, kind='stable')[:self._planets]
+            for i in near:
+                out[pos:pos + 4] = (dx[i], dy[i], r[i], t.gm[i])
+                pos += 4
+        pos = 8 + 4*self._planets
+        if self._worms > 0 and len(t.wx) > 0:
+            dx = t.wx - x
+            dy = t.wy - y
+            near = np.argsort(dx*dx + dy*dy, kind='stable')[:self._worms]
+            for i in near:
+                s = t.sister[i]
+                out[pos:pos + 4] = (dx[i], dy[i], t.wx[s] - x, t.wy[s] - y)
+                pos += 4
+        return out
+
+
+def _layout(count, size):
+    """Helper to VecEnv.
+    Returns a tuple (fields, nbytes): the list of (name, dtype, shape, offset) of
+    the arrays in the shared block of a VecEnv with count environments and
+    observations of size values, and the size of the block in bytes.
+    """
+    fields = []
+    offset = 0
+    for name, dtype, shape in (('obs', np.float32, (count, size)), ('reward', np.float32, (count,)),
+                               ('done', np.bool_, (count,)), ('outcome', np.int8, (count,)),
+                               ('action', np.uint8, (count,)), ('command', np.int8, (1,))):
+        fields.append((name, dtype, shape, offset))
+        offset += int(np.prod(shape))*np.dtype(dtype).itemsize
+        offset = (offset + 7) // 8 * 8
+    return (fields, offset)
+
+
+def _views(buf, count, size):
+    """Helper to VecEnv.
+    Returns a dict of the arrays in the shared block buf (see _layout).
+    """
+    fields, nbytes = _layout(count, size)
+    return dict((name, np.ndarray(shape, dtype, buf, offset)) for name, dtype, shape, offset in fields)
+
+
+def _worker(name, count, size, lo, levels, barrier, options):
+    """Helper to VecEnv; the body of a worker process.
+    Runs the environments lo to lo + len(levels) - 1 of the VecEnv whose shared
+    block is named name, for the list levels of level files (see
+    LevelSpec.to_data), each time the barrier lets it through, until it is told
+    to close.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    arrays = _views(shm.buf, count, size)
+    try:
+        envs = [PlanetEnv(parse_level(data, '', data['name']), **options) for data in levels]
+        obs = arrays['obs']
+        reward = arrays['reward']
+        done = arrays['done']
+        outcome = arrays['outcome']
+        action = arrays['action']
+        command = arrays['command']
+        while True:
+            barrier.wait()
+            if command[0] == _CLOSE:
+                break
+            for i in range(len(envs)):
+                env = envs[i]
+                k = lo + i
+                if command[0] == _RESET:
+                    env.reset()
+                    reward[k] = 0.0
+                    done[k] = False
+                    outcome[k] = RUNNING
+                else:
+                    reward[k], done[k] = env.act(action[k])
+                    outcome[k] = env.outcome
+                    if done[k]:
+                        env.reset()
+                env.observe(obs[k])
+            barrier.wait()
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        del arrays
+        shm.close()
+
+
+class VecEnv(object):
+    """Many headless environments stepped together in worker processes.
+
+    The arrays obs, reward, done and outcome are views of the shared block, so
+    they change on every step; copy them to keep them.
+
+    ATTRIBUTES:
+        count   [int>0] the number of environments
+        size    [int>0] the number of values in one observation
+        obs     [float32 array] the observation of each environment, one per row
+        reward  [float32 array] the reward of each environment's last step
+        done    [bool array] True for each environment whose episode ended on its
+            last step; it has already been reset, so its row of obs is the first
+            observation of the next episode
+        outcome [int8 array] the outcome of each environment's last step:
+            FINISHED, CRASHED, or RUNNING (also when an episode ran out of ticks)
+        _action [uint8 array] the action of each environment for the next step
+        _command [int8 array] the command for the workers
+        _shm    [SharedMemory object] the shared block
+        _barrier [Barrier object] where the workers wait for commands
+        _workers [list of Process objects] the worker processes
+    """
+
+    def __init__(self, levels, workers=None, max_ticks=ENV_MAX_TICKS, planets=ENV_PLANETS,
+                 worms=ENV_WORMHOLES, substeps=SUBSTEPS, method=INTEGRATOR, swept=SWEPT):
+        """Initializer: Creates one environment for each level in the list levels
+        (LevelSpecs or names of levels in the registry), in workers processes
+        (the number of CPU cores if None). The other parameters are as in
+        PlanetEnv.
+        """
+        registry = get_registry()
+        specs = []
+        for level in levels:
+            if isinstance(level, str):
+                number = registry.find_name(level)
+                if number == 0:
+                    raise ValueError('there is no level named %s' % level)
+                level = registry.spec(number)
+            specs.append(level.to_data())
+        self.count = len(specs)
+        self.size = obs_size(planets, worms)
+        if workers == None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, self.count))
+        fields, nbytes = _layout(self.count, self.size)
+        self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        arrays = _views(self._shm.buf, self.count, self.size)
+        self.obs = arrays['obs']
+        self.reward = arrays['reward']
+        self.done = arrays['done']
+        self.outcome = arrays['outcome']
+        self._action = arrays['action']
+        self._command = arrays['command']
+        self._barrier = multiprocessing.Barrier(workers + 1)
+        options = {'max_ticks': max_ticks, 'planets': planets, 'worms': worms,
+                   'substeps': substeps, 'method': method, 'swept': swept}
+        self._workers = []
+        for w in range(workers):
+            lo = self.count*w // workers
+            hi = self.count*(w + 1) // workers
+            process = multiprocessing.Process(target=_worker, name='env-%d' % w,
+                args=(self._shm.name, self.count, self.size, lo, specs[lo:hi], self._barrier, options))
+            process.daemon = True
+            process.start()
+            self._workers.append(process)
+
+
+    def _run(self, command):
+        """Helper to reset and step.
+        Has every worker carry out command, and waits for them to finish.
+        """
+        self._command[0] = command
+        self._barrier.wait()
+        self._barrier.wait()
+
+
+    def reset(self):
+        """Starts a new episode in every environment and returns obs.
+        """
+        self._run(_RESET)
+        return self.obs
+
+
+    def step(self, actions):
+        """Plays one tick in every environment, with action actions[i] in
+        environment i, and returns a tuple (obs, reward, done, outcome).
+        """
+        self._action[:] = actions
+        self._run(_STEP)
+        return (self.obs, self.reward, self.done, self.outcome)
+
+
+    def close(self):
+        """Stops the workers and frees the shared block.
+        """
+        if self._shm == None:
+            return
+        if not self._barrier.broken:
+            self._command[0] = _CLOSE
+            self._barrier.wait()
+        for process in self._workers:
+            process.join()
+        self.obs = self.reward = self.done = self.outcome = self._action = self._command = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+
+def main(argv=None):
+    """Measures the speed of a VecEnv with the command line arguments argv
+    (sys.argv if None), for 1 worker up to the number asked for, and returns the
+    exit status.
+    """
+    parser = argparse.ArgumentParser(description='Measure the speed of the vectorized environment.')
+    parser.add_argument('--envs', type=int, default=64, help='number of environments')
+    parser.add_argument('--workers', type=int, default=None, help='most worker processes')
+    parser.add_argument('--steps', type=int, default=500, help='steps to time')
+    parser.add_argument('--level', default=None, help='name of the level played (the first if none)')
+    args = parser.parse_args(argv)
+    registry = get_registry()
+    level = args.level or registry.name(1)
+    most = args.workers or os.cpu_count() or 1
+    rng = np.random.RandomState(0)
+    actions = rng.randint(len(ACTIONS), size=(args.steps, args.envs))
+    print('%8s %14s %8s' % ('workers', 'steps/second', 'speedup'))
+    first = None
+    for workers in range(1, most + 1):
+        env = VecEnv([level]*args.envs, workers)
+        try:
+            env.reset()
+            start = time.perf_counter()
+            for t in range(args.steps):
+                env.step(actions[t])
+            rate = args.steps*args.envs/(time.perf_counter() - start)
+        finally:
+            env.close()
+        first = first or rate
+        print('%8d %14.0f %7.2fx' % (workers, rate, rate/first))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
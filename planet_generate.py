@@ -0,0 +1,279 @@
+# planet_generate.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the level generator for the Planets game.
+
+A generated level is made from a seed. The seed gives a sequence of random
+layouts (one per attempt), each with a start and finish at least GEN_TRIP apart,
+up to GEN_PLANETS planets of random size and mass drawn with the planet images of
+the built-in levels, and sometimes a pair of wormholes. Each planet is put at up
+to GEN_TRIES random places until one is clear of everything placed before it,
+and left out if none is. A layout is thrown away at once if:
+
+    fewer than GEN_PLANETS[0] planets fit
+
+    planets overlap, or come within GEN_CLEARANCE of the start, the finish, a
+    wormhole or the edge of the screen
+
+    gravity pulls the ship harder than GEN_PULL at the start, or it crashes
+    within a second of starting if no key is pressed
+
+The layouts that are left are checked in a pool of processes, one per CPU core.
+Each is flown by the solver (planet_solve) to find whether it can be finished and
+its par. Its difficulty is the share of crashes among GEN_FLIGHTS copies of the
+solver's flight with some moves swapped for random ones (see difficulty). The
+first attempt that can be finished is the seed's level, so a seed gives the same
+level however many processes check it.
+
+Levels are saved in GEN_DIR, one file per seed, so a seed that has been
+generated before is read back at once. Run it from the command line:
+
+    python planet_generate.py seed [seed ...] [--workers N]"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+import numpy as np
+from planet_constants import *
+from planet_physics import *
+from planet_levels import *
+from planet_batch import rollout
+from planet_solve import MOVES, solve
+
+#: the version of the generator; levels saved by another version are made again
+GEN_VERSION = 1
+
+
+def level_images():
+    """Returns a tuple (planets, backgrounds) of the sorted lists of planet images
+    and background images used by the levels in the registry.
+    """
+    registry = get_registry()
+    planets = set()
+    backgrounds = set()
+    for n in range(1, len(registry) + 1):
+        spec = registry.spec(n)
+        backgrounds.add(spec.background)
+        for p in spec.planets:
+            planets.add(p[4])
+    return (sorted(planets), sorted(backgrounds))
+
+
+def layout(seed, attempt, images=None):
+    """Returns the LevelSpec of the layout for attempt number attempt of seed. The
+    same seed and attempt always give the same layout.
+
+    images is the tuple from level_images, or None to read it from the registry.
+    """
+    if images == None:
+        images = level_images()
+    planet_images, backgrounds = images
+    rng = random.Random('%d:%d' % (seed, attempt))
+    edge = GEN_CLEARANCE
+    while True:
+        start = (rng.uniform(edge, GAME_WIDTH - edge), rng.uniform(edge, GAME_HEIGHT - edge))
+        finish = (rng.uniform(edge, GAME_WIDTH - edge), rng.uniform(edge, GAME_HEIGHT - edge))
+        if math.hypot(finish[0] - start[0], finish[1] - start[1]) >= GEN_TRIP:
+            break
+    wormholes = []
+    if rng.random() < GEN_WORMHOLES:
+        a = (rng.uniform(edge, GAME_WIDTH - edge), rng.uniform(edge, GAME_HEIGHT - edge))
+        b = (rng.uniform(edge, GAME_WIDTH - edge), rng.uniform(edge, GAME_HEIGHT - edge))
+        wormholes.append((a, b))
+    taken = [(start, START_WIDTH/2.0), (finish, FINISH_WIDTH/2.0)]
+    for a, b in wormholes:
+        taken.append((a, WORM_D/2.0))
+        taken.append((b, WORM_D/2.0))
+    planets = []
+    for i in range(rng.randint(GEN_PLANETS[0], GEN_PLANETS[1])):
+        r = rng.uniform(GEN_RADIUS[0], GEN_RADIUS[1])
+        mass = round(rng.uniform(GEN_MASS[0], GEN_MASS[1]), 2)
+        image = rng.choice(planet_images)
+        for tries in range(GEN_TRIES):
+            x = rng.uniform(r + edge, GAME_WIDTH - r - edge) if 2*(r + edge) < GAME_WIDTH else 0.5*GAME_WIDTH
+            y = rng.uniform(r + edge, GAME_HEIGHT - r - edge) if 2*(r + edge) < GAME_HEIGHT else 0.5*GAME_HEIGHT
+            if all(math.hypot(x - px, y - py) >= r + size + edge for (px, py), size in taken):
+                planets.append((round(x, 1), round(y, 1), mass, round(r, 1), image))
+                taken.append(((x, y), r))
+                break
+    start = (round(start[0], 1), round(start[1], 1))
+    finish = (round(finish[0], 1), round(finish[1], 1))
+    wormholes = [((round(a[0], 1), round(a[1], 1)), (round(b[0], 1), round(b[1], 1))) for a, b in wormholes]
+    return LevelSpec('G%d' % seed, '', rng.choice(backgrounds), start, finish, planets, wormholes)
+
+
+def rejected(spec):
+    """Returns why the layout spec, a LevelSpec, is thrown away without flying it,
+    or None if it is worth checking.
+    """
+    if len(spec.planets) < GEN_PLANETS[0]:
+        return 'too few planets fit'
+    edge = GEN_CLEARANCE
+    points = [('the start', spec.start, START_WIDTH/2.0), ('the finish', spec.finish, FINISH_WIDTH/2.0)]
+    for a, b in spec.wormholes:
+        points.append(('a wormhole', a, WORM_D/2.0))
+        points.append(('a wormhole', b, WORM_D/2.0))
+    for i in range(len(spec.planets)):
+        x, y, m, r, image = spec.planets[i]
+        for j in range(i):
+            x2, y2, m2, r2, image2 = spec.planets[j]
+            if math.hypot(x - x2, y - y2) < r + r2 + edge:
+                return 'planets overlap'
+        for name, (px, py), size in points:
+            if math.hypot(x - px, y - py) < r + size + edge:
+                return 'a planet covers %s' % name
+    level = spec.to_level()
+    ax, ay, hit, warp = ship_field(level.table, level.startx, level.starty)
+    if math.hypot(ax, ay) > GEN_PULL:
+        return 'gravity at the start is too strong'
+    if len(level.table.wx) > 0 and level.warp_hit.any():
+        return 'a wormhole comes out inside a planet'
+    outcome, steps, body = run(level, [0]*int(round(1.0/TICK)))
+    if outcome != RUNNING:
+        return 'the ship does not survive a second'
+    return None
+
+
+def difficulty(level, codes, hold, seed, flights=GEN_FLIGHTS):
+    """Returns the share (0 to 1) of flights flights through the Level level that
+    crash, where each flight is the solver's flight codes (held hold ticks a
+    move) with each move swapped for a random one with chance GEN_SLIP. The
+    random moves come from seed.
+
+    A level that forgives a few wrong moves scores near 0, and one that needs
+    every move right scores near 1.
+    """
+    rng = np.random.RandomState(seed % (2**32))
+    ticks = len(codes)
+    moves = (ticks + hold - 1) // hold
+    slip = np.repeat(rng.random_sample((flights, moves)) < GEN_SLIP, hold, axis=1)[:, :ticks]
+    other = np.repeat(MOVES[rng.randint(len(MOVES), size=(flights, moves))], hold, axis=1)[:, :ticks]
+    flown = np.where(slip, other, np.array(codes, dtype=np.uint8)).astype(np.uint8)
+    result = rollout(level, flown)
+    return float((result.outcome == CRASHED).mean())
+
+
+def _check_job(job):
+    """Helper to generate; the function given to the process pool.
+    Returns a tuple (attempt, par, difficulty) for one layout, where par is the
+    number of ticks of the solver's flight, or None if it found none.
+    """
+    seed, attempt, data = job
+    spec = parse_level(data, '', 'G%d attempt %d' % (seed, attempt))
+    level = spec.to_level()
+    hold = SOLVE_HOLDS[1]
+    codes = solve(level, hold, SOLVE_WIDTHS[0])
+    if codes == None:
+        return (attempt, None, None)
+    return (attempt, len(codes), difficulty(level, codes, hold, seed*GEN_ATTEMPTS + attempt))
+
+
+def level_path(seed):
+    """Returns the path of the file in GEN_DIR that the level of seed is kept in.
+    """
+    return os.path.join(GEN_DIR, 'G%d.json' % seed)
+
+
+def load_generated(seed):
+    """Returns a tuple (spec, info) for the level of seed kept in GEN_DIR, or None
+    if there is none made by this version of the generator. info is a dict with
+    the level's 'par' in ticks, 'difficulty' and 'attempt'.
+    """
+    path = level_path(seed)
+    try:
+        data = read_file(path)
+    except (IOError, ValueError):
+        return None
+    if data.get('version') != GEN_VERSION or data.get('seed') != seed:
+        return None
+    spec = parse_level(data['level'], '', path)
+    return (spec, data['info'])
+
+
+def generate(seed, workers=None):
+    """Returns a tuple (spec, info) for the level of seed, as load_generated does,
+    reading it from GEN_DIR if it was made before and making and saving it
+    otherwise. Raises a ValueError if none of GEN_ATTEMPTS layouts can be
+    finished.
+
+    Layouts are checked workers at a time (the number of CPU cores if None).
+    """
+    found = load_generated(seed)
+    if found != None:
+        return found
+    if workers == None:
+        workers = os.cpu_count() or 1
+    images = level_images()
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers)
+    try:
+        attempt = 0
+        while attempt < GEN_ATTEMPTS:
+            jobs = []
+            while attempt < GEN_ATTEMPTS and len(jobs) < workers:
+                spec = layout(seed, attempt, images)
+                if rejected(spec) == None:
+                    jobs.append((seed, attempt, spec.to_data()))
+                attempt += 1
+            if pool != None:
+                results = pool.map(_check_job, jobs, 1)
+            else:
+                results = [_check_job(j) for j in jobs]
+            for job, (number, par, hard) in zip(jobs, results):
+                if par != None:
+                    info = {'par': par, 'difficulty': hard, 'attempt': number}
+                    spec = parse_level(job[2], '', 'G%d' % seed)
+                    _save(seed, spec, info)
+                    return (spec, info)
+    finally:
+        if pool != None:
+            pool.close()
+            pool.join()
+    raise ValueError('no level could be generated from seed %d' % seed)
+
+
+def _save(seed, spec, info):
+    """Helper to generate.
+    Writes the level of seed to its file in GEN_DIR.
+    """
+    os.makedirs(GEN_DIR, exist_ok=True)
+    path = level_path(seed)
+    temp = '%s.%d.tmp' % (path, os.getpid())
+    with open(temp, 'w') as f:
+        json.dump({'version': GEN_VERSION, 'seed': seed, 'info': info, 'level': spec.to_data()}, f, indent=1)
+    os.replace(temp, path)
+
+
+def main(argv=None):
+    """Runs the generator with the command line arguments argv (sys.argv if None)
+    and returns the exit status: 0 if a level was made for every seed, 1
+    otherwise.
+    """
+    parser = argparse.ArgumentParser(description='Generate levels from seeds.')
+    parser.add_argument('seeds', type=int, nargs='+', help='the seeds to generate')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes')
+    args = parser.parse_args(argv)
+    failed = 0
+    print('%-10s %7s %6s %10s %7s %8s' % ('level', 'planets', 'worms', 'difficulty', 'par', 'time'))
+    for seed in args.seeds:
+        start = time.perf_counter()
+        try:
+            spec, info = generate(seed, args.workers)
+        except ValueError as e:
+            failed += 1
+            print(e)
+            continue
+        print('%-10s %7d %6d %10.2f %6.2fs %7.2fs' % (spec.name, len(spec.planets), len(spec.wormholes),
+              info['difficulty'], info['par']*TICK, time.perf_counter() - start))
+    return 1 if failed > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
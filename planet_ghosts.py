@@ -0,0 +1,245 @@
+# planet_ghosts.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the ghost ships for the Planets game.
+
+A ghost is an earlier run of the level, replayed beside the player's ship from
+its recorded thrust codes, tick for tick, so the player can race it. Ghosts go
+through the same gravity and wormholes as the ship but cannot touch it or each
+other, and vanish when their run ends.
+
+All the ghosts of a level are kept in one Ghosts object, as a row each of
+contiguous NumPy arrays: their codes in one (ghosts, ticks) matrix and their
+states in a BatchResult. Every tick moves all of them at once with
+planet_batch.rollout, which follows planet_physics.step exactly, so a ghost flies
+just as its run did. Like the ship, the ghosts keep a ring of their states for
+the last REWIND_SECONDS, so they go back with the ship when it is rewound.
+
+The ghosts raced on a level (see load_ghosts) are the player's best run, the
+solver's par run (see planet_solve), and every replay of the level in GHOST_DIR,
+where replays from friends can be copied. Only replays recorded with the same
+physics settings as the game can be raced.
+
+This module does not import game2d; Play draws the ghosts, all from one
+translucent atlas (see planet_sprites)."""
+
+import os
+import numpy as np
+from planet_constants import *
+from planet_physics import *
+from planet_batch import BatchResult, rollout
+from planet_replay import *
+
+#: the state arrays of a BatchResult that a tick changes
+_FIELDS = ('x', 'y', 'xv', 'yv', 'angle', 'teleporting', 'outcome')
+
+
+def _rows(state, rows):
+    """Returns a new BatchResult with the given rows of the BatchResult state.
+    """
+    result = BatchResult(len(rows))
+    for name in _FIELDS:
+        getattr(result, name)[:] = getattr(state, name)[rows]
+    return result
+
+
+class Ghosts(object):
+    """The ghost ships raced against on one level.
+
+    ATTRIBUTES:
+        count   [int>=0] the number of ghosts
+        names   [list of str] a name for each ghost, such as its file name
+        codes   [(count, ticks) uint8 array] the thrust codes of each ghost, one
+            row each, padded with 0 after its run ends
+        lengths [int array] the number of ticks in each ghost's run
+        tick    [int>=0] the number of ticks played since the start
+        state   [BatchResult object] the state of each ghost now; a ghost whose
+            run has ended keeps its last state
+        _level  [Level object] the level flown through
+        _settings [tuple] (substeps, method, swept) used by rollout
+        _start  [BatchResult object] the state of each ghost at the start
+        _ring   [dict] a (capacity, count) array for each name in _FIELDS, the
+            ghosts' states before each of the last ticks
+        _head   [int] the row of _ring the next state is saved in
+        _saved  [int] the number of rows of _ring in use
+        _shots  [tuple] (px, py, x, y, frames, visible, warped), the arrays
+            drawn: the ghosts' positions after the last two ticks, their atlas
+            frames (see planet_sprites.sprite_frame), which of them are flying
+            and which came out of a wormhole on the last tick; replaced as a
+            whole, so other threads can read it
+    """
+
+    def __init__(self, level, replays, names=None, substeps=SUBSTEPS, method=INTEGRATOR, swept=SWEPT):
+        """Initializer: Creates a ghost for each Replay in the list replays, on the
+        Level level, at the start. names is a list of a name for each ghost, or
+        None to number them.
+        """
+        self.count = len(replays)
+        self.names = list(names) if names != None else ['ghost %d' % (i + 1) for i in range(self.count)]
+        runs = [r.codes() for r in replays]
+        self.lengths = np.array([len(c) for c in runs], dtype=int)
+        self.codes = np.zeros((self.count, max([1] + list(self.lengths))), dtype=np.uint8)
+        for i in range(self.count):
+            self.codes[i, :self.lengths[i]] = np.frombuffer(runs[i], dtype=np.uint8)
+        self._level = level
+        self._settings = (substeps, method, swept)
+        self._start = BatchResult(self.count)
+        self._start.x[:] = level.startx
+        self._start.y[:] = level.starty
+        self._start.teleporting[:] = [r.teleporting for r in replays]
+        capacity = max(1, int(round(REWIND_SECONDS/TICK)))
+        self._ring = dict((name, np.zeros((capacity, self.count), dtype=getattr(self._start, name).dtype))
+                          for name in _FIELDS)
+        self.reset()
+
+
+    def __len__(self):
+        return self.count
+
+
+    def reset(self):
+        """Puts every ghost back at the start.
+        """
+        self.state = _rows(self._start, np.arange(self.count))
+        self.tick = 0
+        self._head = 0
+        self._saved = 0
+        self._publish(np.zeros(self.count, dtype=bool), True)
+
+
+    def advance(self):
+        """Moves every ghost that is still flying by one tick, all at once.
+        """
+        state = self.state
+        self._push()
+        live = np.flatnonzero((state.outcome == RUNNING) & (self.lengths > self.tick))
+        before = state.teleporting.copy()
+        if len(live) > 0:
+            substeps, method, swept = self._settings
+            result = rollout(self._level, self.codes[live, self.tick:self.tick + 1],
+                             start=_rows(state, live), substeps=substeps, method=method, swept=swept)
+            for name in _FIELDS:
+                getattr(state, name)[live] = getattr(result, name)
+        self.tick += 1
+        self._publish(state.teleporting & ~before)
+
+
+    def rewind(self, ticks):
+        """Moves every ghost back ticks ticks, or as far as the ring goes, and
+        returns the number of ticks gone back.
+        """
+        ticks = min(ticks, self._saved)
+        if ticks <= 0:
+            return 0
+        capacity = len(self._ring['x'])
+        row = (self._head - ticks) % capacity
+        for name in _FIELDS:
+            getattr(self.state, name)[:] = self._ring[name][row]
+        self._head = row
+        self._saved -= ticks
+        self.tick -= ticks
+        self._publish(np.zeros(self.count, dtype=bool), True)
+        return ticks
+
+
+    def _push(self):
+        """Helper to advance.
+        Saves the ghosts' states in the ring, over the oldest if it is full.
+        """
+        row = self._head
+        for name in _FIELDS:
+            self._ring[name][row] = getattr(self.state, name)
+        capacity = len(self._ring['x'])
+        self._head = (row + 1) % capacity
+        self._saved = min(capacity, self._saved + 1)
+
+
+    def _publish(self, warped, still=False):
+        """Helper to advance, rewind and reset.
+        Replaces _shots after a tick, where warped is True for each ghost that
+        came out of a wormhole on it. If still is True, the ghosts are drawn
+        where they are, without moving from where they were.
+        """
+        state = self.state
+        x = state.x.copy()
+        y = state.y.copy()
+        turn = np.rint(state.angle*SHIP_TURNS/360.0).astype(int) % SHIP_TURNS
+        thrusting = np.zeros(self.count, dtype=bool)
+        if 0 < self.tick <= self.codes.shape[1]:
+            thrusting = self.codes[:, self.tick - 1] != 0
+        frames = turn + SHIP_TURNS*thrusting
+        visible = (state.outcome == RUNNING) & (self.lengths > self.tick)
+        if still:
+            px = x
+            py = y
+        else:
+            px = self._shots[2]
+            py = self._shots[3]
+        self._shots = (px, py, x, y, frames, visible, warped)
+
+
+    def places(self, alpha=1.0):
+        """Returns a tuple (x, y, frames) of arrays for drawing the ghosts that are
+        flying, alpha of the way (0 to 1) from their positions after the previous
+        tick to their positions after the last one, as planet_sim.interpolate
+        does for the ship.
+        """
+        px, py, x, y, frames, visible, warped = self._shots
+        alpha = min(1.0, max(0.0, alpha))
+        a = np.where(warped, 1.0, alpha)
+        gx = px + a*(x - px)
+        gy = py + a*(y - py)
+        return (gx[visible], gy[visible], frames[visible])
+
+
+def load_ghosts(level, settings):
+    """Returns a tuple (replays, names) of the replays of the level named level to
+    race against, at most GHOST_MAX: the player's best run, the par run and the
+    replays in GHOST_DIR, in that order. Only replays recorded with the physics
+    constants and the (method, substeps, swept) settings as they are now are
+    used; files that cannot be read are skipped.
+    """
+    paths = [best_path(level), replay_path(level + '-par')]
+    if os.path.isdir(GHOST_DIR):
+        paths.extend(os.path.join(GHOST_DIR, f) for f in sorted(os.listdir(GHOST_DIR)) if f.endswith('.rpl'))
+    method, substeps, swept = settings
+    replays = []
+    names = []
+    for path in paths:
+        if len(replays) >= GHOST_MAX:
+            break
+        try:
+            replay = load_replay(path)
+            replay.check()
+        except (IOError, OSError, ValueError):
+            continue
+        if replay.level != level or (replay.method, replay.substeps, replay.swept) != (method, substeps, swept):
+            continue
+        replays.append(replay)
+        names.append(os.path.splitext(os.path.basename(path))[0])
+    return (replays, names)
+
+
+def best_path(level):
+    """Returns the path of the replay of the player's best run of the level named
+    level.
+    """
+    return replay_path(level + '-best')
+
+
+def save_best(replay):
+    """Saves replay as the best run of its level if it finished in fewer ticks
+    than the best run saved so far. Returns True if it was saved.
+    """
+    if replay.outcome != FINISHED:
+        return False
+    path = best_path(replay.level)
+    try:
+        best = load_replay(path)
+        if best.outcome == FINISHED and best.ticks <= replay.ticks:
+            return False
+    except (IOError, OSError, ValueError):
+        pass
+    save_replay(replay, path)
+    return True
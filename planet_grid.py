@@ -0,0 +1,84 @@
+# planet_grid.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains a uniform grid spatial index for the Planets game.
+
+A SpatialGrid divides the plane into square cells and remembers which planets and
+wormholes of a PlanetTable overlap each cell. For a ship's step it returns only
+the bodies in the cells that the step's path touches, so levels with hundreds of
+obstacles do not test the ship against every one of them each step.
+
+Gravity still comes from every planet, because every massive planet pulls on the
+ship wherever it is; the grid only narrows down the collision and wormhole tests."""
+
+import math
+import numpy as np
+from planet_constants import *
+
+
+class SpatialGrid(object):
+    """A uniform grid over the planets and wormholes of a PlanetTable.
+
+    ATTRIBUTES:
+        _cell   [float>0] the width and height of a cell
+        _planets [dict] maps a cell (i, j) to a list of the planets overlapping it
+        _worms  [dict] maps a cell (i, j) to a list of the wormholes overlapping it
+        _cache  [dict] maps a block of cells (i0, j0, i1, j1) to the tuple of index
+            arrays returned by query, so repeated queries are free
+    """
+
+    def __init__(self, table, cell=GRID_CELL):
+        """Initializer: Builds the grid for the bodies in the PlanetTable table.
+        """
+        self._cell = float(cell)
+        self._planets = {}
+        self._worms = {}
+        self._cache = {}
+        for i in range(len(table.px)):
+            self._insert(self._planets, i, table.px[i], table.py[i], math.sqrt(table.r2[i]))
+        for i in range(len(table.wx)):
+            self._insert(self._worms, i, table.wx[i], table.wy[i], math.sqrt(table.wr2[i]))
+
+
+    def _insert(self, cells, index, x, y, r):
+        """Helper to the initializer.
+        Adds index to every cell that overlaps the bounding box of the circle with
+        center (x,y) and radius r.
+        """
+        i0, j0 = self._cell_of(x - r, y - r)
+        i1, j1 = self._cell_of(x + r, y + r)
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                cells.setdefault((i, j), []).append(index)
+
+
+    def _cell_of(self, x, y):
+        """Returns the cell (i, j) that contains the point (x,y).
+        """
+        return (int(math.floor(x / self._cell)), int(math.floor(y / self._cell)))
+
+
+    def query(self, x0, y0, x1, y1):
+        """Returns a tuple (planets, worms) of sorted index arrays: the planets and
+        wormholes in every cell touched by the path from (x0,y0) to (x1,y1).
+
+        The arrays are sorted, so a test over them still finds the first wormhole
+        in table order.
+        """
+        i0, j0 = self._cell_of(min(x0, x1), min(y0, y1))
+        i1, j1 = self._cell_of(max(x0, x1), max(y0, y1))
+        key = (i0, j0, i1, j1)
+        found = self._cache.get(key)
+        if found == None:
+            planets = set()
+            worms = set()
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    planets.update(self._planets.get((i, j), ()))
+                    worms.update(self._worms.get((i, j), ()))
+            found = (np.array(sorted(planets), dtype=int), np.array(sorted(worms), dtype=int))
+            if len(self._cache) >= GRID_CACHE:
+                self._cache.clear()
+            self._cache[key] = found
+        return found
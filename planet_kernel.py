@@ -0,0 +1,349 @@
+# planet_kernel.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the vectorized physics kernel for the Planets game.
+
+A PlanetTable stores every planet and wormhole of a level as flat NumPy arrays
+(a struct-of-arrays layout) that are built once when the level is created. The
+function ship_field evaluates gravity, planet collisions and wormhole contact for
+a ship position in a single pass over those arrays, instead of looping over the
+Planet and Wormhole objects in Python. The function ship_sweep does the same for
+the straight path a ship took during a step, so that a fast ship cannot jump over
+a small planet or wormhole between two positions. For a single ship on a level
+with few bodies, ship_sweep and box_time use plain Python numbers instead, since
+NumPy's overhead per call is larger than the work; the results are the same to
+the last bit.
+
+The arrow keys held in a frame are encoded as a thrust code, a 4-bit mask of
+KEY_UP, KEY_DOWN, KEY_LEFT and KEY_RIGHT. The tables THRUST_AX, THRUST_AY and
+THRUST_ANGLE map each of the 16 codes to the acceleration and orientation that
+Play._thrust_ship gives the ship."""
+
+import math
+import numpy as np
+from planet_constants import *
+
+
+def _thrust_entry(code):
+    """Returns a tuple (angle, ax, ay) for the thrust code code, following the
+    same order of key checks as the original arrow key handling. angle is -1 if
+    no arrow key is held, which leaves the ship's orientation unchanged.
+    """
+    up = code & KEY_UP
+    down = code & KEY_DOWN
+    left = code & KEY_LEFT
+    right = code & KEY_RIGHT
+    if up and right:
+        return (315, SHIP_ACCEL_2, SHIP_ACCEL_2)
+    elif up and left:
+        return (45, -SHIP_ACCEL_2, SHIP_ACCEL_2)
+    elif down and left:
+        return (135, -SHIP_ACCEL_2, -SHIP_ACCEL_2)
+    elif down and right:
+        return (225, SHIP_ACCEL_2, -SHIP_ACCEL_2)
+    elif up:
+        return (0, 0.0, SHIP_ACCEL_1)
+    elif down:
+        return (180, 0.0, -SHIP_ACCEL_1)
+    elif right:
+        return (270, SHIP_ACCEL_1, 0.0)
+    elif left:
+        return (90, -SHIP_ACCEL_1, 0.0)
+    return (-1, 0.0, 0.0)
+
+
+#: orientation of the ship for each thrust code, -1 if unchanged
+THRUST_ANGLE = np.array([_thrust_entry(c)[0] for c in range(16)], dtype=int)
+#: x acceleration for each thrust code
+THRUST_AX = np.array([_thrust_entry(c)[1] for c in range(16)], dtype=float)
+#: y acceleration for each thrust code
+THRUST_AY = np.array([_thrust_entry(c)[2] for c in range(16)], dtype=float)
+#: the tuple (angle, ax, ay) for each thrust code, for stepping a single ship
+THRUST = [_thrust_entry(c) for c in range(16)]
+
+
+def input_code(inp):
+    """Returns the thrust code for the arrow keys currently held in the GInput
+    object inp.
+    """
+    code = 0
+    if inp.is_key_down('up'):
+        code |= KEY_UP
+    if inp.is_key_down('down'):
+        code |= KEY_DOWN
+    if inp.is_key_down('left'):
+        code |= KEY_LEFT
+    if inp.is_key_down('right'):
+        code |= KEY_RIGHT
+    return code
+
+
+class PlanetTable(object):
+    """A struct-of-arrays table of the bodies in a single level.
+
+    ATTRIBUTES:
+        px      [float array] x position of each planet
+        py      [float array] y position of each planet
+        gm      [float array] G times the mass of each planet
+        r2      [float array] square of the radius of each planet
+        wx      [float array] x position of each wormhole
+        wy      [float array] y position of each wormhole
+        wr2     [float array] square of the radius of each wormhole
+        sister  [int array] index of each wormhole's sister in the table
+        circles [list of (x, y, r2) tuples] the planets as plain numbers
+        worm_circles [list of (x, y, r2) tuples] the wormholes as plain numbers
+    """
+
+    def __init__(self, planets=None, wormholes=None):
+        """Initializer: Creates a table from plain level data.
+
+        PARAMETERS:
+            planets [list of (x, y, m, r) tuples or None] position, mass and radius
+                of each planet
+            wormholes [list of (x, y, r, sister) tuples or None] position and radius
+                of each wormhole, and the index of its sister in this list
+        """
+        planets = planets if planets != None else []
+        wormholes = wormholes if wormholes != None else []
+        self.px = np.array([p[0] for p in planets], dtype=float)
+        self.py = np.array([p[1] for p in planets], dtype=float)
+        self.gm = np.array([G*p[2] for p in planets], dtype=float)
+        self.r2 = np.array([p[3]**2.0 for p in planets], dtype=float)
+        self.wx = np.array([w[0] for w in wormholes], dtype=float)
+        self.wy = np.array([w[1] for w in wormholes], dtype=float)
+        self.wr2 = np.array([w[2]**2.0 for w in wormholes], dtype=float)
+        self.sister = np.array([w[3] for w in wormholes], dtype=int)
+        self.circles = list(zip(self.px.tolist(), self.py.tolist(), self.r2.tolist()))
+        self.worm_circles = list(zip(self.wx.tolist(), self.wy.tolist(), self.wr2.tolist()))
+
+
+    def planet_count(self):
+        return len(self.px)
+
+
+    def wormhole_count(self):
+        return len(self.wx)
+
+
+def ship_field(table, x, y, planets=None, worms=None):
+    """Returns a tuple (ax, ay, hit, warp) for a ship at position (x,y).
+
+    ax and ay are the total gravitational acceleration on the ship from every
+    planet in table. hit is True if the ship is inside any planet. warp is the
+    index of the first wormhole (in table order) that the ship is inside, or -1
+    if it is not touching any wormhole.
+
+    planets and worms are optional sorted index arrays (see SpatialGrid.query);
+    if given, only those planets and wormholes are tested for hit and warp.
+    Gravity always comes from every planet.
+
+    The acceleration is independent of the ship's mass, because the force
+    G*m1*m2/r**2 is divided by m2 again when it is applied to the ship.
+    """
+    ax = 0.0
+    ay = 0.0
+    hit = False
+    if len(table.px) > 0:
+        dx = x - table.px
+        dy = y - table.py
+        d2 = dx*dx + dy*dy
+        k = table.gm / (d2*np.sqrt(d2))
+        ax = -float((k*dx).sum())
+        ay = -float((k*dy).sum())
+        if planets is None:
+            hit = bool((d2 < table.r2).any())
+        elif len(planets) > 0:
+            hit = bool((d2[planets] < table.r2[planets]).any())
+    warp = -1
+    wx, wy, wr2 = _select(table.wx, table.wy, table.wr2, worms)
+    if len(wx) > 0:
+        dx = x - wx
+        dy = y - wy
+        inside = np.flatnonzero(dx*dx + dy*dy < wr2)
+        if len(inside) > 0:
+            warp = _original(worms, inside[0])
+    return (ax, ay, hit, warp)
+
+
+def ship_contact(table, x, y, planets=None, worms=None):
+    """Returns a tuple (hit, warp) for a ship at position (x,y), like ship_field
+    but without computing gravity.
+    """
+    hit = False
+    px, py, pr2 = _select(table.px, table.py, table.r2, planets)
+    if len(px) > 0:
+        hit = bool(((x - px)**2 + (y - py)**2 < pr2).any())
+    warp = -1
+    wx, wy, wr2 = _select(table.wx, table.wy, table.wr2, worms)
+    if len(wx) > 0:
+        inside = np.flatnonzero((x - wx)**2 + (y - wy)**2 < wr2)
+        if len(inside) > 0:
+            warp = _original(worms, inside[0])
+    return (hit, warp)
+
+
+def _select(x, y, r2, index):
+    """Helper to ship_field, ship_contact and ship_sweep.
+    Returns the entries of the arrays x, y and r2 at the index array index, or the
+    whole arrays if index is None.
+    """
+    if index is None:
+        return (x, y, r2)
+    return (x[index], y[index], r2[index])
+
+
+def _original(index, i):
+    """Helper to ship_field, ship_contact and ship_sweep.
+    Returns the table position of entry i of a selection made by _select.
+    """
+    if index is None:
+        return int(i)
+    return int(index[i])
+
+
+def sweep_circles(x0, y0, x1, y1, cx, cy, r2):
+    """Returns the earliest time t in [0,1] at which the segment from (x0,y0) to
+    (x1,y1) is inside each circle with center (cx,cy) and squared radius r2, or
+    inf for a circle that the segment never enters. t is 0 if the segment starts
+    inside the circle.
+
+    All arguments may be numbers or arrays that broadcast together, so one call
+    can test many segments against many circles.
+    """
+    dx = x1 - x0
+    dy = y1 - y0
+    fx = x0 - cx
+    fy = y0 - cy
+    a = dx*dx + dy*dy
+    b = fx*dx + fy*dy
+    c = fx*fx + fy*fy - r2
+    disc = b*b - a*c
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (-b - np.sqrt(disc)) / a
+    t = np.where((a > 0) & (disc > 0) & (t >= 0) & (t <= 1), t, np.inf)
+    return np.where(c < 0, 0.0, t)
+
+
+def sweep_box(x0, y0, x1, y1, bx, by, hw, hh):
+    """Returns the earliest time t in [0,1] at which the segment from (x0,y0) to
+    (x1,y1) is inside the rectangle with center (bx,by), half width hw and half
+    height hh, or inf if the segment never enters it. t is 0 if the segment starts
+    inside the rectangle. Works for both numbers and arrays.
+    """
+    tx0, tx1 = _slab(x0, x1 - x0, bx, hw)
+    ty0, ty1 = _slab(y0, y1 - y0, by, hh)
+    t_in = np.maximum(tx0, ty0)
+    t_out = np.minimum(tx1, ty1)
+    t = np.where((t_in < t_out) & (t_out > 0) & (t_in <= 1), np.maximum(t_in, 0.0), np.inf)
+    return t
+
+
+def _slab(p, d, center, half):
+    """Helper to sweep_box.
+    Returns the times (t_in, t_out) at which the line p + t*d is strictly between
+    center - half and center + half. If d is 0 the interval is everything or
+    nothing.
+    """
+    p = np.asarray(p, dtype=float)
+    d = np.asarray(d, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t0 = (center - half - p) / d
+        t1 = (center + half - p) / d
+    inside = np.abs(p - center) < half
+    moving = d != 0
+    t_in = np.where(moving, np.minimum(t0, t1), np.where(inside, -np.inf, np.inf))
+    t_out = np.where(moving, np.maximum(t0, t1), np.where(inside, np.inf, -np.inf))
+    return (t_in, t_out)
+
+
+def ship_sweep(table, x0, y0, x1, y1, planets=None, worms=None):
+    """Returns a tuple (tp, tw, warp) for a ship that moved in a straight line from
+    (x0,y0) to (x1,y1).
+
+    tp is the earliest time in [0,1] at which the ship is inside a planet, and tw
+    the earliest time at which it is inside a wormhole; both are inf if that
+    never happens. warp is the index of that wormhole, or -1.
+
+    planets and worms are optional sorted index arrays (see SpatialGrid.query);
+    if given, only those planets and wormholes are tested.
+    """
+    if planets is None and worms is None and len(table.circles) + len(table.worm_circles) <= SCALAR_MAX:
+        tp = circle_time(x0, y0, x1, y1, table.circles)[0]
+        tw, warp = circle_time(x0, y0, x1, y1, table.worm_circles)
+        return (tp, tw, warp)
+    tp = np.inf
+    px, py, pr2 = _select(table.px, table.py, table.r2, planets)
+    if len(px) > 0:
+        tp = float(sweep_circles(x0, y0, x1, y1, px, py, pr2).min())
+    tw = np.inf
+    warp = -1
+    wx, wy, wr2 = _select(table.wx, table.wy, table.wr2, worms)
+    if len(wx) > 0:
+        t = sweep_circles(x0, y0, x1, y1, wx, wy, wr2)
+        first = int(t.argmin())
+        tw = float(t[first])
+        if tw != np.inf:
+            warp = _original(worms, first)
+    return (tp, tw, warp)
+
+
+def circle_time(x0, y0, x1, y1, circles):
+    """Returns a tuple (t, i): the earliest time in [0,1] at which the segment from
+    (x0,y0) to (x1,y1) is inside one of the circles, a list of (x, y, r2) tuples,
+    and the position of that circle in the list. t is inf and i is -1 if the
+    segment never enters a circle.
+
+    This is sweep_circles followed by argmin, for one segment given as plain
+    numbers; every operation is done in the same order, so it gives the same
+    result.
+    """
+    dx = x1 - x0
+    dy = y1 - y0
+    a = dx*dx + dy*dy
+    best = math.inf
+    first = -1
+    for i in range(len(circles)):
+        cx, cy, r2 = circles[i]
+        fx = x0 - cx
+        fy = y0 - cy
+        c = fx*fx + fy*fy - r2
+        if c < 0:
+            t = 0.0
+        else:
+            b = fx*dx + fy*dy
+            disc = b*b - a*c
+            t = math.inf
+            if a > 0 and disc > 0:
+                t = (-b - math.sqrt(disc)) / a
+                if not (0 <= t <= 1):
+                    t = math.inf
+        if t < best:
+            best = t
+            first = i
+    return (best, first)
+
+
+def box_time(x0, y0, x1, y1, bx, by, hw, hh):
+    """Returns sweep_box for one segment given as plain numbers, as a float.
+    """
+    tx0, tx1 = _slab_time(x0, x1 - x0, bx, hw)
+    ty0, ty1 = _slab_time(y0, y1 - y0, by, hh)
+    t_in = max(tx0, ty0)
+    t_out = min(tx1, ty1)
+    if t_in < t_out and t_out > 0 and t_in <= 1:
+        return max(t_in, 0.0)
+    return math.inf
+
+
+def _slab_time(p, d, center, half):
+    """Helper to box_time.
+    Returns _slab for plain numbers.
+    """
+    if d != 0:
+        t0 = (center - half - p) / d
+        t1 = (center + half - p) / d
+        return (min(t0, t1), max(t0, t1))
+    if abs(p - center) < half:
+        return (-math.inf, math.inf)
+    return (math.inf, -math.inf)
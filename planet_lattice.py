@@ -0,0 +1,170 @@
+# planet_lattice.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains precomputed gravity lattices for the Planets game.
+
+The planets of every level stand still, so the gravity on the ship depends only
+on where the ship is. A GravityLattice samples that field once on a regular grid
+over the game window (plus a margin), and afterwards the ship's acceleration is a
+bilinear interpolation of the four nearest samples instead of a sum over every
+planet.
+
+Lattices are cached on disk in LATTICE_DIR, under a hash of the level's planets,
+G and the lattice spacing, so loading a level again is a memory-mapped read. Next
+to each lattice is a small JSON file that records how far the interpolation is
+from the exact field at random points outside the planets."""
+
+import hashlib
+import json
+import os
+import numpy as np
+from planet_constants import *
+
+
+class GravityLattice(object):
+    """Gravity sampled on a regular grid.
+
+    ATTRIBUTES:
+        x0      [float] x position of the first column of samples
+        y0      [float] y position of the first row of samples
+        step    [float>0] distance between neighboring samples
+        ax      [(rows, cols) float array] x acceleration at each sample
+        ay      [(rows, cols) float array] y acceleration at each sample
+        report  [dict] the interpolation error: 'max' and 'mean' relative error and
+            the number of 'samples' it was measured at
+        path    [str or None] the file the lattice was read from or saved to
+    """
+
+    def __init__(self, table, step=LATTICE_STEP, margin=LATTICE_MARGIN, cache=True):
+        """Initializer: Loads the lattice for the planets of the PlanetTable table
+        from the disk cache, or computes it (and saves it, if cache is True).
+        """
+        self.step = float(step)
+        self.x0 = -float(margin)
+        self.y0 = -float(margin)
+        cols = int(np.ceil((GAME_WIDTH + 2*margin) / self.step)) + 1
+        rows = int(np.ceil((GAME_HEIGHT + 2*margin) / self.step)) + 1
+        self.path = None
+        key = lattice_key(table, self.step, margin)
+        base = os.path.join(LATTICE_DIR, key)
+        if cache and os.path.exists(base + '.npy') and os.path.exists(base + '.json'):
+            data = np.load(base + '.npy', mmap_mode='r')
+            self.ax = data[0]
+            self.ay = data[1]
+            with open(base + '.json') as f:
+                self.report = json.load(f)['error']
+            self.path = base + '.npy'
+            return
+        xs = self.x0 + self.step*np.arange(cols)
+        ys = self.y0 + self.step*np.arange(rows)
+        gx, gy = np.meshgrid(xs, ys)
+        ax, ay = exact_field(table, gx.ravel(), gy.ravel())
+        self.ax = ax.reshape(rows, cols)
+        self.ay = ay.reshape(rows, cols)
+        self.report = self._measure(table)
+        if cache:
+            self._save(base, table, margin)
+
+
+    def _measure(self, table, samples=LATTICE_SAMPLES):
+        """Helper to the initializer.
+        Returns the relative error of interpolate against exact_field at random
+        points inside the game window that are not inside a planet. The points
+        come from a fixed seed, so the report is the same every time.
+        """
+        rng = np.random.RandomState(0)
+        x = rng.uniform(0, GAME_WIDTH, samples)
+        y = rng.uniform(0, GAME_HEIGHT, samples)
+        if len(table.px) > 0:
+            outside = np.ones(samples, dtype=bool)
+            for i in range(len(table.px)):
+                outside &= (x - table.px[i])**2 + (y - table.py[i])**2 >= table.r2[i]
+            x = x[outside]
+            y = y[outside]
+        ex, ey = exact_field(table, x, y)
+        ix, iy = self.interpolate(x, y)
+        size = np.sqrt(ex*ex + ey*ey)
+        miss = np.sqrt((ix - ex)**2 + (iy - ey)**2)
+        ok = size > 0
+        err = miss[ok] / size[ok]
+        if len(err) == 0:
+            return {'max': 0.0, 'mean': 0.0, 'samples': int(len(x))}
+        return {'max': float(err.max()), 'mean': float(err.mean()), 'samples': int(len(x))}
+
+
+    def _save(self, base, table, margin):
+        """Helper to the initializer.
+        Writes the lattice and its error report to the cache, then reopens the
+        lattice memory-mapped. Each file is written under a temporary name and
+        then renamed, so a game that stops part way, or another game saving the
+        same lattice, never leaves a half-written file to be loaded.
+        """
+        if not os.path.isdir(LATTICE_DIR):
+            os.makedirs(LATTICE_DIR)
+        temp = base + '.%d.tmp' % os.getpid()
+        with open(temp, 'wb') as f:
+            np.save(f, np.array([self.ax, self.ay]))
+        os.replace(temp, base + '.npy')
+        info = {'step': self.step, 'margin': float(margin), 'G': G,
+                'planets': len(table.px), 'error': self.report}
+        with open(temp, 'w') as f:
+            json.dump(info, f, indent=2)
+        os.replace(temp, base + '.json')
+        data = np.load(base + '.npy', mmap_mode='r')
+        self.ax = data[0]
+        self.ay = data[1]
+        self.path = base + '.npy'
+
+
+    def interpolate(self, x, y):
+        """Returns a tuple (ax, ay) of the bilinearly interpolated acceleration at
+        the points (x,y), which may be numbers or arrays. Points outside the lattice
+        use its nearest edge.
+        """
+        rows, cols = self.ax.shape
+        fx = np.clip((np.asarray(x, dtype=float) - self.x0) / self.step, 0, cols - 1.000001)
+        fy = np.clip((np.asarray(y, dtype=float) - self.y0) / self.step, 0, rows - 1.000001)
+        i = fx.astype(int)
+        j = fy.astype(int)
+        u = fx - i
+        v = fy - j
+        ax = ((1-u)*(1-v)*self.ax[j, i] + u*(1-v)*self.ax[j, i+1]
+              + (1-u)*v*self.ax[j+1, i] + u*v*self.ax[j+1, i+1])
+        ay = ((1-u)*(1-v)*self.ay[j, i] + u*(1-v)*self.ay[j, i+1]
+              + (1-u)*v*self.ay[j+1, i] + u*v*self.ay[j+1, i+1])
+        return (ax, ay)
+
+
+def lattice_key(table, step, margin):
+    """Returns the cache key for a lattice: a hash of the planets in the PlanetTable
+    table, G, the game size and the lattice spacing and margin.
+    """
+    h = hashlib.sha1()
+    h.update(np.array([G, GAME_WIDTH, GAME_HEIGHT, step, margin], dtype=float).tobytes())
+    h.update(np.ascontiguousarray(table.px).tobytes())
+    h.update(np.ascontiguousarray(table.py).tobytes())
+    h.update(np.ascontiguousarray(table.gm).tobytes())
+    return h.hexdigest()
+
+
+def exact_field(table, x, y, chunk=4096):
+    """Returns a tuple (ax, ay) of arrays: the exact gravitational acceleration
+    from every planet in table at each point (x[i],y[i]). The points are done
+    chunk at a time so that memory stays bounded.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    ax = np.zeros(len(x))
+    ay = np.zeros(len(x))
+    if len(table.px) == 0:
+        return (ax, ay)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for lo in range(0, len(x), chunk):
+            dx = x[lo:lo+chunk, None] - table.px
+            dy = y[lo:lo+chunk, None] - table.py
+            d2 = dx*dx + dy*dy
+            k = np.where(d2 > 0, table.gm / (d2*np.sqrt(d2)), 0.0)
+            ax[lo:lo+chunk] = -(k*dx).sum(axis=1)
+            ay[lo:lo+chunk] = -(k*dy).sum(axis=1)
+    return (ax, ay)
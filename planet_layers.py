@@ -0,0 +1,124 @@
+# planet_layers.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the static layer cache for the Planets game.
+
+Only the ship moves during a level, but the game used to draw the background and
+every planet, the start, the finish and every wormhole each frame. Instead, when
+a level starts, the things that do not move are painted once into two full
+screen pictures:
+
+    the bottom layer    the background, the planets, the finish and the start
+    the top layer       the wormholes, which are drawn over the ship
+
+so each frame draws the bottom layer, the ship and the top layer (if the level
+has wormholes), no matter how many planets there are. This is the same picture
+as before, in the same order.
+
+Layers are saved as PNG files in LAYER_DIR, named by a hash of what is in them
+(the image files, their positions and sizes, and the modification times of the
+files), so a level is only painted once until it or one of its images changes.
+
+Painting needs Pillow. Without it, layer_files returns None and the game draws
+every object as before."""
+
+import hashlib
+import json
+import os
+from planet_constants import *
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def static_items(background, play_items):
+    """Returns a tuple (bottom, top) of lists of (file, x, y, width, height) tuples
+    to paint, in drawing order, for a level with the background image background.
+
+    play_items is a tuple (planets, finish, start, wormholes) of lists of such
+    tuples, as returned by Play.static_items.
+    """
+    planets, finish, start, wormholes = play_items
+    bottom = [(background, 0.5*GAME_WIDTH, 0.5*GAME_HEIGHT, GAME_WIDTH, GAME_HEIGHT)]
+    bottom.extend(planets)
+    bottom.extend(finish)
+    bottom.extend(start)
+    return (bottom, list(wormholes))
+
+
+def layer_key(items):
+    """Returns the hash that names the layer painted from items. It changes when
+    an item moves, is resized or uses another file, or when one of the files is
+    modified.
+    """
+    h = hashlib.sha1()
+    h.update(json.dumps([GAME_WIDTH, GAME_HEIGHT, items]).encode('utf-8'))
+    for item in items:
+        path = os.path.join(IMAGE_DIR, item[0])
+        if os.path.exists(path):
+            h.update(str(os.path.getmtime(path)).encode('utf-8'))
+    return h.hexdigest()
+
+
+def paint(items, path):
+    """Paints the list items of (file, x, y, width, height) tuples, in order, on a
+    transparent picture the size of the game window, and saves it as PNG in path.
+
+    Positions are centers in game coordinates, where y points up, like the x and y
+    of a GImage.
+    """
+    canvas = Image.new('RGBA', (GAME_WIDTH, GAME_HEIGHT), (0, 0, 0, 0))
+    for source, x, y, width, height in items:
+        size = (max(1, int(round(width))), max(1, int(round(height))))
+        picture = Image.open(os.path.join(IMAGE_DIR, source)).convert('RGBA')
+        picture = picture.resize(size, Image.LANCZOS)
+        left = int(round(x - 0.5*size[0]))
+        top = int(round(GAME_HEIGHT - y - 0.5*size[1]))
+        canvas.alpha_composite(_clip(picture, left, top), (max(left, 0), max(top, 0)))
+    folder = os.path.dirname(path)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    temp = path + '.tmp.png'
+    canvas.save(temp)
+    os.replace(temp, path)
+
+
+def _clip(picture, left, top):
+    """Helper to paint.
+    Returns the part of picture that is inside the game window when its top left
+    corner is at (left, top), since alpha_composite needs it to fit.
+    """
+    x0 = max(0, -left)
+    y0 = max(0, -top)
+    x1 = min(picture.size[0], GAME_WIDTH - left)
+    y1 = min(picture.size[1], GAME_HEIGHT - top)
+    if x1 <= x0 or y1 <= y0:
+        return Image.new('RGBA', (1, 1), (0, 0, 0, 0))
+    return picture.crop((x0, y0, x1, y1))
+
+
+def layer_file(items):
+    """Returns the path of the layer painted from items, painting it first if it
+    is not in LAYER_DIR yet.
+    """
+    path = os.path.join(LAYER_DIR, layer_key(items) + '.png')
+    if not os.path.exists(path):
+        paint(items, path)
+    return path
+
+
+def layer_files(background, play_items):
+    """Returns a tuple (bottom, top) of the paths of a level's layers (top is None
+    if the level has no wormholes), or None if layers cannot be made, because
+    Pillow is missing or an image cannot be read.
+    """
+    if Image == None or not LAYERS:
+        return None
+    bottom, top = static_items(background, play_items)
+    try:
+        return (layer_file(bottom), layer_file(top) if len(top) > 0 else None)
+    except (IOError, OSError):
+        return None
@@ -0,0 +1,391 @@
+# planet_levels.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the level registry for the Planets game.
+
+Levels are data files in the Levels folder rather than Python code. The registry
+file Levels/levels.json lists the levels in play order, each with the title
+screen key that starts it and the file that defines it. A level file (JSON, or
+TOML if Python has tomllib) looks like this:
+
+    {
+        "name": "L6",
+        "background": "space4.jpg",
+        "start": [50, 700],
+        "finish": [1350, 50],
+        "planets": [
+            {"x": 700, "y": 600, "mass": 1, "radius": 100, "image": "mars.png"}
+        ],
+        "wormholes": [
+            {"a": [560, 50], "b": [840, 700]}
+        ]
+    }
+
+Every file is checked against that layout when it is read. The checked levels
+are compiled into one compact binary file, LEVEL_CACHE, which is rebuilt only
+when the modification time or length of a level file changes, so a start with
+the cache up to date only reads levels.json. A LevelRegistry reads just the
+index of that file when it is created and decodes a level the first time it is
+asked for. The game's registry is only made the first time get_registry is
+called, never on import.
+
+This module does not import game2d; planet_play turns a LevelSpec into a Play."""
+
+import hashlib
+import json
+import os
+import struct
+from planet_constants import *
+from planet_physics import *
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+
+#: first bytes of a compiled level file
+_MAGIC = b'PLVL'
+#: version of the compiled level format
+_VERSION = 2
+
+
+class LevelSpec(object):
+    """The definition of a single level, as plain data.
+
+    ATTRIBUTES:
+        name    [str] the level's name
+        key     [str] the title screen key that starts the level
+        background [str] the background image file
+        start   [(x, y) tuple] position of the start point
+        finish  [(x, y) tuple] center of the finish area
+        planets [list of (x, y, mass, radius, image) tuples] the planets
+        wormholes [list of ((x1, y1), (x2, y2)) tuples] the wormhole pairs
+    """
+
+    def __init__(self, name, key, background, start, finish, planets, wormholes):
+        self.name = name
+        self.key = key
+        self.background = background
+        self.start = start
+        self.finish = finish
+        self.planets = planets
+        self.wormholes = wormholes
+
+
+    def to_level(self):
+        """Returns a new Level from planet_physics with this level's geometry.
+        """
+        bodies = [(p[0], p[1], p[2], p[3]) for p in self.planets]
+        return Level(self.start, self.finish, bodies, self.wormholes)
+
+
+    def to_data(self):
+        """Returns this level as a dict in the layout of a level file, which
+        parse_level reads back.
+        """
+        return {'name': self.name, 'background': self.background,
+                'start': list(self.start), 'finish': list(self.finish),
+                'planets': [{'x': x, 'y': y, 'mass': m, 'radius': r, 'image': image}
+                            for x, y, m, r, image in self.planets],
+                'wormholes': [{'a': list(a), 'b': list(b)} for a, b in self.wormholes]}
+
+
+def _check(fact, path, message):
+    """Raises a ValueError that names the file path if fact is False.
+    """
+    if not fact:
+        raise ValueError('%s: %s' % (path, message))
+
+
+def _point(value, path, where):
+    """Returns value as an (x, y) tuple of floats, after checking that it is a
+    list of two numbers.
+    """
+    _check(isinstance(value, list) and len(value) == 2, path, where + ' must be a list [x, y]')
+    for v in value:
+        _check(isinstance(v, (int, float)) and not isinstance(v, bool), path,
+               where + ' must contain numbers')
+    return (float(value[0]), float(value[1]))
+
+
+def _number(entry, name, path, where):
+    """Returns entry[name] as a float, after checking that it is a number.
+    """
+    _check(name in entry, path, '%s is missing "%s"' % (where, name))
+    v = entry[name]
+    _check(isinstance(v, (int, float)) and not isinstance(v, bool), path,
+           '%s "%s" must be a number' % (where, name))
+    return float(v)
+
+
+def parse_level(data, key, path):
+    """Returns a LevelSpec for the level data data (a dict read from a level
+    file), after checking it against the level layout. path is only used in
+    error messages.
+    """
+    _check(isinstance(data, dict), path, 'a level must be an object')
+    for name in data:
+        _check(name in ('name', 'background', 'start', 'finish', 'planets', 'wormholes'),
+               path, 'unknown field "%s"' % name)
+    for name in ('name', 'background', 'start', 'finish'):
+        _check(name in data, path, 'missing field "%s"' % name)
+    _check(isinstance(data['name'], str), path, '"name" must be a string')
+    _check(isinstance(data['background'], str), path, '"background" must be a string')
+    start = _point(data['start'], path, '"start"')
+    finish = _point(data['finish'], path, '"finish"')
+    planets = []
+    items = data.get('planets', [])
+    _check(isinstance(items, list), path, '"planets" must be a list')
+    for i in range(len(items)):
+        p = items[i]
+        where = 'planet %d' % i
+        _check(isinstance(p, dict), path, where + ' must be an object')
+        for name in p:
+            _check(name in ('x', 'y', 'mass', 'radius', 'image'), path,
+                   '%s has unknown field "%s"' % (where, name))
+        mass = _number(p, 'mass', path, where)
+        radius = _number(p, 'radius', path, where)
+        _check(mass >= 0, path, where + ' must not have negative mass')
+        _check(radius > 0, path, where + ' must have a positive radius')
+        _check(isinstance(p.get('image'), str), path, where + ' needs an "image" string')
+        planets.append((_number(p, 'x', path, where), _number(p, 'y', path, where),
+                        mass, radius, p['image']))
+    wormholes = []
+    items = data.get('wormholes', [])
+    _check(isinstance(items, list), path, '"wormholes" must be a list')
+    for i in range(len(items)):
+        w = items[i]
+        where = 'wormhole pair %d' % i
+        _check(isinstance(w, dict) and sorted(w.keys()) == ['a', 'b'], path,
+               where + ' must be an object with "a" and "b"')
+        wormholes.append((_point(w['a'], path, where + ' "a"'), _point(w['b'], path, where + ' "b"')))
+    return LevelSpec(data['name'], key, data['background'], start, finish, planets, wormholes)
+
+
+def read_file(path):
+    """Returns the contents of the JSON or TOML file path as a dict.
+    """
+    if path.endswith('.toml'):
+        _check(tomllib != None, path, 'TOML level files need Python 3.11 or later')
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    with open(path) as f:
+        return json.load(f)
+
+
+def read_registry(path=LEVEL_REGISTRY):
+    """Returns a list of (key, file) tuples from the registry file path, in play
+    order, with each file as a full path.
+    """
+    data = read_file(path)
+    _check(isinstance(data, dict) and isinstance(data.get('levels'), list), path,
+           'the registry must be an object with a "levels" list')
+    folder = os.path.dirname(path)
+    entries = []
+    keys = set()
+    for e in data['levels']:
+        _check(isinstance(e, dict) and isinstance(e.get('key'), str) and isinstance(e.get('file'), str),
+               path, 'each level needs a "key" and a "file"')
+        _check(len(e['key']) == 1, path, 'level key "%s" must be one character' % e['key'])
+        _check(e['key'] not in keys, path, 'level key "%s" is used twice' % e['key'])
+        keys.add(e['key'])
+        entries.append((e['key'], os.path.join(folder, e['file'])))
+    return entries
+
+
+def source_stamp(path=LEVEL_REGISTRY):
+    """Returns a hash of the name, modification time and length of the registry
+    file path and of every level file it lists, without reading the level files.
+    The compiled cache is rebuilt when this changes.
+    """
+    h = hashlib.sha1()
+    for name in [path] + [name for key, name in read_registry(path)]:
+        stat = os.stat(name)
+        h.update(('%s|%d|%d\n' % (name, stat.st_mtime_ns, stat.st_size)).encode('utf-8'))
+    return h.digest()
+
+
+def _pack_str(s):
+    """Returns the string s as bytes: a 2 byte length and then UTF-8 text.
+    """
+    data = s.encode('utf-8')
+    return struct.pack('<H', len(data)) + data
+
+
+def _unpack_str(buf, pos):
+    """Returns a tuple (string, new position) for the string stored at pos in buf.
+    """
+    n = struct.unpack_from('<H', buf, pos)[0]
+    return (buf[pos+2:pos+2+n].decode('utf-8'), pos + 2 + n)
+
+
+def _pack_level(spec):
+    """Returns the compiled bytes for the LevelSpec spec.
+    """
+    out = [struct.pack('<4d', spec.start[0], spec.start[1], spec.finish[0], spec.finish[1])]
+    out.append(struct.pack('<H', len(spec.planets)))
+    for p in spec.planets:
+        out.append(struct.pack('<4d', p[0], p[1], p[2], p[3]))
+        out.append(_pack_str(p[4]))
+    out.append(struct.pack('<H', len(spec.wormholes)))
+    for a, b in spec.wormholes:
+        out.append(struct.pack('<4d', a[0], a[1], b[0], b[1]))
+    return b''.join(out)
+
+
+def compile_levels(registry=LEVEL_REGISTRY, cache=LEVEL_CACHE):
+    """Reads and checks every level in registry and writes them to the compiled
+    file cache.
+
+    The file holds a header (magic, version, source stamp, level count), an index
+    with each level's key, name, background and record offset, and then one
+    record per level.
+    """
+    specs = [parse_level(read_file(name), key, name) for key, name in read_registry(registry)]
+    records = [_pack_level(s) for s in specs]
+    index = []
+    for s in specs:
+        index.append(_pack_str(s.key) + _pack_str(s.name) + _pack_str(s.background))
+    head = _MAGIC + struct.pack('<H', _VERSION) + source_stamp(registry) + struct.pack('<H', len(specs))
+    start = len(head) + sum(len(i) for i in index) + 4*(len(specs) + 1)
+    offsets = [start]
+    for r in records:
+        offsets.append(offsets[-1] + len(r))
+    data = head + b''.join(index) + struct.pack('<%dI' % len(offsets), *offsets) + b''.join(records)
+    folder = os.path.dirname(cache)
+    os.makedirs(folder, exist_ok=True)
+    # another process may be rebuilding the same cache, so each writes its own
+    # temporary file and the last rename wins
+    temp = '%s.%d.tmp' % (cache, os.getpid())
+    with open(temp, 'wb') as f:
+        f.write(data)
+    os.replace(temp, cache)
+    return data
+
+
+class LevelRegistry(object):
+    """The levels of the game, decoded lazily from the compiled level file.
+
+    Level numbers start at 1, as in Planets._level; number 0 is the title screen.
+
+    ATTRIBUTES:
+        _data   [bytes] the compiled level file
+        _keys   [list of str] the title screen key of each level
+        _names  [list of str] the name of each level
+        _backgrounds [list of str] the background image of each level
+        _offsets [list of int] where each level's record starts in _data, plus the
+            end of the last one
+        _specs  [dict] maps a level number to its LevelSpec, once decoded
+    """
+
+    def __init__(self, registry=LEVEL_REGISTRY, cache=LEVEL_CACHE):
+        """Initializer: Reads the index of the compiled level file cache,
+        compiling it first if it is missing or older than the level files.
+        """
+        data = None
+        if os.path.exists(cache):
+            with open(cache, 'rb') as f:
+                data = f.read()
+            fresh = data[:4] == _MAGIC and struct.unpack_from('<H', data, 4)[0] == _VERSION
+            if not fresh or data[6:26] != source_stamp(registry):
+                data = None
+        if data == None:
+            data = compile_levels(registry, cache)
+        self._data = data
+        count = struct.unpack_from('<H', data, 26)[0]
+        pos = 28
+        self._keys = []
+        self._names = []
+        self._backgrounds = []
+        for i in range(count):
+            key, pos = _unpack_str(data, pos)
+            name, pos = _unpack_str(data, pos)
+            background, pos = _unpack_str(data, pos)
+            self._keys.append(key)
+            self._names.append(name)
+            self._backgrounds.append(background)
+        self._offsets = list(struct.unpack_from('<%dI' % (count + 1), data, pos))
+        self._specs = {}
+
+
+    def __len__(self):
+        """Returns the number of levels.
+        """
+        return len(self._keys)
+
+
+    def key(self, level):
+        return self._keys[level - 1]
+
+
+    def name(self, level):
+        return self._names[level - 1]
+
+
+    def background(self, level):
+        return self._backgrounds[level - 1]
+
+
+    def find_key(self, key):
+        """Returns the number of the level started by key, or 0 if there is none.
+        """
+        if key in self._keys:
+            return self._keys.index(key) + 1
+        return 0
+
+
+    def find_name(self, name):
+        """Returns the number of the level called name, or 0 if there is none.
+        """
+        if name in self._names:
+            return self._names.index(name) + 1
+        return 0
+
+
+    def spec(self, level):
+        """Returns the LevelSpec of level number level, decoding it the first time.
+        """
+        if level not in self._specs:
+            self._specs[level] = self._decode(level)
+        return self._specs[level]
+
+
+    def _decode(self, level):
+        """Helper to spec.
+        Returns a new LevelSpec decoded from the record of level number level.
+        """
+        data = self._data
+        pos = self._offsets[level - 1]
+        sx, sy, fx, fy = struct.unpack_from('<4d', data, pos)
+        pos += 32
+        planets = []
+        n = struct.unpack_from('<H', data, pos)[0]
+        pos += 2
+        for i in range(n):
+            x, y, m, r = struct.unpack_from('<4d', data, pos)
+            image, pos = _unpack_str(data, pos + 32)
+            planets.append((x, y, m, r, image))
+        wormholes = []
+        n = struct.unpack_from('<H', data, pos)[0]
+        pos += 2
+        for i in range(n):
+            x1, y1, x2, y2 = struct.unpack_from('<4d', data, pos)
+            pos += 32
+            wormholes.append(((x1, y1), (x2, y2)))
+        return LevelSpec(self._names[level - 1], self._keys[level - 1], self._backgrounds[level - 1],
+                         (sx, sy), (fx, fy), planets, wormholes)
+
+
+#: the registry used by the game, created by get_registry
+_REGISTRY = None
+
+
+def get_registry():
+    """Returns the game's LevelRegistry, creating it the first time.
+    """
+    global _REGISTRY
+    if _REGISTRY == None:
+        _REGISTRY = LevelRegistry()
+    return _REGISTRY
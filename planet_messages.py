@@ -0,0 +1,68 @@
+# planet_messages.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the on-screen messages for the Planets game. They are
+GLabel objects, so unlike planet_constants.py this module needs game2d."""
+
+from planet_constants import *
+from game2d import *
+from planet_levels import get_registry
+
+
+def key_rows(keys):
+    """Returns the text listing the level keys keys for the title screen. A new row
+    starts after 9 keys, or where the keys stop running in order (9 then A).
+    """
+    rows = []
+    for k in keys:
+        if len(rows) == 0 or len(rows[-1]) == 9 or ord(k) != ord(rows[-1][-1]) + 1:
+            rows.append([])
+        rows[-1].append(k)
+    return '\n'.join('   '.join(row).upper() for row in rows)
+
+
+##### Messages
+#: list of title screen messages
+clear = colormodel.RGB(0,0,0,0)
+gray = colormodel.RGB(0,0,0, a= 100)
+TITLE_1 = GLabel(text="PLANETS",font_size=120,font_name="good times rg.ttf",\
+                 x=.5*GAME_WIDTH,y=.65*GAME_HEIGHT,linecolor=colormodel.BLUE,fillcolor=clear)
+TITLE_2 = GLabel(text="USE DIRECTIONAL PAD TO NAVIGATE YOUR SHIP TO THE FINISH",\
+                 font_size=24,font_name="good times rg.ttf",\
+                 x=.5*GAME_WIDTH,y=.4*GAME_HEIGHT,linecolor=colormodel.WHITE,fillcolor=gray)
+TITLE_3 = GLabel(text="Tap a key to pick a level:",\
+                 font_size=24,font_name="good times rg.ttf",\
+                 x=.5*GAME_WIDTH,y=.2*GAME_HEIGHT,linecolor=colormodel.WHITE,fillcolor=gray)
+#: ready state message
+READY_1 = GLabel(text="TO INFINITY AND BEYOND!",font_size=48,font_name="good times rg.ttf",\
+                 x=.5*GAME_WIDTH,y=.5*GAME_HEIGHT,linecolor=colormodel.WHITE,fillcolor=gray)
+#: fail state message
+FAIL_1 = GLabel(text="EPIC FAIL",font_size=48,font_name="good times rg.ttf",\
+                x=.5*GAME_WIDTH,y=.6*GAME_HEIGHT,linecolor=colormodel.WHITE,fillcolor=gray)
+FAIL_2 = GLabel(text="PRESS SPACE TO TRY AGAIN\nHOLD Z TO REWIND\nPRESS R TO WATCH A REPLAY\nPRESS M TO RETURN TO MENU",\
+                font_size=36,font_name="good times rg.ttf",\
+                x=.5*GAME_WIDTH,y=.3*GAME_HEIGHT,linecolor=colormodel.WHITE,fillcolor=gray)
+#: complete state messages
+COMPLETE_1 = GLabel(text="YOU WIN!",font_size=72,font_name="good times rg.ttf",\
+                x=.5*GAME_WIDTH,y=.6*GAME_HEIGHT,linecolor=colormodel.BLUE,fillcolor=gray)
+COMPLETE_2 = GLabel(text="PRESS SPACE TO PROCEED TO NEXT LEVEL\nPRESS R TO WATCH A REPLAY\nPRESS M TO RETURN TO MENU",\
+                font_size=36,font_name="good times rg.ttf",\
+                x=.5*GAME_WIDTH,y=.3*GAME_HEIGHT,linecolor=colormodel.BLUE,fillcolor=gray)
+
+
+#: the title screen message listing the level keys, made by title_keys
+_TITLE_4 = None
+
+
+def title_keys():
+    """Returns the title screen message listing the level keys, making it the
+    first time, so that importing this module does not read the levels.
+    """
+    global _TITLE_4
+    if _TITLE_4 == None:
+        registry = get_registry()
+        _TITLE_4 = GLabel(text=key_rows([registry.key(n) for n in range(1, len(registry) + 1)]),\
+                          font_size=24,font_name="good times rg.ttf",\
+                          x=.5*GAME_WIDTH,y=.1*GAME_HEIGHT,linecolor=colormodel.WHITE,fillcolor=gray)
+    return _TITLE_4
@@ -6,6 +6,9 @@
 wormholes."""
 
 from planet_constants import *
+from planet_physics import *
+from planet_sprites import sprite_frame
+from planet_assets import asset_source
 from game2d import *
 
 
@@ -13,6 +16,11 @@ class Ship(GImage):
     """The spaceship that the player controls. The player gives it thrust by
     pressing the arrow keys to help it reach the finish point.
     
+    This class is a view of a Body from planet_physics, which holds the ship's
+    position, velocity, orientation and teleporting state. The physics functions
+    change the body; the method sync copies the body's position and orientation
+    onto the image so that it is drawn in the right place.
+    
     This class contains methods to move the ship, accelerate the ship in the
     x direction, accelerate the ship in the y direction, switch the ship's
     frame to thrust, and switch the ship's frame to no thrust.
@@ -20,70 +28,151 @@ class Ship(GImage):
     ATTRIBUTES:
     
         _mass   [int or float>=0] the ship's mass
-        _xv     [int or float>=0] the ship's x velocity
-        _yv     [int or float>=0] the ship's y velocity
-        _teleporting    [Boolean] True if ship is currently teleporting, False
-            otherwise
+        _body   [Body object] the ship's physical state
+        _sprite [GSprite object or None] the ship drawn from the atlas made by
+            planet_sprites, or None if the ship image is drawn rotated
+        _thrusting [bool] True if the ship thrusted on the last tick
+    
+    When the ship has a sprite, it is drawn as the atlas frame for its angle and
+    thrust instead of as its rotated image.
     """
     
     def __init__(self, xpos, ypos):
         """Initializer: Creates a new ship at the starting point of the level.
         """
-        GImage.__init__(self, width=SHIP_WIDTH, height=SHIP_HEIGHT, x=xpos, y=ypos, source=SHIP_IMAGE)
+        GImage.__init__(self, width=SHIP_WIDTH, height=SHIP_HEIGHT, x=xpos, y=ypos,\
+                        source=asset_source(SHIP_IMAGE, (SHIP_WIDTH, SHIP_HEIGHT)))
         self._mass = SHIP_MASS
-        self._xv = 0.0
-        self._yv = 0.0
-        self._teleporting = False
+        self._body = Body(xpos, ypos)
+        self._sprite = None
+        self._thrusting = False
     
     
     def get_mass(self):
         return self._mass
     
     
+    def get_body(self):
+        return self._body
+    
+    
     def get_xv(self):
-        return self._xv
+        return self._body.xv
     
     
     def get_yv(self):
-        return self._yv
+        return self._body.yv
     
     
     def get_teleport(self):
-        return self._teleporting
+        return self._body.teleporting
     
     
     def set_xv(self, v):
         """Sets the ship's x velocity to v.
         """
-        self._xv = v
+        self._body.xv = v
     
     
     def set_yv(self, v):
         """Sets the ship's y velocity to v.
         """
-        self._yv = v
+        self._body.yv = v
+    
+    
+    def get_thrust(self):
+        return self._thrusting
+    
+    
+    def place(self, x, y, angle, thrusting):
+        """Draws the ship at (x,y), facing angle, thrusting or not, without changing
+        its body. Used to draw the ship between two physics ticks.
+        """
+        self.x = x
+        self.y = y
+        self.angle = angle
+        self._thrusting = thrusting
+    
+    
+    def set_thrust(self, fact):
+        """Switches the ship's frame to thrust if fact is True, and to no thrust
+        otherwise.
+        """
+        self._thrusting = fact
+    
+    
+    def use_atlas(self, atlas):
+        """Draws the ship from the atlas atlas, a tuple (path, rows, columns, cell)
+        from planet_sprites.ship_atlas, or as its rotated image if atlas is None.
+        Returns True if the ship is drawn from the atlas.
+        """
+        self._sprite = None
+        if atlas == None:
+            return False
+        try:
+            from game2d import GSprite
+        except ImportError:
+            return False
+        path, rows, columns, cell = atlas
+        self._sprite = GSprite(x=self.x, y=self.y, width=cell, height=cell, source=path,\
+                               format=(rows, columns))
+        return True
+    
+    
+    def draw(self, view):
+        """Draws the ship into view, as its atlas frame if it has a sprite.
+        """
+        if self._sprite == None:
+            GImage.draw(self, view)
+            return
+        sprite = self._sprite
+        sprite.x = self.x
+        sprite.y = self.y
+        frame = sprite_frame(self.angle, self._thrusting)
+        if sprite.frame != frame:
+            sprite.frame = frame
+        sprite.draw(view)
     
     
     def set_teleport(self, fact):
         """Sets the ship's teleporting attribute to fact.
             fact must be a boolean"""
-        self._teleporting = fact
+        self._body.teleporting = fact
+    
+    
+    def set_position(self, x, y):
+        """Moves the ship to the point (x,y).
+        """
+        self._body.x = float(x)
+        self._body.y = float(y)
+        self._body.px = self._body.x
+        self._body.py = self._body.y
+        self.sync()
+    
+    
+    def sync(self):
+        """Copies the position and orientation of the ship's body onto the image.
+        Call this method after changing the body directly.
+        """
+        self.x = self._body.x
+        self.y = self._body.y
+        self.angle = self._body.angle
     
     
     def move_ship(self):
         """Adds the ship's current x velocity to its x position and its y velocity
         to its y position.
         """
-        self.x += self._xv
-        self.y += self._yv
+        move(self._body)
+        self.sync()
     
     
     def accel_ship(self, x_accel, y_accel):
         """Adds x_accel to the ship's x velocity and adds y_accel to the ship's y
         velocity.
         """
-        self._xv += x_accel
-        self._yv += y_accel
+        self._body.xv += x_accel
+        self._body.yv += y_accel
     
     
     
@@ -104,7 +193,7 @@ class Planet(GImage):
         """Initializer: Creates a planet with radius r, mass m, position (xpos,ypos),
         and source image src.
         """
-        GImage.__init__(self, width=2*r, height=2*r, x=xpos, y=ypos, source=src)
+        GImage.__init__(self, width=2*r, height=2*r, x=xpos, y=ypos, source=asset_source(src, (2*r, 2*r)))
         self._mass = m
         self._radius = r
     
@@ -113,6 +202,10 @@ class Planet(GImage):
         return self._mass
     
     
+    def get_radius(self):
+        return self._radius
+    
+    
     def p_distance(self, obj):
         """Returns the distance between the planet and the GImage object obj.
         """
@@ -168,7 +261,8 @@ class Wormhole(GImage):
     """
     
     def __init__(self, xpos, ypos):
-        GImage.__init__(self, width=WORM_D, height=WORM_D, x=xpos, y=ypos, source=WORMHOLE)
+        GImage.__init__(self, width=WORM_D, height=WORM_D, x=xpos, y=ypos,\
+                        source=asset_source(WORMHOLE, (WORM_D, WORM_D)))
         self._sister = None
         self._radius = 0.5*WORM_D
     
@@ -177,6 +271,10 @@ class Wormhole(GImage):
         return self._sister
     
     
+    def get_radius(self):
+        return self._radius
+    
+    
     def w_distance(self, obj):
         """Returns the distance between the wormhole and the GImage object obj.
         """
@@ -0,0 +1,178 @@
+# planet_music.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the music playlist for the Planets game.
+
+The songs are long WAV files. Making a Sound reads the whole file, and doing that
+from disk at the moment one song ends made the game stop for a moment. A Playlist
+instead makes the next song's Sound on a background thread, starting
+MUSIC_PREFETCH seconds before the current song ends. The thread first reads the
+file in chunks of MUSIC_CHUNK bytes, so that the long read from disk is made of
+short system calls, and then makes the Sound from the file, now in the operating
+system's file cache. game2d's Sound loads through kivy's SoundLoader, which does
+not need the window's graphics context, so it can be made off the main thread.
+Only the first song is made on a frame; after that, the frame on which the song
+changes only has to call play. If the next Sound is not ready in time, the
+current song ends and the next one starts on the first frame after it is ready,
+rather than making the frame wait for it.
+
+The length of each song comes from its WAV header rather than from a table, and
+the time played is measured with the real clock rather than by adding up frame
+times, so that it does not drift from the audio. The next song is started on the
+frame closest to the end of the current one, so there is no gap between them
+longer than half a frame.
+
+game2d is only imported when a Sound is made, so this module can be used without
+it by passing a different make_sound."""
+
+import os
+import threading
+import time
+import wave
+from planet_constants import *
+
+
+def sound_path(source):
+    """Returns the path of the sound file source in SOUND_DIR.
+    """
+    return os.path.join(SOUND_DIR, source)
+
+
+def wav_duration(path):
+    """Returns the length in seconds of the WAV file path, read from its header,
+    or None if the file cannot be read as a WAV file.
+    """
+    try:
+        with wave.open(path, 'rb') as f:
+            return f.getnframes() / float(f.getframerate())
+    except (IOError, EOFError, wave.Error):
+        return None
+
+
+def warm_file(path, chunk=MUSIC_CHUNK):
+    """Reads the file path chunk bytes at a time, keeping none of it, so that it
+    is in the system's file cache when it is next opened. Returns the number of
+    bytes read, or None if it cannot be read. Reading in chunks keeps each system
+    call short, so the reading thread never holds up the game for long.
+    """
+    total = 0
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(chunk)
+                if not data:
+                    break
+                total += len(data)
+    except IOError:
+        return None
+    return total
+
+
+def _game_sound(source):
+    """Returns a new game2d Sound for the file source.
+    """
+    from game2d import Sound
+    return Sound(source)
+
+
+class Playlist(object):
+    """Plays a list of songs one after another, forever.
+
+    ATTRIBUTES:
+        songs   [list of str] the song files, in SOUND_DIR
+        volumes [list of float] the volume of each song
+        index   [int] the position in songs of the song playing, -1 before the first
+        _durations [list of float or None] the length of each song, once known
+        _sound  [Sound or None] the song playing
+        _next   [Sound or None] the next song, made ahead of time by _thread; it
+            is set in one assignment once the Sound is ready
+        _started [float] the clock time at which the current song started
+        _thread [Thread or None] the thread making the next song, kept until that
+            song starts
+        _make   [function] makes a Sound from a file name
+        _clock  [function] returns the time in seconds
+    """
+
+    def __init__(self, songs=SONGS, volumes=SOUND_VOLUME, make_sound=None, clock=time.perf_counter):
+        self.songs = list(songs)
+        self.volumes = list(volumes)
+        self.index = -1
+        self._durations = [None]*len(self.songs)
+        self._sound = None
+        self._next = None
+        self._started = 0.0
+        self._thread = None
+        self._make = make_sound if make_sound != None else _game_sound
+        self._clock = clock
+
+
+    def duration(self, index):
+        """Returns the length in seconds of song index, from its WAV header, or
+        from SOUND_LENGTH if the header cannot be read.
+        """
+        if self._durations[index] == None:
+            length = wav_duration(sound_path(self.songs[index]))
+            if length == None:
+                length = SOUND_LENGTH[index]
+            self._durations[index] = length
+        return self._durations[index]
+
+
+    def remaining(self):
+        """Returns the seconds left in the current song.
+        """
+        if self.index < 0:
+            return 0.0
+        return self.duration(self.index) - (self._clock() - self._started)
+
+
+    def update(self, dt):
+        """Keeps the music going; call it once a frame, where dt is the time since
+        the last frame. Starts making the next song's Sound in the background when
+        the current one is near its end, and starts it on the frame closest to the
+        end of the current song, or on the first frame after that on which it is
+        ready. Only the first song's Sound is made here.
+        """
+        if self.index < 0:
+            self._start(0, self._make(self.songs[0]))
+            return
+        left = self.remaining()
+        following = (self.index + 1) % len(self.songs)
+        if left <= MUSIC_PREFETCH and self._thread == None:
+            self._thread = threading.Thread(target=self._prefetch, args=(following,), name='music-prefetch')
+            self._thread.daemon = True
+            self._thread.start()
+        sound = self._next
+        if left <= 0.5*dt and sound != None:
+            self._next = None
+            self._thread = None
+            when = self._started + self.duration(self.index)
+            if self._clock() - when > dt:
+                when = None
+            self._start(following, sound, when)
+
+
+    def _start(self, index, sound, when=None):
+        """Helper to update.
+        Plays sound as song index, counting its time from the clock time when (now
+        if None), so that the small error of starting on a frame is not added up.
+        update passes None if the song starts more than a frame late, because
+        the game was held up or the Sound was not ready, so that it does not then
+        cut the song short to catch up.
+        """
+        self.index = index
+        self._sound = sound
+        sound.volume = self.volumes[index]
+        sound.play()
+        self._started = self._clock() if when == None else when
+
+
+    def _prefetch(self, index):
+        """Helper to update; the body of the background thread.
+        Reads the file of song index into the system's file cache and reads its
+        length, then makes its Sound and hands it to update through _next.
+        """
+        warm_file(sound_path(self.songs[index]))
+        self.duration(index)
+        self._next = self._make(self.songs[index])
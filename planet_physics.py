@@ -0,0 +1,483 @@
+# planet_physics.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the headless physics core of the Planets game.
+
+A Body holds the state of one ship and a Level holds the geometry of one level,
+both as plain numbers. The functions in this module advance a Body through a
+Level with exactly the rules that a Play object uses, because Play calls these
+same functions:
+
+    advance     move, gravity, thrust and the velocity flip at the screen edge
+                (Play.update_ship)
+    teleport    the wormhole latch (Play.teleport)
+    finished    reaching the finish area (Play.finish)
+    collided    hitting a planet or leaving the screen (Play.planet_collide)
+    step        all of the above, in the order used by Planets._active
+
+A step is one physics tick of TICK seconds. It can be split into substeps, and it
+can use either the original integrator (EULER, one move followed by one kick)
+or velocity Verlet (VERLET), which keeps the energy error bounded near heavy
+planets. A Clock turns the frame times given to Planets.update into a whole
+number of ticks, so the game runs the same at any frame rate.
+
+With swept testing (SWEPT), teleport, finished and collided look at the whole
+straight path of the body's last move rather than only its end point, and the
+earliest of entering a wormhole, the finish area or a planet decides what happens.
+A fast body therefore cannot tunnel through a small planet or the finish, which
+allows larger steps. It is off by default: runs that the original game let
+tunnel through a planet or out of a wormhole loop would end differently.
+
+This module does not import game2d, so simulations can run without a display.
+While a profiler is counting (see count_into and planet_profile), field, contact
+and collided add to its counters. Counting is turned on for one thread at a time,
+so work done by the game thread and by a simulation thread is never mixed."""
+
+import threading
+from planet_constants import *
+from planet_kernel import *
+from planet_grid import *
+from planet_quadtree import *
+from planet_lattice import *
+
+class _Counting(threading.local):
+    """The counters that physics work on the current thread is added to.
+
+    ATTRIBUTES:
+        counts  [dict or None] the counters, or None when this thread is not
+            counting
+    """
+    counts = None
+
+
+#: the counting state of each thread
+_COUNTING = _Counting()
+
+
+def count_into(counts):
+    """Makes field, contact and collided, when they run on the calling thread,
+    add to the dict counts, which must have the keys 'gravity', 'sweeps' and
+    'collisions'. If counts is None they stop counting on this thread. Other
+    threads are not affected.
+    """
+    _COUNTING.counts = counts
+
+
+class Body(object):
+    """The state of a single ship.
+
+    ATTRIBUTES:
+        x           [float] the ship's x position
+        y           [float] the ship's y position
+        xv          [float] the ship's x velocity
+        yv          [float] the ship's y velocity
+        angle       [int] the ship's orientation in degrees (one of 0, 45, ..., 315)
+        teleporting [bool] True if the ship is inside a wormhole it came out of
+        px          [float] the ship's x position before its last move
+        py          [float] the ship's y position before its last move
+        _field      [tuple or None] the last kernel result, stored as (x, y, result)
+            so that it can be reused while the ship has not moved
+        _sweep      [tuple or None] the last swept test, stored as (px, py, x, y,
+            result) so that it can be reused while the ship has not moved
+    """
+
+    def __init__(self, x, y):
+        """Initializer: Creates a ship at rest at position (x,y).
+        """
+        self.x = float(x)
+        self.y = float(y)
+        self.xv = 0.0
+        self.yv = 0.0
+        self.angle = 0
+        self.teleporting = False
+        self.px = self.x
+        self.py = self.y
+        self._field = None
+        self._sweep = None
+
+
+    def copy(self):
+        """Returns a new Body with the same state as this one.
+        """
+        other = Body(self.x, self.y)
+        other.xv = self.xv
+        other.yv = self.yv
+        other.angle = self.angle
+        other.teleporting = self.teleporting
+        other.px = self.px
+        other.py = self.py
+        other._field = self._field
+        other._sweep = self._sweep
+        return other
+
+
+class Level(object):
+    """The geometry of a single level.
+
+    ATTRIBUTES:
+        startx  [float] x position of the start point
+        starty  [float] y position of the start point
+        finishx [float] x position of the center of the finish area
+        finishy [float] y position of the center of the finish area
+        finishw [float] half the width of the finish area
+        finishh [float] half the height of the finish area
+        planets [list of (x, y, m, r) tuples] the planets in the level
+        wormholes [list of ((x1, y1), (x2, y2)) tuples] the wormhole pairs in
+            the level
+        table   [PlanetTable object] array form of the planets and wormholes
+        warp_hit [bool array] for each wormhole in table, True if a ship that comes
+            out of its sister is immediately inside a planet or off the screen
+        grid    [SpatialGrid object or None] spatial index of table, built only for
+            levels with at least GRID_MIN planets and wormholes
+        tree    [QuadTree object or None] Barnes-Hut tree for gravity, or None if
+            gravity is summed exactly over every planet
+        lattice [GravityLattice object or None] precomputed gravity samples; if
+            set, gravity is interpolated from it instead of summed or taken from
+            the tree
+    """
+
+    def __init__(self, start, finish, planets=None, wormholes=None):
+        """Initializer: Creates a level.
+
+        PARAMETERS:
+            start   [(x, y) tuple] position of the start point
+            finish  [(x, y) tuple] center of the finish area
+            planets [list of (x, y, m, r) tuples or None] the planets in the level
+            wormholes [list of ((x1, y1), (x2, y2)) tuples or None] the wormhole
+                pairs in the level
+        """
+        self.startx = float(start[0])
+        self.starty = float(start[1])
+        self.finishx = float(finish[0])
+        self.finishy = float(finish[1])
+        self.finishw = 0.5*FINISH_WIDTH
+        self.finishh = 0.5*FINISH_HEIGHT
+        self.planets = list(planets) if planets != None else []
+        self.wormholes = list(wormholes) if wormholes != None else []
+        worms = []
+        for a, b in self.wormholes:
+            i = len(worms)
+            worms.append((a[0], a[1], 0.5*WORM_D, i+1))
+            worms.append((b[0], b[1], 0.5*WORM_D, i))
+        self.table = PlanetTable(self.planets, worms)
+        t = self.table
+        self.grid = None
+        if len(t.px) + len(t.wx) >= GRID_MIN:
+            self.grid = SpatialGrid(t)
+        self.warp_hit = np.zeros(len(t.wx), dtype=bool)
+        for i in range(len(t.wx)):
+            s = t.sister[i]
+            self.warp_hit[i] = ship_field(t, t.wx[s], t.wy[s])[2] or off_screen(t.wx[s], t.wy[s])
+        self.tree = None
+        if BARNES_HUT:
+            self.set_theta(BH_THETA)
+        self.lattice = None
+        if LATTICE:
+            self.use_lattice(LATTICE_STEP)
+
+
+    def set_theta(self, theta, smallest=BH_MIN):
+        """Sets the gravity mode of this level.
+
+        If theta is None, or the level has fewer than smallest massive planets,
+        gravity is the exact sum over every planet. Otherwise it comes from a
+        Barnes-Hut tree with opening angle theta.
+        """
+        self.tree = None
+        if theta != None and (self.table.gm != 0).sum() >= smallest:
+            self.tree = QuadTree(self.table, theta)
+
+
+    def use_lattice(self, step):
+        """Makes gravity come from a lattice with samples step apart, loaded from
+        the disk cache or computed and cached now. If step is None, gravity goes
+        back to the exact sum (or the tree).
+        """
+        self.lattice = None
+        if step != None:
+            self.lattice = GravityLattice(self.table, step)
+
+
+    def new_body(self):
+        """Returns a new Body at rest on this level's start point.
+        """
+        return Body(self.startx, self.starty)
+
+
+    def finish_time(self, x0, y0, x1, y1):
+        """Returns the earliest time in [0,1] at which the straight path from
+        (x0,y0) to (x1,y1) is inside the finish area, or inf if it never is.
+        """
+        return box_time(x0, y0, x1, y1, self.finishx, self.finishy, self.finishw, self.finishh)
+
+
+def off_screen(x, y):
+    """Returns True where the point (x,y) is outside of the game window. Works for
+    both numbers and arrays.
+    """
+    return (x > GAME_WIDTH) | (x < 0) | (y > GAME_HEIGHT) | (y < 0)
+
+
+def field(level, body):
+    """Returns the kernel result (ax, ay, hit, warp) for the current position of
+    body. The result is reused until the body moves, so gravity, teleport and
+    collided share a single kernel call in most steps.
+    """
+    f = body._field
+    if f == None or f[0] != body.x or f[1] != body.y:
+        planets = None
+        worms = None
+        if level.grid != None:
+            planets, worms = level.grid.query(body.x, body.y, body.x, body.y)
+        if level.lattice != None:
+            ax, ay = level.lattice.interpolate(body.x, body.y)
+            hit, warp = ship_contact(level.table, body.x, body.y, planets, worms)
+            f = (body.x, body.y, (float(ax), float(ay), hit, warp))
+        elif level.tree != None:
+            ax, ay = level.tree.accel(body.x, body.y)
+            hit, warp = ship_contact(level.table, body.x, body.y, planets, worms)
+            f = (body.x, body.y, (float(ax[0]), float(ay[0]), hit, warp))
+        else:
+            f = (body.x, body.y, ship_field(level.table, body.x, body.y, planets, worms))
+        body._field = f
+        counts = _COUNTING.counts
+        if counts is not None:
+            counts['gravity'] += 1
+    return f[2]
+
+
+def contact(level, body):
+    """Returns a tuple (tp, tf, tw, warp) for the straight path of the body's last
+    move, from (px,py) to (x,y): the earliest times in [0,1] at which the body is
+    inside a planet, the finish area and a wormhole (inf if never), and the index
+    of that wormhole (-1 if none). The result is reused until the body moves.
+    """
+    s = body._sweep
+    if s == None or s[0] != body.px or s[1] != body.py or s[2] != body.x or s[3] != body.y:
+        planets = None
+        worms = None
+        if level.grid != None:
+            planets, worms = level.grid.query(body.px, body.py, body.x, body.y)
+        tp, tw, warp = ship_sweep(level.table, body.px, body.py, body.x, body.y, planets, worms)
+        tf = level.finish_time(body.px, body.py, body.x, body.y)
+        s = (body.px, body.py, body.x, body.y, (tp, tf, tw, warp))
+        body._sweep = s
+        counts = _COUNTING.counts
+        if counts is not None:
+            counts['sweeps'] += 1
+    return s[4]
+
+
+def move(body, h=1.0):
+    """Adds h times the body's velocity to its position. The old position is kept
+    in px and py for swept testing.
+    """
+    body.px = body.x
+    body.py = body.y
+    body.x += h*body.xv
+    body.y += h*body.yv
+
+
+def gravity(level, body, h=1.0):
+    """Accelerates the body for h ticks with gravity from every planet in level.
+    """
+    ax, ay, hit, warp = field(level, body)
+    body.xv += h*ax
+    body.yv += h*ay
+
+
+def thrust(body, code, h=1.0):
+    """Accelerates the body for h ticks and rotates it for the thrust code code.
+    If no arrow key is held, this function does nothing.
+    """
+    angle, ax, ay = THRUST[code]
+    if angle >= 0:
+        body.angle = angle
+        body.xv += h*ax
+        body.yv += h*ay
+
+
+def bounce(body):
+    """Negates the body's x velocity if it is outside the game's x bounds and its
+    y velocity if it is outside the game's y bounds.
+    """
+    if body.x < 0 or body.x > GAME_WIDTH:
+        body.xv = -body.xv
+    if body.y < 0 or body.y > GAME_HEIGHT:
+        body.yv = -body.yv
+
+
+def advance(level, body, code, h=1.0, method=EULER):
+    """Moves the body forward h ticks with thrust code code, then bounces it.
+
+    With EULER this is move, gravity, thrust, which is exactly the original
+    per-frame update when h is 1. With VERLET it is half a kick, a move and
+    another half kick; the gravity at the start of the move is usually the one
+    already computed at the end of the last move, so both integrators need about
+    one kernel call per substep.
+    """
+    if method == VERLET:
+        gravity(level, body, 0.5*h)
+        thrust(body, code, 0.5*h)
+        move(body, h)
+        gravity(level, body, 0.5*h)
+        thrust(body, code, 0.5*h)
+    else:
+        move(body, h)
+        gravity(level, body, h)
+        thrust(body, code, h)
+    bounce(body)
+
+
+def energy(level, body):
+    """Returns the energy of the body per unit mass: its kinetic energy plus its
+    potential energy in the gravity of every planet in level.
+    """
+    t = level.table
+    e = 0.5*(body.xv*body.xv + body.yv*body.yv)
+    if len(t.px) > 0:
+        d = np.sqrt((body.x - t.px)**2 + (body.y - t.py)**2)
+        e -= float((t.gm / d).sum())
+    return e
+
+
+def teleport(level, body, swept=False):
+    """Moves the body through a wormhole.
+    If the body touches a wormhole and is not teleporting, it is moved to that
+    wormhole's sister and starts teleporting. It stops teleporting once it is not
+    touching any wormhole.
+
+    If swept is True, the body teleports if its last move entered a wormhole
+    before it entered a planet or the finish area, even if it has already left
+    that wormhole again.
+    """
+    if len(level.table.wx) > 0:
+        warp = field(level, body)[3]
+        if swept and not body.teleporting:
+            tp, tf, tw, warp = contact(level, body)
+            if tw > tp or tw > tf:
+                warp = -1
+        if warp >= 0 and (not body.teleporting):
+            s = level.table.sister[warp]
+            body.teleporting = True
+            body.x = float(level.table.wx[s])
+            body.y = float(level.table.wy[s])
+            body.px = body.x
+            body.py = body.y
+        elif field(level, body)[3] < 0:
+            body.teleporting = False
+
+
+def finished(level, body, swept=False):
+    """Returns True if the body is inside the finish area. Like GImage.contains,
+    the edges of the area do not count.
+
+    If swept is True, this is also True if the body's last move passed through the
+    finish area before it hit a planet.
+    """
+    if swept:
+        tp, tf, tw, warp = contact(level, body)
+        return tf <= 1.0 and tf <= tp
+    return abs(body.x - level.finishx) < level.finishw and abs(body.y - level.finishy) < level.finishh
+
+
+def collided(level, body, swept=False):
+    """Returns True if the body is inside a planet or outside the game window.
+
+    If swept is True, this is also True if the body's last move passed through a
+    planet. The body is then moved back to the point where it first touched the
+    planet.
+    """
+    counts = _COUNTING.counts
+    if counts is not None:
+        counts['collisions'] += 1
+    if swept:
+        tp, tf, tw, warp = contact(level, body)
+        if tp <= 1.0:
+            body.x = body.px + tp*(body.x - body.px)
+            body.y = body.py + tp*(body.y - body.py)
+            return True
+    return field(level, body)[2] or off_screen(body.x, body.y)
+
+
+def step(level, body, code, substeps=SUBSTEPS, method=INTEGRATOR, swept=SWEPT):
+    """Advances the body one tick with thrust code code and returns the outcome:
+    FINISHED, CRASHED or RUNNING.
+
+    The tick is split into substeps equal parts. Wormholes, the finish and
+    collisions are checked after every part (along the whole path of the part if
+    swept is True), and the tick stops early when the body finishes or crashes.
+    """
+    h = 1.0/substeps
+    for i in range(substeps):
+        advance(level, body, code, h, method)
+        teleport(level, body, swept)
+        if finished(level, body, swept):
+            return FINISHED
+        elif collided(level, body, swept):
+            return CRASHED
+    return RUNNING
+
+
+def run(level, codes, body=None, substeps=SUBSTEPS, method=INTEGRATOR, swept=SWEPT):
+    """Flies a body through level with the list of thrust codes codes and returns
+    a tuple (outcome, steps, body). The flight stops at the first step that
+    finishes or crashes. If body is None, a new body starts at the start point.
+    """
+    if body == None:
+        body = level.new_body()
+    outcome = RUNNING
+    steps = 0
+    for code in codes:
+        steps += 1
+        outcome = step(level, body, code, substeps, method, swept)
+        if outcome != RUNNING:
+            break
+    return (outcome, steps, body)
+
+
+class Clock(object):
+    """A fixed timestep accumulator.
+
+    The game gives the clock the time of every rendered frame, and the clock says
+    how many physics ticks to run for that frame. Left over time is kept for the
+    next frame, so the ship moves TICK worth of physics per TICK seconds at any
+    frame rate.
+
+    ATTRIBUTES:
+        _tick   [float>0] length of one tick in seconds
+        _max    [int>0] the most ticks returned for one frame
+        _acc    [float>=0] time in seconds not yet simulated
+    """
+
+    def __init__(self, tick=TICK, max_ticks=MAX_TICKS):
+        self._tick = tick
+        self._max = max_ticks
+        self._acc = 0.0
+
+
+    def ticks(self, dt):
+        """Adds dt seconds to the clock and returns the number of ticks to run.
+        """
+        self._acc += dt
+        n = int(self._acc/self._tick + 1e-6)
+        if n > self._max:
+            n = self._max
+            self._acc = 0.0
+        else:
+            self._acc = max(0.0, self._acc - n*self._tick)
+        return n
+
+
+    def alpha(self):
+        """Returns the fraction of a tick that is waiting in the clock, between
+        0 and 1.
+        """
+        return min(1.0, self._acc/self._tick)
+
+
+    def reset(self):
+        """Throws away any time waiting in the clock.
+        """
+        self._acc = 0.0
@@ -5,7 +5,26 @@
 from planet_constants import *
 from game2d import *
 from planet_models import *
+from planet_physics import *
+from planet_levels import *
+import planet_layers
+import planet_sprites
+from planet_sim import interpolate
+from planet_rewind import RewindBuffer
+from planet_preview import Preview
+from planet_ghosts import Ghosts
+from planet_assets import asset_source, asset_images
 import random
+import time
+
+
+#: colors of the trajectory preview: its line, and its end mark where it crashes
+#: or finishes
+PREVIEW_LINE = colormodel.RGB(255, 255, 255, 120)
+PREVIEW_CRASH = colormodel.RGB(255, 60, 60, 200)
+PREVIEW_FINISH = colormodel.RGB(60, 255, 60, 200)
+#: the color of a ghost drawn without a sprite atlas
+GHOST_COLOR = colormodel.RGB(255, 255, 255, int(round(255*GHOST_OPACITY)))
 
 
 class Play(object):
@@ -20,15 +39,47 @@ class Play(object):
         _planets [list of Planet objects or None] a list of the planets in the current game
         _start [GImage object] starting point for the player's ship
         _finish [Gimage object] finish point for the player's ship
-        _wormholes [list of Wormhole objects or None] list of the two wormholes in the
-            current game (they should be paired)
+        _wormholes [list of Wormhole objects or None] list of the wormholes in the
+            current game, two for each pair (they should be paired)
+        _level [Level object] plain-data copy of the level geometry used by the
+            physics functions in planet_physics
+        _method [EULER or VERLET] the integrator used by tick
+        _substeps [int>0] the number of substeps per tick
+        _swept [bool] True if wormholes, the finish and planets are tested along the
+            ship's whole path each step
+        _recorder [Recorder object or None] records the thrust code of every tick
+        _profiler [Profiler object or None] gets the time spent in tick and
+            update_ship as the section 'physics'
+        _layers [tuple or None] the cached layers (bottom, top) from build_layers,
+            as GImage objects (top is None if there are no wormholes), or None if
+            every object is drawn on its own
+        _layer_background [str or None] the background the layers were built with
+        _rewind [RewindBuffer object] the ship's state before each of the last
+            ticks, for rewinding
+        _preview [Preview object or None] the predicted path of the ship, if the
+            trajectory preview is on
+        _path   [GPath object or None] the drawn path of the preview
+        _mark   [GEllipse object or None] the drawn end of the preview, where it
+            crashes or finishes
+        _shots  [tuple] (previous, current, time): the ship's snapshots after the
+            last two ticks and the time of the last one (see planet_sim); replaced
+            as a whole after every tick, so other threads can read it
+        _ghosts [Ghosts object or None] the ghost ships raced against, if any
+        _ghost_atlas [tuple or None] the translucent atlas the ghosts are drawn
+            from (see planet_sprites.ship_atlas), or None to draw them as dots
+        _ghost_marks [list of GSprite or GEllipse objects] the drawn ghosts,
+            reused every frame
+    
+    The physics is done by planet_physics on the ship's Body and on _level; the
+    GImage objects here are only the views that get drawn.
     
     This class contains methods for updating the ship, drawing all of the game objects,
     determining if the ship collides with a planet, checking if the ship enters a wormhole,
     and checking if the ship has reached the finish line.
     """
     
-    def __init__(self, startx, starty, finishx, finishy, worm1=None, worm2=None, planets=None):
+    def __init__(self, startx, starty, finishx, finishy, worm1=None, worm2=None, planets=None,\
+                 wormholes=None):
         """Initializer: Creates a Play object that controls the current game.
         
         PARAMETERS:
@@ -39,25 +90,234 @@ class Play(object):
             worm1 [Wormhole object or None]
             worm2 [Wormhole object or None] must be different from worm1
             planets [list of planet objects or None] list of planet objects in the level
+            wormholes [list of (Wormhole, Wormhole) tuples or None] more wormhole pairs,
+                for levels with several of them; each pair is paired like worm1 and
+                worm2
             """
         self._start = GImage(x=startx, y=starty, width=START_WIDTH, height= START_HEIGHT,\
-                             source=START_PIC)
+                             source=asset_source(START_PIC, (START_WIDTH, START_HEIGHT)))
         self._finish = GImage(x=finishx, y=finishy, width=FINISH_WIDTH, height= FINISH_HEIGHT,\
-                             source=FINISH_PIC)
-        self._wormholes = None
+                             source=asset_source(FINISH_PIC, (FINISH_WIDTH, FINISH_HEIGHT)))
+        pairs = []
         if worm1 != None and worm2 != None:
-            pair(worm1, worm2)
-            self._wormholes = [worm1, worm2]
+            pairs.append((worm1, worm2))
+        if wormholes != None:
+            pairs.extend(wormholes)
+        self._wormholes = None
+        if len(pairs) > 0:
+            self._wormholes = []
+            for w1, w2 in pairs:
+                pair(w1, w2)
+                self._wormholes.extend([w1, w2])
         self._ship = Ship(self._start.x, self._start.y)
         self._planets = planets
+        bodies = None
+        if planets != None:
+            bodies = [(p.x, p.y, p.get_mass(), p.get_radius()) for p in planets]
+        pairs = [((w1.x, w1.y), (w2.x, w2.y)) for w1, w2 in pairs]
+        self._level = Level((startx, starty), (finishx, finishy), bodies, pairs)
+        self._method = INTEGRATOR
+        self._substeps = SUBSTEPS
+        self._swept = SWEPT
+        self._recorder = None
+        self._profiler = None
+        self._layers = None
+        self._layer_background = None
+        self._rewind = RewindBuffer()
+        self._preview = None
+        self._path = None
+        self._mark = None
+        self._shots = None
+        self._ghosts = None
+        self._ghost_atlas = None
+        self._ghost_marks = []
+        self._publish(False, True)
+    
+    
+    def tick(self, inp):
+        """Advances the game by one physics tick and returns FINISHED, CRASHED or
+        RUNNING.
+        
+        A tick does the work of update_ship, teleport, finish and planet_collide
+        together, using the integrator and number of substeps set with
+        set_integrator.
+        """
+        return self.tick_code(input_code(inp))
+    
+    
+    def tick_code(self, code):
+        """Advances the game by one physics tick with thrust code code and returns
+        FINISHED, CRASHED or RUNNING. If a recorder is set, the tick is recorded.
+        """
+        outcome = self.advance(code)
+        self._ship.sync()
+        return outcome
+    
+    
+    def advance(self, code):
+        """Advances the ship's body by one physics tick with thrust code code, and
+        publishes its snapshot, without moving the ship's image; returns FINISHED,
+        CRASHED or RUNNING. If a recorder is set, the tick is recorded.
+        
+        This is the part of tick_code that a Simulation runs on its own thread.
+        The image is moved by draw, on the game thread. The preview, ghosts and
+        profiler are read once, so the game thread may swap them in the middle of
+        a tick. Only the ship's own step is counted as physics; the preview's
+        predictions are timed as 'preview' and not counted.
+        """
+        profiler = self._profiler
+        if profiler != None:
+            start = time.perf_counter()
+            counts = profiler.new_counts()
+            count_into(counts)
+        body = self._ship.get_body()
+        preview = self._preview
+        ghosts = self._ghosts
+        before = body.teleporting
+        self._rewind.push(body)
+        self._ship.set_thrust(code != 0)
+        outcome = step(self._level, body, code, self._substeps, self._method, self._swept)
+        if profiler != None:
+            count_into(None)
+        if ghosts != None:
+            ghosts.advance()
+        self._publish(body.teleporting and not before)
+        if self._recorder != None:
+            self._recorder.record(code, outcome, body)
+        if profiler != None:
+            profiler.add('physics', time.perf_counter() - start, counts)
+        if preview != None:
+            if profiler != None:
+                start = time.perf_counter()
+            preview.update(body, code)
+            if profiler != None:
+                profiler.add('preview', time.perf_counter() - start)
+        return outcome
+    
+    
+    def rewind(self, ticks):
+        """Moves the ship back by ticks ticks, or as far as the rewind buffer
+        goes, and returns the number of ticks gone back. The ticks are also taken
+        off the recording, if there is one. No Simulation may be running.
+        """
+        back = self._rewind.rewind(self._ship.get_body(), ticks)
+        if back > 0:
+            if self._recorder != None:
+                self._recorder.rewind(back)
+            if self._ghosts != None:
+                self._ghosts.rewind(back)
+            self._ship.set_thrust(False)
+            self._ship.sync()
+            self._publish(False, True)
+            if self._preview != None:
+                self._preview.update(self._ship.get_body(), 0)
+        return back
+    
+    
+    def can_rewind(self):
+        """Returns True if there are ticks to rewind.
+        """
+        return len(self._rewind) > 0
+    
+    
+    def _publish(self, warped, still=False):
+        """Publishes the snapshot of the ship's body after a tick, where warped is
+        True if it came out of a wormhole on that tick. If still is True, it is
+        also the previous snapshot, so the ship is drawn where it is.
+        """
+        body = self._ship.get_body()
+        shot = (body.x, body.y, body.angle, self._ship.get_thrust(), warped)
+        prev = shot if still else self._shots[1]
+        self._shots = (prev, shot, time.perf_counter())
+    
+    
+    def shots(self):
+        """Returns the tuple (previous, current, time) of the ship's last two
+        snapshots and the time of the last one.
+        """
+        return self._shots
+    
+    
+    def set_recorder(self, recorder):
+        """Sets the Recorder (from planet_replay) that every tick is given to, or
+        None to stop recording.
+        """
+        self._recorder = recorder
+    
+    
+    def set_profiler(self, profiler):
+        """Sets the Profiler (from planet_profile) that the time spent in tick and
+        update_ship is added to, or None.
+        """
+        self._profiler = profiler
+    
+    
+    def get_integrator(self):
+        """Returns a tuple (method, substeps, swept) of the settings used by tick.
+        """
+        return (self._method, self._substeps, self._swept)
+    
+    
+    def set_integrator(self, method, substeps, swept=SWEPT):
+        """Sets the integrator (EULER or VERLET), the number of substeps per tick
+        used by the method tick, and whether collisions are swept. No Simulation
+        may be running.
+        """
+        self._method = method
+        self._substeps = substeps
+        self._swept = swept
+        if self._preview != None:
+            self.set_preview(True)
+    
+    
+    def set_preview(self, on):
+        """Turns the trajectory preview on if on is True, and off otherwise.
+        
+        The new preview is made before it replaces the old one, in a single
+        assignment, so a Simulation may be running.
+        """
+        preview = None
+        if on:
+            preview = Preview(self._level, self._substeps, self._method, self._swept)
+            preview.update(self._ship.get_body(), 0)
+        self._preview = preview
+        self._path = None
+        self._mark = None
+    
+    
+    def set_ghosts(self, replays, names=None):
+        """Races the ship against a ghost of each Replay in the list replays (see
+        planet_ghosts), or against none if it is empty. names is a list of a name
+        for each ghost, or None. The replays must be of this level, recorded with
+        the settings of set_integrator. No Simulation may be running.
+        """
+        ghosts = None
+        if len(replays) > 0:
+            ghosts = Ghosts(self._level, replays, names, self._substeps, self._method, self._swept)
+        self._ghosts = ghosts
+        self._ghost_marks = []
+    
+    
+    def get_ghosts(self):
+        return self._ghosts
     
     
     def update_ship(self, inp):
+        profiler = self._profiler
+        if profiler != None:
+            start = time.perf_counter()
+            counts = profiler.new_counts()
+            count_into(counts)
         ship = self._ship
         ship.move_ship()
         self._gravity()
         self._thrust_ship(inp)
         self._in_bounds()
+        ship.sync()
+        self._publish(False, True)
+        if profiler != None:
+            count_into(None)
+            profiler.add('physics', time.perf_counter() - start, counts)
     
     
     def _gravity(self):
@@ -65,18 +325,7 @@ class Play(object):
         This method accelerates the ship with gravity from each planet in the
         game. If there are no planets, this method does nothing.
         """
-        if self._planets != None:
-            for i in self._planets:
-                m1 = i.get_mass()
-                m2 = self._ship.get_mass()
-                r = i.p_distance(self._ship)
-                force = (G * m1 * m2) / (r**2.0)
-                cos, sin = i.get_trig(self._ship)
-                fx = -force * cos   #I added negatives to this expression to ensure force
-                fy = -force * sin   #is in the correct direction
-                ax = fx / self._ship.get_mass()
-                ay = fy / self._ship.get_mass()
-                self._ship.accel_ship(ax, ay)
+        gravity(self._level, self._ship.get_body())
     
     
     def _thrust_ship(self, inp):
@@ -85,31 +334,9 @@ class Play(object):
         keys. It also rotates the ship to the correct orientation based on which
         arrow keys are pressed.
         """
-        ship = self._ship
-        if inp.is_key_down('up') and inp.is_key_down('right'):
-            ship.angle = 315
-            ship.accel_ship(SHIP_ACCEL_2, SHIP_ACCEL_2)
-        elif inp.is_key_down('up') and inp.is_key_down('left'):
-            ship.angle = 45
-            ship.accel_ship(-SHIP_ACCEL_2, SHIP_ACCEL_2)
-        elif inp.is_key_down('down') and inp.is_key_down('left'):
-            ship.angle = 135
-            ship.accel_ship(-SHIP_ACCEL_2, -SHIP_ACCEL_2)
-        elif inp.is_key_down('down') and inp.is_key_down('right'):
-            ship.angle = 225
-            ship.accel_ship(SHIP_ACCEL_2, -SHIP_ACCEL_2)
-        elif inp.is_key_down('up'):
-            ship.angle = 0
-            ship.accel_ship(0, SHIP_ACCEL_1)
-        elif inp.is_key_down('down'):
-            ship.angle = 180
-            ship.accel_ship(0, -SHIP_ACCEL_1)
-        elif inp.is_key_down('right'):
-            ship.angle = 270
-            ship.accel_ship(SHIP_ACCEL_1, 0)
-        elif inp.is_key_down('left'):
-            ship.angle = 90
-            ship.accel_ship(-SHIP_ACCEL_1, 0)
+        code = input_code(inp)
+        self._ship.set_thrust(code != 0)
+        thrust(self._ship.get_body(), code)
     
     
     def _in_bounds(self):
@@ -117,46 +344,182 @@ class Play(object):
         This method negates the ship's x velocity if it exceeds the game's x bounds
         and negates the ship's y velocity if it exceeds the game's y bounds.
         """
-        ship = self._ship
-        x = ship.x
-        y = ship.y
-        if x < 0 or x > GAME_WIDTH:
-            ship.set_xv(-ship.get_xv())
-        if y < 0 or y > GAME_HEIGHT:
-            ship.set_yv(-ship.get_yv())
+        bounce(self._ship.get_body())
+    
+    
+    def static_items(self):
+        """Returns a tuple (planets, finish, start, wormholes) of lists of (file, x,
+        y, width, height) tuples, one for each object that does not move, for
+        planet_layers.
+        """
+        def item(g):
+            return (g.source, g.x, g.y, g.width, g.height)
+        planets = [item(p) for p in self._planets] if self._planets != None else []
+        wormholes = [item(w) for w in self._wormholes] if self._wormholes != None else []
+        return (planets, [item(self._finish)], [item(self._start)], wormholes)
+    
+    
+    def build_layers(self, background):
+        """Paints (or finds in the cache) the layers of this level with the
+        background image background, so that draw draws them instead of each
+        object. Does nothing if they are already built with that background.
+        
+        Returns a list of the (file, size) tuples of the layer images, for the
+        texture cache, or None if there are no layers (Pillow is missing or LAYERS
+        is False), in which case draw draws every object.
+        """
+        if self._layers == None or self._layer_background != background:
+            files = planet_layers.layer_files(background, self.static_items())
+            self._layer_background = background
+            self._layers = None
+            if files != None:
+                bottom = GImage(x=0.5*GAME_WIDTH, y=0.5*GAME_HEIGHT, width=GAME_WIDTH,\
+                                height=GAME_HEIGHT, source=files[0])
+                top = None
+                if files[1] != None:
+                    top = GImage(x=0.5*GAME_WIDTH, y=0.5*GAME_HEIGHT, width=GAME_WIDTH,\
+                                 height=GAME_HEIGHT, source=files[1])
+                self._layers = (bottom, top)
+        if self._layers == None:
+            return None
+        return [(g.source, (GAME_WIDTH, GAME_HEIGHT)) for g in self._layers if g != None]
+    
+    
+    def build_sprites(self):
+        """Makes (or finds in the cache) the ship's sprite atlas and draws the
+        ship from it, and the ghosts' atlas if there are ghosts. Call it after
+        set_ghosts.
+        
+        Returns a list of the (file, size) tuples of the images the ship and the
+        ghosts are drawn with, for the texture cache.
+        """
+        atlas = planet_sprites.ship_atlas()
+        self._ghost_atlas = None
+        self._ghost_marks = []
+        if not self._ship.use_atlas(atlas):
+            return [(self._ship.source, (SHIP_WIDTH, SHIP_HEIGHT))]
+        keys = [(atlas[0], (atlas[2]*atlas[3], atlas[1]*atlas[3]))]
+        if self._ghosts != None:
+            self._ghost_atlas = planet_sprites.ship_atlas(GHOST_OPACITY)
+            if self._ghost_atlas != None:
+                ghost = self._ghost_atlas
+                keys.append((ghost[0], (ghost[2]*ghost[3], ghost[1]*ghost[3])))
+        return keys
+    
+    
+    def has_layers(self):
+        """Returns True if draw draws the cached layers, which include the
+        background.
+        """
+        return self._layers != None
     
     
-    def draw(self, view):
+    def draw(self, view, alpha=None):
         """Draws the game objects into view, where view is an instance of GView.
         Draws the objects in the following order:
             planets
             finish point
             start point
+            ghosts
             ship
             wormholes
+        
+        If build_layers made layers, the background and everything but the ship
+        and ghosts is drawn as the two layers, so only three images are drawn per
+        frame besides the ghosts.
+        
+        If alpha is not None, the ship and ghosts are drawn alpha of the way (0
+        to 1) from their positions after the previous tick to their positions
+        after the last one. Otherwise they are drawn where they were after the
+        last tick, which also moves the ship's image when a Simulation runs the
+        ticks.
         """
+        prev, cur, when = self._shots
+        if alpha != None:
+            self._ship.place(*interpolate(prev, cur, alpha))
+        else:
+            self._ship.place(*cur[:4])
+        if self._layers != None:
+            self._layers[0].draw(view)
+            self._draw_preview(view)
+            self._draw_ghosts(view, alpha)
+            self._ship.draw(view)
+            if self._layers[1] != None:
+                self._layers[1].draw(view)
+            return
         if self._planets != None:
             for i in self._planets:
                 i.draw(view)
         self._finish.draw(view)
         self._start.draw(view)
+        self._draw_preview(view)
+        self._draw_ghosts(view, alpha)
         self._ship.draw(view)
         if self._wormholes != None:
             for j in self._wormholes:
                 j.draw(view)
     
     
+    def _draw_preview(self, view):
+        """Helper to the method draw.
+        Draws the trajectory preview, if it is on, as one line from the ship, with
+        a mark at its end if it crashes or finishes.
+        """
+        preview = self._preview
+        if preview == None:
+            return
+        points = preview.points(self._ship.x, self._ship.y)
+        if len(points) < 4:
+            return
+        if self._path == None:
+            self._path = GPath(points=points, linewidth=2, linecolor=PREVIEW_LINE)
+        else:
+            self._path.points = points
+        self._path.draw(view)
+        end = preview.end
+        if end != RUNNING:
+            color = PREVIEW_FINISH if end == FINISHED else PREVIEW_CRASH
+            if self._mark == None:
+                self._mark = GEllipse(width=PREVIEW_MARK, height=PREVIEW_MARK, fillcolor=color)
+            self._mark.x = points[-2]
+            self._mark.y = points[-1]
+            self._mark.fillcolor = color
+            self._mark.draw(view)
+    
+    
+    def _draw_ghosts(self, view, alpha):
+        """Helper to the method draw.
+        Draws the ghosts that are still flying, alpha of the way from their last
+        positions (or where they are if alpha is None). They all share the
+        translucent ghost atlas, so they are drawn one after another from a
+        single texture; the sprites are made once and only moved after that.
+        """
+        if self._ghosts == None:
+            return
+        xs, ys, frames = self._ghosts.places(1.0 if alpha == None else alpha)
+        marks = self._ghost_marks
+        atlas = self._ghost_atlas
+        while len(marks) < len(xs):
+            if atlas != None:
+                path, rows, columns, cell = atlas
+                marks.append(GSprite(width=cell, height=cell, source=path, format=(rows, columns)))
+            else:
+                marks.append(GEllipse(width=0.5*SHIP_WIDTH, height=0.5*SHIP_WIDTH, fillcolor=GHOST_COLOR))
+        for i in range(len(xs)):
+            mark = marks[i]
+            mark.x = float(xs[i])
+            mark.y = float(ys[i])
+            if atlas != None and mark.frame != frames[i]:
+                mark.frame = int(frames[i])
+            mark.draw(view)
+    
+    
     def planet_collide(self):
         """Returns True if the ship collides with a planet. False otherwise.
         """
-        verdict = False
-        if self._planets != None:
-            for j in self._planets:
-                check = j.collision_check(self._ship)
-                verdict = verdict or check
-        width = self._ship.x > GAME_WIDTH or self._ship.x < 0
-        height = self._ship.y>GAME_HEIGHT or self._ship.y < 0
-        return verdict or width or height
+        verdict = collided(self._level, self._ship.get_body(), self._swept)
+        self._ship.sync()
+        return verdict
     
     
     def teleport(self):
@@ -171,127 +534,102 @@ class Play(object):
             4) If the ship is not touching a wormhole, then this method sets the ship's
                 teleport attribute to True.
         """
-        if self._wormholes != None:
-            spaceship = self._ship
-            total_warp = False        #total_warp=whether ship is touching any wormholes
-            for i in self._wormholes:       #checking for each wormhole
-                warp = i.warp_check(spaceship)  #check if ship enters wormhole
-                total_warp = total_warp or warp #recording if ship is touching any wormhole
-                if warp and (not spaceship.get_teleport()):
-                    spaceship.set_teleport(True)
-                    spaceship.x = i.get_sister().x
-                    spaceship.y = i.get_sister().y
-            if not total_warp:
-                spaceship.set_teleport(False)
+        teleport(self._level, self._ship.get_body(), self._swept)
+        self._ship.sync()
     
     
     def finish(self):
         """Returns True if the ship reaches the finish area. False otherwise.
         """
-        end = self._finish
-        if end.contains(self._ship.x, self._ship.y):
-            return True
-        else:
-            return False
+        return finished(self._level, self._ship.get_body(), self._swept)
     
     
     def reset(self):
         """Resets the level so that the ship is back at the starting point.
         """
-        self._ship.x = self._start.x
-        self._ship.y = self._start.y
-        self._ship.set_xv(0.0)
-        self._ship.set_yv(0.0)
-        self._ship.angle = 0
-
-
-# List of levels
-L0 = None
-L1 = Play(50, 50, GAME_WIDTH-50, GAME_HEIGHT-50)
-
-P21 = Planet(0.5*GAME_WIDTH,0.5*GAME_HEIGHT,m=1.0,r=100.0,src="mars.png")
-L2 = Play(50, 50, GAME_WIDTH-50, GAME_HEIGHT-50, planets=[P21])
+        body = self._ship.get_body()
+        body.xv = 0.0
+        body.yv = 0.0
+        body.angle = 0
+        self._rewind.clear()
+        self._ship.set_thrust(False)
+        self._ship.set_position(self._start.x, self._start.y)
+        if self._ghosts != None:
+            self._ghosts.reset()
+        self._publish(False, True)
+        if self._preview != None:
+            self._preview.update(body, 0)
+    
+    
+    def get_ship(self):
+        return self._ship
+    
+    
+    def get_level(self):
+        return self._level
+    
+    
+    def get_table(self):
+        return self._level.table
+    
+    
+    def get_start(self):
+        return self._start
+    
+    
+    def get_finish(self):
+        return self._finish
 
-P31 = Planet(0.2*GAME_WIDTH,0.8*GAME_HEIGHT,m=1.0,r=100.0,src="mars.png")
-P32 = Planet(0.5*GAME_WIDTH,0.2*GAME_HEIGHT,m=3.0,r=300.0,src="jupiter.png")
-P33 = Planet(0.8*GAME_WIDTH,0.9*GAME_HEIGHT,m=5.0,r=50.0,src="black_hole.png")
-L3 = Play(50, 50, GAME_WIDTH-50, GAME_HEIGHT-50, planets=[P31, P32, P33])
 
-P41 = Planet(0.2*GAME_WIDTH, 0.3*GAME_HEIGHT, m=1.0, r=100.0, src="mars.png")
-P42 = Planet(0.6*GAME_WIDTH, 0.3*GAME_HEIGHT, m=1.0, r=100.0, src="neptune.png")
-P43 = Planet(0.4*GAME_WIDTH, 0.7*GAME_HEIGHT, m=1.0, r=100.0, src="neptune.png")
-P44 = Planet(0.8*GAME_WIDTH, 0.7*GAME_HEIGHT, m=1.0, r=100.0, src="mars.png")
-L4 = Play(50, 50, GAME_WIDTH-50, GAME_HEIGHT-50, planets=[P41, P42, P43, P44])
+def make_play(spec):
+    """Returns a new Play for the LevelSpec spec from planet_levels.
+    """
+    planets = None
+    if len(spec.planets) > 0:
+        planets = [Planet(x, y, m=m, r=r, src=image) for x, y, m, r, image in spec.planets]
+    wormholes = [(Wormhole(a[0], a[1]), Wormhole(b[0], b[1])) for a, b in spec.wormholes]
+    return Play(spec.start[0], spec.start[1], spec.finish[0], spec.finish[1], planets=planets,\
+                wormholes=wormholes)
 
-P51 = Planet(0, GAME_HEIGHT, m=5.0, r=300.0, src="neptune.png")
-P52 = Planet(GAME_WIDTH, GAME_HEIGHT, m=5.0, r=300.0, src="venus.png")
-P53 = Planet(0.55*GAME_WIDTH, 0.3*GAME_HEIGHT, m=1.0, r=100.0, src="mars.png")
-P54 = Planet(0.65*GAME_WIDTH, 0.5*GAME_HEIGHT, m=1.0, r=100.0, src="mars.png")
-P55 = Planet(0.75*GAME_WIDTH, 0.7*GAME_HEIGHT, m=1.0, r=100.0, src="mars.png")
-L5 = Play(0.5*GAME_WIDTH, GAME_HEIGHT-50, GAME_WIDTH-50, 150, planets=[P51, P52, P53, P54, P55])
 
-W61 = Wormhole(0.4*GAME_WIDTH, 50)
-W62 = Wormhole(0.6*GAME_WIDTH, GAME_HEIGHT-50)
-P61 = Planet(0.5*GAME_WIDTH, 0.8*GAME_HEIGHT, m=1.0, r=100.0, src="mars.png")
-P62 = Planet(0.5*GAME_WIDTH, 0.5*GAME_HEIGHT, m=1.0, r=100.0, src="mars.png")
-P63 = Planet(0.5*GAME_WIDTH, 0.2*GAME_HEIGHT, m=1.0, r=100.0, src="mars.png")
-L6 = Play(50, GAME_HEIGHT-50, GAME_WIDTH-50, 50, worm1=W61, worm2=W62, planets=[P61, P62, P63])
+class LevelList(object):
+    """The list of levels, as Play objects built the first time each is used.
 
-W71 = Wormhole(0.3*GAME_WIDTH, 0.5*GAME_HEIGHT)
-W72 = Wormhole(0.7*GAME_WIDTH, 0.5*GAME_HEIGHT)
-P71 = Planet(0.5*GAME_WIDTH, 0.5*GAME_HEIGHT, m=10.0, r=200, src="jupiter.png")
-P72 = Planet(0.5*GAME_WIDTH, 0.1*GAME_HEIGHT, m=1.0, r=100, src="mars.png")
-P73 = Planet(0.5*GAME_WIDTH, 0.9*GAME_HEIGHT, m=1.0, r=100, src="mars.png")
-L7 = Play(0.2*GAME_WIDTH, 0.5*GAME_HEIGHT, GAME_WIDTH-50, 50, worm1=W71, worm2=W72, planets=[P71, P72, P73])
+    LEVELS[0] is None, for the title screen, and LEVELS[n] is level n of the
+    registry in planet_levels. A level's file is not decoded, and its images are
+    not created, until the level is started.
 
-W81 = Wormhole(0.25*GAME_WIDTH, 0.6*GAME_HEIGHT)
-W82 = Wormhole(0.7*GAME_WIDTH, 0.85*GAME_HEIGHT)
-P81 = Planet(0.15*GAME_WIDTH, 0.5*GAME_HEIGHT, m=1.0, r=125, src="venus.png")
-P82 = Planet(0.5*GAME_WIDTH, 0.5*GAME_HEIGHT, m=3.0, r=250, src="neptune.png")
-P83 = Planet(0.9*GAME_WIDTH, 0.1*GAME_HEIGHT, m=1.0, r=50, src="mars.png")
-P84 = Planet(40, 0.5*GAME_HEIGHT, m=0.0, r=40, src="moon.png")
-L8 = Play(50, GAME_HEIGHT-50, 50, 50, worm1=W81, worm2=W82, planets=[P81, P82, P83, P84])
+    ATTRIBUTES:
+        _plays  [dict] maps a level number to its Play object, once built
+    """
 
-W91 = Wormhole(0.65*GAME_WIDTH, 0.6*GAME_HEIGHT)
-W92 = Wormhole(0.2*GAME_WIDTH, 0.45*GAME_HEIGHT)
-P91 = Planet(0.2*GAME_WIDTH, 0.1*GAME_HEIGHT, m=3.0, r=75, src="jupiter.png")
-P92 = Planet(0.5*GAME_WIDTH, 0.2*GAME_HEIGHT, m=1.0, r=50, src="mars.png")
-P93 = Planet(0.5*GAME_WIDTH, 0.7*GAME_HEIGHT, m=0.5, r=40, src="venus.png")
-P94 = Planet(0.5*GAME_WIDTH, 1.1*GAME_HEIGHT, m=4.0, r=200, src="sun.png")
-P95 = Planet(0.8*GAME_WIDTH, 0.6*GAME_HEIGHT, m=3.0, r=100, src="neptune.png")
-L9 = Play(GAME_WIDTH-50, GAME_HEIGHT-50, 50, 50, worm1=W91, worm2=W92, planets=[P91, P92, P93, P94, P95])
+    def __init__(self):
+        self._plays = {}
 
-WA1 = Wormhole(0.3*GAME_WIDTH, 0.5*GAME_HEIGHT)
-WA2 = Wormhole(0.3*GAME_WIDTH, 0.9*GAME_HEIGHT)
-PA1 = Planet(0.3*GAME_WIDTH, 0.35*GAME_HEIGHT, m=7.0, r=30, src="black_hole.png")
-LA = Play(0.3*GAME_WIDTH, 0.8*GAME_HEIGHT, 0.8*GAME_WIDTH, 0.2*GAME_HEIGHT, worm1=WA1, worm2=WA2, planets=[PA1])
 
-WB1 = Wormhole(0.55*GAME_WIDTH,0.5*GAME_HEIGHT)
-WB2 = Wormhole(0.75*GAME_WIDTH,0.5*GAME_HEIGHT)
-PB1 = Planet(0.41*GAME_WIDTH, 0.5*GAME_HEIGHT, m=4.0, r=150, src="jupiter.png")
-PB2 = Planet(0.65*GAME_WIDTH, 0.5*GAME_HEIGHT, m=3.0, r=80, src="neptune.png")
-PB3 = Planet(0.05*GAME_WIDTH, 0.6*GAME_HEIGHT, m=0, r=70, src="mars.png")
-PB4 = Planet(0.15*GAME_WIDTH, 0.55*GAME_HEIGHT, m=0, r=70, src="moon.png")
-PB5 = Planet(0.25*GAME_WIDTH, 0.5*GAME_HEIGHT, m=0, r=70, src="mars.png")
-PB6 = Planet(0.93*GAME_WIDTH, 0.27*GAME_HEIGHT, m=0, r=90, src="venus.png")
-LB = Play(50, GAME_HEIGHT-50, 50, 0.45*GAME_HEIGHT, worm1=WB1, worm2=WB2, planets=[PB1, PB2, PB3, PB4, PB5, PB6])
+    def __len__(self):
+        return len(get_registry()) + 1
 
-PC1 = Planet(0.35*GAME_WIDTH, 0.65*GAME_HEIGHT, m=3.0, r=150, src="jupiter.png")
-PC2 = Planet(0.65*GAME_WIDTH, 0.35*GAME_HEIGHT, m=1.0, r=75, src="moon.png")
-LC = Play(50, 50, GAME_WIDTH-50, GAME_HEIGHT-50, planets=[PC1, PC2])
 
-PD1 = Planet(0.5*GAME_WIDTH, -0.1*GAME_HEIGHT, m=5.0, r=350, src="sun.png")
-PD2 = Planet(0.5*GAME_WIDTH, 1.1*GAME_HEIGHT, m=3.0, r=200, src="neptune.png")
-LD = Play(50, 50, GAME_WIDTH-50, GAME_HEIGHT-50, planets=[PD1, PD2])
+    def __getitem__(self, level):
+        if level == 0:
+            return None
+        if level < 0 or level >= len(self):
+            raise IndexError('there is no level %d' % level)
+        if level not in self._plays:
+            self._plays[level] = make_play(get_registry().spec(level))
+        return self._plays[level]
 
-PX1 = Planet(0.5*GAME_WIDTH, 0.5*GAME_HEIGHT, m=10.0, r=200, src="black_hole.png")
-LX = Play(50, 0.5*GAME_HEIGHT, GAME_WIDTH-50, 0.5*GAME_HEIGHT, planets=[PX1])
 
-PY1 = Planet(0.35*GAME_WIDTH, 0.65*GAME_HEIGHT, m=3.0, r=100, src="mars.png")
-PY2 = Planet(0.65*GAME_WIDTH, 0.65*GAME_HEIGHT, m=3.0, r=100, src="venus.png")
-PY3 = Planet(0.5*GAME_WIDTH, -0.1*GAME_HEIGHT, m=1.0, r=250, src="sun.png")
-LY = Play(0.5*GAME_WIDTH, 0.5*GAME_HEIGHT, 50, GAME_HEIGHT-50, planets=[PY1, PY2, PY3])
+    def forget(self, keep):
+        """Lets go of every Play object except the one for level number keep, so
+        that levels no longer being played do not hold on to their images.
+        """
+        for level in list(self._plays.keys()):
+            if level != keep:
+                del self._plays[level]
 
 
-LEVELS = [L0, L1, L2, LC, LD, LX, LY, L5, L4, L3, L6, L9, L7, L8, LA, LB]
-MAX_LEVEL = len(LEVELS) - 1
\ No newline at end of file
+# List of levels; the number of the last level is len(LEVELS) - 1, found when it
+# is first needed so that importing this module does not read the levels
+LEVELS = LevelList()
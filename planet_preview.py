@@ -0,0 +1,113 @@
+# planet_preview.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the trajectory preview for the Planets game.
+
+The preview shows where the ship will go in the next PREVIEW_STEPS ticks if the
+player keeps holding the keys held now, with the same physics as the game
+(gravity, wormholes, bouncing off the edges), and where that path crashes or
+finishes, if it does.
+
+Predicting PREVIEW_STEPS ticks costs as much as playing them, too much to do on
+every tick. But the physics is deterministic, so while the keys do not change,
+the tick the game just played is exactly the first tick of the prediction. The
+preview then only drops that tick and predicts one more at the far end. The
+whole path is only predicted again when the keys change or the ship is not where
+the prediction said (after a reset or a rewind).
+
+This module does not import game2d; Play draws the path as one GPath."""
+
+import threading
+from collections import deque
+from planet_constants import *
+from planet_physics import step
+
+
+def body_state(body):
+    """Returns the tuple (x, y, xv, yv, angle, teleporting) of the Body body.
+    """
+    return (body.x, body.y, body.xv, body.yv, body.angle, body.teleporting)
+
+
+class Preview(object):
+    """The predicted path of a ship through a level.
+
+    ATTRIBUTES:
+        steps   [int>0] the number of ticks predicted
+        end     [int] RUNNING if the path goes on for all the ticks, otherwise
+            FINISHED or CRASHED, at its last point
+        recomputed [int] how many times the whole path has been predicted
+        _level  [Level object] the level flown through
+        _settings [tuple] (substeps, method, swept) used by step
+        _code   [int] the thrust code the path was predicted with
+        _states [deque] the state tuples (see body_state) after each predicted
+            tick, the first being the next tick
+        _tip    [Body object or None] the ship after the last predicted tick
+        _lock   [Lock] keeps the path whole while it is read from another thread
+    """
+
+    def __init__(self, level, substeps=SUBSTEPS, method=INTEGRATOR, swept=SWEPT, steps=PREVIEW_STEPS):
+        self.steps = steps
+        self.end = RUNNING
+        self.recomputed = 0
+        self._level = level
+        self._settings = (substeps, method, swept)
+        self._code = -1
+        self._states = deque()
+        self._tip = None
+        self._lock = threading.Lock()
+
+
+    def update(self, body, code):
+        """Brings the path up to date for the ship with Body body, if it keeps
+        the thrust code code. Call it after every tick, and whenever the ship is
+        moved some other way.
+        """
+        with self._lock:
+            states = self._states
+            if code == self._code and len(states) > 0 and states[0] == body_state(body):
+                states.popleft()
+                if self.end == RUNNING:
+                    self._extend(1)
+            else:
+                self._predict(body, code)
+
+
+    def _predict(self, body, code):
+        """Helper to update.
+        Predicts the whole path from the Body body with thrust code code.
+        """
+        self._code = code
+        self._states.clear()
+        self._tip = body.copy()
+        self.end = RUNNING
+        self.recomputed += 1
+        self._extend(self.steps)
+
+
+    def _extend(self, count):
+        """Helper to update.
+        Predicts count more ticks at the end of the path, stopping if it finishes
+        or crashes.
+        """
+        substeps, method, swept = self._settings
+        tip = self._tip
+        for i in range(count):
+            outcome = step(self._level, tip, self._code, substeps, method, swept)
+            self._states.append(body_state(tip))
+            if outcome != RUNNING:
+                self.end = outcome
+                return
+
+
+    def points(self, x, y):
+        """Returns the path as a flat list [x0, y0, x1, y1, ...] of points for a
+        GPath, starting at (x,y), where the ship is drawn.
+        """
+        with self._lock:
+            result = [x, y]
+            for s in self._states:
+                result.append(s[0])
+                result.append(s[1])
+            return result
@@ -0,0 +1,254 @@
+# planet_profile.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the frame profiler for the Planets game.
+
+A Profiler is only created when profiling is turned on (the P key in the game, or
+PROFILE in planet_constants). While there is none, the game only checks that
+its profiler is None once per frame, and planet_physics only checks that its
+counters are None, so profiling costs nothing measurable when it is off.
+
+For every frame the profiler keeps:
+
+    the frame time, from the start of one update to the start of the next,
+    added to a histogram for the state the game was in (TITLE_SCREEN, READY,
+    ACTIVE, ...)
+
+    the time spent in named sections of the frame: 'update' (the state's
+    work), 'physics' (Play.advance and Play.update_ship), 'preview' (keeping
+    the trajectory preview up to date), 'load' (starting a level), 'textures'
+    (decoding preloaded images), 'music' and 'draw'
+
+    the physics counters for the frame: 'gravity' (kernel evaluations at a new
+    ship position), 'sweeps' (swept tests of a new path) and 'collisions'
+    (collision tests), counted only while the ship itself is moved, so the
+    preview's predictions are not counted
+
+With a simulation thread (SIM_THREAD), the ticks add their sections and counters
+from that thread while the game thread ends frames, so both go through a lock.
+Each tick counts its physics work into a dict of its own (see new_counts and
+planet_physics.count_into) and hands it over with its time.
+
+The PROFILE_WORST slowest frames are kept whole, with their sections and
+counters, so a stutter can be traced to its cause. The histograms and worst
+frames can be written out as JSON or CSV.
+
+This module does not import game2d; the overlay that shows the report is drawn
+by Planets."""
+
+import bisect
+import csv
+import heapq
+import json
+import os
+import threading
+import time
+from planet_constants import *
+
+#: names of the game states, for reports
+STATE_NAMES = {TITLE_SCREEN: 'TITLE_SCREEN', NEW_GAME: 'NEW_GAME', READY: 'READY',
+               ACTIVE: 'ACTIVE', FAIL: 'FAIL', CONTINUE: 'CONTINUE', COMPLETE: 'COMPLETE',
+               REPLAY: 'REPLAY'}
+
+
+class Profiler(object):
+    """Frame time histograms, section times, counters and worst frames.
+
+    ATTRIBUTES:
+        bins    [list of float] the upper edge in milliseconds of each histogram
+            bin but the last, which holds everything slower
+        hists   [dict] maps a state to its histogram, a list of frame counts with
+            one more entry than bins
+        totals  [dict] maps a state to a list [frames, total ms, worst ms]
+        worst   [list] a heap of the slowest frames, as tuples (ms, number, frame
+            dict); the fastest of them is first
+        frames  [int] the number of frames measured
+        _start  [float or None] when the current frame started
+        _state  [int] the state the current frame started in
+        _sections [dict] maps a section name to its seconds in the current frame
+        _counts [dict] the physics counters of the current frame
+        _lock   [Lock] guards _sections and _counts, which a simulation thread
+            adds to
+        last    [dict or None] the last finished frame
+    """
+
+    def __init__(self, bins=PROFILE_BINS):
+        self.bins = list(bins)
+        self.hists = {}
+        self.totals = {}
+        self.worst = []
+        self.frames = 0
+        self.last = None
+        self._start = None
+        self._state = TITLE_SCREEN
+        self._sections = {}
+        self._counts = self.new_counts()
+        self._lock = threading.Lock()
+
+
+    def new_counts(self):
+        """Returns a new dict of physics counters, all 0, to count one piece of
+        physics work into with planet_physics.count_into and then pass to add.
+        """
+        return {'gravity': 0, 'sweeps': 0, 'collisions': 0}
+
+
+    def stop(self):
+        """Forgets the unfinished frame.
+        """
+        with self._lock:
+            self._start = None
+
+
+    def frame(self, state):
+        """Ends the current frame, if any, and starts a new one in the game state
+        state. Called at the start of every update.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if self._start != None:
+                self._finish((now - self._start)*1000.0)
+            self._start = now
+            self._state = state
+            self._sections = {}
+            self._counts = self.new_counts()
+
+
+    def add(self, section, seconds, counts=None):
+        """Adds seconds to the time of section in the current frame, and the
+        physics counters in the dict counts (see new_counts) if it is not None.
+        May be called from any thread.
+        """
+        with self._lock:
+            self._sections[section] = self._sections.get(section, 0.0) + seconds
+            if counts != None:
+                for k in counts:
+                    self._counts[k] += counts[k]
+
+
+    def _finish(self, ms):
+        """Helper to frame; call it holding _lock.
+        Adds the frame that took ms milliseconds to the histograms and the worst
+        frames.
+        """
+        state = self._state
+        hist = self.hists.get(state)
+        if hist == None:
+            hist = [0]*(len(self.bins) + 1)
+            self.hists[state] = hist
+            self.totals[state] = [0, 0.0, 0.0]
+        hist[bisect.bisect_left(self.bins, ms)] += 1
+        total = self.totals[state]
+        total[0] += 1
+        total[1] += ms
+        total[2] = max(total[2], ms)
+        self.frames += 1
+        record = {'frame': self.frames, 'state': STATE_NAMES.get(state, str(state)), 'ms': ms,
+                  'sections': dict((k, v*1000.0) for k, v in self._sections.items()),
+                  'counts': dict(self._counts)}
+        self.last = record
+        if len(self.worst) < PROFILE_WORST:
+            heapq.heappush(self.worst, (ms, self.frames, record))
+        elif ms > self.worst[0][0]:
+            heapq.heapreplace(self.worst, (ms, self.frames, record))
+
+
+    def worst_frames(self):
+        """Returns the kept worst frames as a list of dicts, slowest first.
+        """
+        return [w[2] for w in sorted(self.worst, reverse=True)]
+
+
+    def report(self):
+        """Returns everything measured as a dict that can be written as JSON.
+        """
+        states = {}
+        for state, hist in self.hists.items():
+            frames, total, worst = self.totals[state]
+            states[STATE_NAMES.get(state, str(state))] = {
+                'frames': frames, 'mean_ms': total/frames, 'worst_ms': worst,
+                'p50_ms': self._percentile(hist, frames, 0.5),
+                'p99_ms': self._percentile(hist, frames, 0.99), 'histogram': list(hist)}
+        return {'bins_ms': self.bins, 'frames': self.frames, 'states': states,
+                'worst': self.worst_frames()}
+
+
+    def _percentile(self, hist, frames, fraction):
+        """Helper to report.
+        Returns the upper edge of the bin holding the given fraction of frames, or
+        inf if it is the last bin.
+        """
+        need = fraction*frames
+        seen = 0
+        for i in range(len(hist)):
+            seen += hist[i]
+            if seen >= need:
+                return self.bins[i] if i < len(self.bins) else float('inf')
+        return float('inf')
+
+
+    def overlay_text(self):
+        """Returns a few lines summing up the current state and the last frame,
+        for the in-game overlay.
+        """
+        lines = []
+        for state in sorted(self.totals):
+            frames, total, worst = self.totals[state]
+            lines.append('%-12s %6d frames  mean %5.1f ms  worst %6.1f ms' %
+                         (STATE_NAMES.get(state, str(state)), frames, total/frames, worst))
+        if self.last != None:
+            parts = ['%s %.2f' % (k, v) for k, v in sorted(self.last['sections'].items())]
+            lines.append('last %.1f ms: %s' % (self.last['ms'], ', '.join(parts)))
+            counts = self.last['counts']
+            lines.append('gravity %d  sweeps %d  collisions %d' %
+                         (counts['gravity'], counts['sweeps'], counts['collisions']))
+        return '\n'.join(lines)
+
+
+    def dump_json(self, path):
+        """Writes report to the file path as JSON.
+        """
+        _folder(path)
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=1)
+
+
+    def dump_csv(self, path):
+        """Writes the histograms to the file path as CSV, one row per state, and the
+        worst frames to the same name with '-worst' added, one row per frame.
+        """
+        _folder(path)
+        with open(path, 'w', newline='') as f:
+            out = csv.writer(f)
+            edges = ['<=%g' % b for b in self.bins] + ['>%g' % self.bins[-1]]
+            out.writerow(['state', 'frames', 'mean_ms', 'worst_ms'] + edges)
+            for state in sorted(self.hists):
+                frames, total, worst = self.totals[state]
+                out.writerow([STATE_NAMES.get(state, str(state)), frames, '%.3f' % (total/frames),
+                              '%.3f' % worst] + self.hists[state])
+        base, ext = os.path.splitext(path)
+        worst = self.worst_frames()
+        sections = sorted(set(k for w in worst for k in w['sections']))
+        with open(base + '-worst' + ext, 'w', newline='') as f:
+            out = csv.writer(f)
+            out.writerow(['frame', 'state', 'ms'] + sections + ['gravity', 'sweeps', 'collisions'])
+            for w in worst:
+                out.writerow([w['frame'], w['state'], '%.3f' % w['ms']] +
+                             ['%.3f' % w['sections'].get(k, 0.0) for k in sections] +
+                             [w['counts']['gravity'], w['counts']['sweeps'], w['counts']['collisions']])
+
+
+def _folder(path):
+    """Makes the folder of the file path if it does not exist.
+    """
+    folder = os.path.dirname(path)
+    if folder != '' and not os.path.isdir(folder):
+        os.makedirs(folder)
+
+
+def profile_path(ext):
+    """Returns a new file path in PROFILE_DIR with extension ext, named after the
+    current time.
+    """
+    return os.path.join(PROFILE_DIR, time.strftime('profile-%Y%m%d-%H%M%S') + ext)
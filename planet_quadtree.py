@@ -0,0 +1,187 @@
+# planet_quadtree.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains Barnes-Hut quadtree gravity for the Planets game.
+
+A QuadTree groups the massive planets of a level into square nodes. When a node
+is far enough from the ship, its planets pull on the ship as one body at their
+center of mass; otherwise the node is opened and its children (or, for a leaf,
+its planets) are used instead. How far is far enough is set by the opening angle
+theta: smaller values are more accurate and slower, and theta = 0 is the exact
+sum.
+
+The tree is stored in flat NumPy arrays, and accel walks it for many ships at
+once, so the cost per ship grows with the logarithm of the number of planets
+instead of linearly. The function compare checks the result against the exact
+sum of planet_kernel.ship_field."""
+
+import numpy as np
+from planet_constants import *
+
+
+class QuadTree(object):
+    """A Barnes-Hut quadtree over the massive planets of a PlanetTable.
+
+    Nodes are numbered in the order they are built; node 0 is the root.
+
+    ATTRIBUTES:
+        theta   [float>=0] the opening angle
+        cx      [float array] x position of the center of mass of each node
+        cy      [float array] y position of the center of mass of each node
+        gm      [float array] G times the total mass of each node
+        open2   [float array] squared distance inside which a node must be opened:
+            (size/theta + offset)**2, where offset is the distance from the center
+            of the node's square to its center of mass
+        child   [(nodes, 4) int array] the children of each node, -1 if missing
+        start   [int array] for a leaf, the position of its first planet in order
+        count   [int array] for a leaf, the number of planets in it; 0 for a node
+            that has children
+        order   [int array] planet indices, grouped by leaf
+        bx      [float array] x position of each planet in the table
+        by      [float array] y position of each planet in the table
+        bgm     [float array] G times the mass of each planet in the table
+    """
+
+    def __init__(self, table, theta=BH_THETA, leaf=BH_LEAF):
+        """Initializer: Builds the tree for the planets of the PlanetTable table.
+        Planets without mass are left out, since they do not pull on the ship.
+        """
+        self.theta = float(theta)
+        self.bx = table.px
+        self.by = table.py
+        self.bgm = table.gm
+        self._leaf = leaf
+        self._nodes = []
+        self._order = []
+        idx = np.flatnonzero(table.gm != 0)
+        if len(idx) > 0:
+            x0 = float(table.px[idx].min())
+            y0 = float(table.py[idx].min())
+            size = max(float(table.px[idx].max()) - x0, float(table.py[idx].max()) - y0, 1.0)
+            self._build(idx, x0, y0, size, 0)
+        nodes = self._nodes
+        self.cx = np.array([n[0] for n in nodes], dtype=float)
+        self.cy = np.array([n[1] for n in nodes], dtype=float)
+        self.gm = np.array([n[2] for n in nodes], dtype=float)
+        if self.theta > 0:
+            reach = np.array([n[3]/self.theta + n[4] for n in nodes], dtype=float)
+            self.open2 = reach*reach
+        else:
+            self.open2 = np.full(len(nodes), np.inf)
+        self.child = np.array([n[5] for n in nodes], dtype=int).reshape(-1, 4)
+        self.start = np.array([n[6] for n in nodes], dtype=int)
+        self.count = np.array([n[7] for n in nodes], dtype=int)
+        self.order = np.array(self._order, dtype=int)
+        del self._nodes
+        del self._order
+
+
+    def _build(self, idx, x0, y0, size, depth):
+        """Helper to the initializer.
+        Adds the node for the planets idx inside the square with lower left corner
+        (x0,y0) and width size, and all of its children. Returns its number.
+
+        Each node is a list [cx, cy, gm, size, offset, children, start, count].
+        """
+        gm = self.bgm[idx]
+        total = float(gm.sum())
+        cx = float((gm*self.bx[idx]).sum() / total)
+        cy = float((gm*self.by[idx]).sum() / total)
+        offset = ((cx - x0 - 0.5*size)**2 + (cy - y0 - 0.5*size)**2)**0.5
+        number = len(self._nodes)
+        node = [cx, cy, total, size, offset, [-1, -1, -1, -1], 0, 0]
+        self._nodes.append(node)
+        if len(idx) <= self._leaf or depth >= BH_DEPTH:
+            node[6] = len(self._order)
+            node[7] = len(idx)
+            self._order.extend(idx.tolist())
+            return number
+        half = 0.5*size
+        right = self.bx[idx] >= x0 + half
+        top = self.by[idx] >= y0 + half
+        quads = [~right & ~top, right & ~top, ~right & top, right & top]
+        for q in range(4):
+            if quads[q].any():
+                qx = x0 + half*(q % 2)
+                qy = y0 + half*(q // 2)
+                node[5][q] = self._build(idx[quads[q]], qx, qy, half, depth + 1)
+        return number
+
+
+    def accel(self, x, y):
+        """Returns a tuple (ax, ay) of arrays: the approximate gravitational
+        acceleration on a ship at each point (x[i],y[i]).
+
+        All points walk down the tree together. At each level, every (point, node)
+        pair is either accepted as one body, expanded into the node's planets if it
+        is a leaf, or replaced by the node's children.
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        n = len(x)
+        ax = np.zeros(n)
+        ay = np.zeros(n)
+        if len(self.cx) == 0:
+            return (ax, ay)
+        qi = np.arange(n)
+        nodes = np.zeros(n, dtype=int)
+        while len(qi) > 0:
+            dx = x[qi] - self.cx[nodes]
+            dy = y[qi] - self.cy[nodes]
+            d2 = dx*dx + dy*dy
+            far = d2 > self.open2[nodes]
+            if far.any():
+                k = self.gm[nodes[far]] / (d2[far]*np.sqrt(d2[far]))
+                ax -= np.bincount(qi[far], weights=k*dx[far], minlength=n)
+                ay -= np.bincount(qi[far], weights=k*dy[far], minlength=n)
+            near = ~far
+            leaf = near & (self.count[nodes] > 0)
+            if leaf.any():
+                self._exact(x, y, qi[leaf], nodes[leaf], ax, ay)
+            inner = near & (self.count[nodes] == 0)
+            children = self.child[nodes[inner]]
+            qi = np.repeat(qi[inner], 4)
+            nodes = children.ravel()
+            keep = nodes >= 0
+            qi = qi[keep]
+            nodes = nodes[keep]
+        return (ax, ay)
+
+
+    def _exact(self, x, y, qi, leaves, ax, ay):
+        """Helper to accel.
+        Adds the exact pull of every planet in leaves[j] on the point qi[j] to ax
+        and ay.
+        """
+        count = self.count[leaves]
+        first = np.repeat(self.start[leaves] - (np.cumsum(count) - count), count)
+        bodies = self.order[first + np.arange(count.sum())]
+        q = np.repeat(qi, count)
+        dx = x[q] - self.bx[bodies]
+        dy = y[q] - self.by[bodies]
+        d2 = dx*dx + dy*dy
+        k = self.bgm[bodies] / (d2*np.sqrt(d2))
+        ax -= np.bincount(q, weights=k*dx, minlength=len(ax))
+        ay -= np.bincount(q, weights=k*dy, minlength=len(ay))
+
+
+def compare(table, tree, x, y):
+    """Returns a tuple (worst, mean) of the relative error of tree.accel against
+    the exact sum over every planet in table, at the points (x[i],y[i]).
+    """
+    x = np.atleast_1d(np.asarray(x, dtype=float))
+    y = np.atleast_1d(np.asarray(y, dtype=float))
+    ax, ay = tree.accel(x, y)
+    err = np.zeros(len(x))
+    for i in range(len(x)):
+        dx = x[i] - table.px
+        dy = y[i] - table.py
+        d2 = dx*dx + dy*dy
+        k = table.gm / (d2*np.sqrt(d2))
+        ex = -(k*dx).sum()
+        ey = -(k*dy).sum()
+        size = (ex*ex + ey*ey)**0.5
+        if size > 0:
+            err[i] = ((ax[i] - ex)**2 + (ay[i] - ey)**2)**0.5 / size
+    return (float(err.max()), float(err.mean()))
@@ -0,0 +1,186 @@
+# planet_regress.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the replay regression harness for the Planets game.
+
+A folder of golden replays (see planet_replay) records runs that are known to
+finish or crash at a certain tick. The harness plays every replay headless on its
+level, in a pool of processes with one per CPU core, and checks that it still
+ends the same way: the same outcome, on the same tick, with the ship within
+REGRESS_TOLERANCE pixels of the recorded final position. A change to the physics
+constants or to the order of the update steps shows up here as a failure on the
+levels it breaks.
+
+Run it from the command line:
+
+    python planet_regress.py [folder] [--workers N] [--tolerance T] [--update]
+
+The folder defaults to GOLDEN_DIR. It prints one line per level and exits with
+status 1 if any replay does not match. --update writes the new results into the
+replays instead, for after an intended change to the physics, and exits with
+status 1 only if a new result cannot be saved."""
+
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+import time
+from planet_constants import *
+from planet_replay import *
+
+#: names of the outcomes, for the summary
+OUTCOMES = {RUNNING: 'running', FINISHED: 'finished', CRASHED: 'crashed'}
+
+
+def check_replay(path, tolerance=REGRESS_TOLERANCE, update=False):
+    """Plays the replay in the file path headless and returns a dict describing
+    how it compares with the recording:
+
+        path, level     the file and the level name
+        ok              True if the result matches
+        problem         why it does not match, or None
+        outcome, steps  the recorded outcome and number of ticks
+        got_outcome, got_steps, miss
+                        the new outcome, number of ticks, and distance between
+                        the new and recorded final positions
+        seconds         how long the replay took to run
+
+    If update is True and the new result differs, the replay is cut to the ticks
+    it now plays and saved with the new result, once playing it again gives that
+    result; 'updated' is then True if it was saved.
+    """
+    result = {'path': path, 'level': None, 'ok': False, 'problem': None}
+    try:
+        replay = load_replay(path)
+        result['level'] = replay.level
+        result['outcome'] = replay.outcome
+        result['steps'] = replay.ticks
+        start = time.perf_counter()
+        outcome, steps, body = play_headless(replay)
+        result['seconds'] = time.perf_counter() - start
+    except (IOError, ValueError) as e:
+        result['problem'] = str(e)
+        return result
+    miss = math.inf
+    if replay.final != None:
+        miss = math.hypot(body.x - replay.final[0], body.y - replay.final[1])
+    result['got_outcome'] = outcome
+    result['got_steps'] = steps
+    result['miss'] = miss
+    if outcome != replay.outcome:
+        result['problem'] = '%s instead of %s' % (OUTCOMES[outcome], OUTCOMES[replay.outcome])
+    elif steps != replay.ticks:
+        result['problem'] = 'ended on tick %d instead of %d' % (steps, replay.ticks)
+    elif not miss <= tolerance:
+        result['problem'] = 'final position is %.3g pixels off' % miss
+    else:
+        result['ok'] = True
+    if update and not result['ok']:
+        result['updated'] = _update(replay, path, steps, outcome, body)
+    return result
+
+
+def _update(replay, path, steps, outcome, body):
+    """Helper to check_replay.
+    Cuts replay to the steps ticks it now plays, records that it ends with
+    outcome and the Body body, and saves it in the file path if it then plays
+    back the same. Returns True if it was saved.
+    """
+    replay.cut(steps)
+    replay.end(outcome, body)
+    again, ticks, final = play_headless(replay)
+    if (again, ticks, final.x, final.y) != (outcome, steps, body.x, body.y):
+        return False
+    save_replay(replay, path)
+    return True
+
+
+def _check_args(args):
+    """Helper to run_all; the function given to the process pool.
+    """
+    return check_replay(*args)
+
+
+def find_replays(folder):
+    """Returns a sorted list of the paths of the replay files in folder and its
+    subfolders.
+    """
+    paths = []
+    for root, dirs, files in os.walk(folder):
+        for name in files:
+            if name.endswith('.rpl'):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def run_all(paths, workers=None, tolerance=REGRESS_TOLERANCE, update=False):
+    """Checks every replay in the list paths and returns a list of the result
+    dicts from check_replay, in the same order.
+
+    The replays are shared among workers processes (the number of CPU cores if
+    None). With one worker, or one replay, no processes are started.
+    """
+    if workers == None:
+        workers = os.cpu_count() or 1
+    jobs = [(p, tolerance, update) for p in paths]
+    if workers <= 1 or len(jobs) <= 1:
+        return [_check_args(j) for j in jobs]
+    chunk = max(1, len(jobs) // (4*workers))
+    with multiprocessing.Pool(min(workers, len(jobs))) as pool:
+        return pool.map(_check_args, jobs, chunk)
+
+
+def summary(results):
+    """Returns the text of the per-level summary of the list results, followed by
+    a line for each replay that failed.
+    """
+    levels = {}
+    for r in results:
+        levels.setdefault(r['level'] or '?', []).append(r)
+    order = []
+    registry = get_registry()
+    for n in range(1, len(registry) + 1):
+        if registry.name(n) in levels:
+            order.append(registry.name(n))
+    order.extend(sorted(k for k in levels if k not in order))
+    lines = ['%-8s %7s %7s %7s %10s' % ('level', 'replays', 'passed', 'failed', 'ticks')]
+    for name in order:
+        group = levels[name]
+        passed = sum(1 for r in group if r['ok'])
+        ticks = sum(r.get('steps', 0) for r in group)
+        lines.append('%-8s %7d %7d %7d %10d' % (name, len(group), passed, len(group) - passed, ticks))
+    failed = [r for r in results if not r['ok']]
+    for r in failed:
+        lines.append('FAIL %s: %s' % (r['path'], r['problem']))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """Runs the harness with the command line arguments argv (sys.argv if None)
+    and returns the exit status: 0 if every replay matches, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description='Check golden replays against the current physics.')
+    parser.add_argument('folder', nargs='?', default=GOLDEN_DIR, help='folder of .rpl files')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes')
+    parser.add_argument('--tolerance', type=float, default=REGRESS_TOLERANCE,
+                        help='allowed final position error in pixels')
+    parser.add_argument('--update', action='store_true', help='save the new results into the replays')
+    args = parser.parse_args(argv)
+    paths = find_replays(args.folder)
+    if len(paths) == 0:
+        print('no replays in %s' % args.folder)
+        return 1
+    start = time.perf_counter()
+    results = run_all(paths, args.workers, args.tolerance, args.update)
+    print(summary(results))
+    failed = sum(1 for r in results if not r['ok'])
+    print('%d replays, %d failed, %.2f s' % (len(results), failed, time.perf_counter() - start))
+    if args.update:
+        return 1 if any(r.get('updated') == False for r in results) else 0
+    return 1 if failed > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
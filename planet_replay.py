@@ -0,0 +1,327 @@
+# planet_replay.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains replay recording and playback for the Planets game.
+
+The physics is deterministic, so a run is fully described by its level, the
+physics settings and the thrust code of every tick (see planet_kernel). A Replay
+stores the codes run-length encoded in an array('B'), one byte per run:
+
+    low 4 bits      the thrust code
+    high 4 bits     the length of the run minus 1, for runs of 1 to 15 ticks;
+                    15 means the run is at least 16 ticks long, and the extra
+                    length follows as a variable length number (7 bits a byte,
+                    low bits first)
+
+Holding a key, or no key, for a while costs one or two bytes, so a ten minute run
+(36,000 ticks) is a few KB. The Replay also keeps the constants G, SHIP_ACCEL_1
+and SHIP_ACCEL_2 it was recorded with, and how the run ended, so a later version
+of the game can tell whether it still plays the same.
+
+A Recorder collects the codes while Play.tick runs. To watch a replay, give a
+ReplayPlayer a Play and call its tick once per physics tick; to check a replay
+quickly, play_headless runs it on a Level without any graphics."""
+
+import json
+import os
+import struct
+from array import array
+from planet_constants import *
+from planet_physics import *
+from planet_levels import *
+
+
+#: first bytes of a replay file
+_MAGIC = b'PRPL'
+#: version of the replay file format
+_VERSION = 1
+#: the constants a replay only plays the same with
+_PHYSICS = ('G', 'SHIP_ACCEL_1', 'SHIP_ACCEL_2', 'TICK')
+
+
+class Replay(object):
+    """A recorded run of one level.
+
+    ATTRIBUTES:
+        level   [str] the name of the level
+        runs    [array('B')] the run-length encoded thrust codes
+        ticks   [int>=0] the number of ticks recorded
+        physics [dict] the value of each constant in _PHYSICS when it was recorded
+        method  [EULER or VERLET] the integrator used
+        substeps [int>0] the number of substeps per tick
+        swept   [bool] True if collisions were swept
+        teleporting [bool] the ship's wormhole latch at the start of the run
+        outcome [int] FINISHED, CRASHED or RUNNING (if the run was stopped)
+        final   [tuple] the ship's (x, y) position after the last tick
+    """
+
+    def __init__(self, level, method=INTEGRATOR, substeps=SUBSTEPS, swept=SWEPT, teleporting=False):
+        """Initializer: Creates an empty replay of the level named level, with the
+        physics constants as they are now.
+        """
+        self.level = level
+        self.runs = array('B')
+        self.ticks = 0
+        self.physics = current_physics()
+        self.method = method
+        self.substeps = substeps
+        self.swept = swept
+        self.teleporting = teleporting
+        self.outcome = RUNNING
+        self.final = None
+        self._code = -1
+        self._count = 0
+
+
+    def add(self, code):
+        """Adds the thrust code of one tick.
+        """
+        if code == self._code:
+            self._count += 1
+        else:
+            self._flush()
+            self._code = code
+            self._count = 1
+        self.ticks += 1
+
+
+    def end(self, outcome, body):
+        """Records that the run ended with outcome and the Body body where it is.
+        """
+        self._flush()
+        self._code = -1
+        self.outcome = outcome
+        self.final = (body.x, body.y)
+
+
+    def cut(self, ticks):
+        """Keeps only the first ticks ticks, for a run that was rewound to there.
+        The run is running again.
+        """
+        codes = self.codes()[:max(0, ticks)]
+        self.runs = array('B')
+        self.ticks = 0
+        self._count = 0
+        self.outcome = RUNNING
+        self.final = None
+        for code in codes:
+            self.add(code)
+
+
+    def _flush(self):
+        """Helper to add and end.
+        Encodes the run of the current code into runs.
+        """
+        if self._count == 0:
+            return
+        n = self._count - 1
+        if n < 15:
+            self.runs.append(self._code | (n << 4))
+        else:
+            self.runs.append(self._code | 0xF0)
+            n -= 15
+            while n >= 0x80:
+                self.runs.append((n & 0x7F) | 0x80)
+                n >>= 7
+            self.runs.append(n)
+        self._count = 0
+
+
+    def codes(self):
+        """Returns the thrust codes of every recorded tick as a new array('B').
+        """
+        self._flush()
+        self._code = -1
+        out = array('B')
+        runs = self.runs
+        i = 0
+        while i < len(runs):
+            b = runs[i]
+            i += 1
+            n = b >> 4
+            if n == 15:
+                extra = 0
+                shift = 0
+                while True:
+                    c = runs[i]
+                    i += 1
+                    extra |= (c & 0x7F) << shift
+                    shift += 7
+                    if c < 0x80:
+                        break
+                n += extra
+            out.extend(array('B', [b & 0x0F])*(n + 1))
+        return out
+
+
+    def check(self):
+        """Raises a ValueError if the physics constants are not the ones this
+        replay was recorded with, since it would not play the same.
+        """
+        now = current_physics()
+        for name in _PHYSICS:
+            if self.physics.get(name) != now[name]:
+                raise ValueError('replay recorded with %s = %r, but it is now %r' %
+                                 (name, self.physics.get(name), now[name]))
+
+
+def current_physics():
+    """Returns a dict of the current value of each constant in _PHYSICS.
+    """
+    return {'G': G, 'SHIP_ACCEL_1': SHIP_ACCEL_1, 'SHIP_ACCEL_2': SHIP_ACCEL_2, 'TICK': TICK}
+
+
+def save_replay(replay, path):
+    """Writes replay to the file path.
+
+    The file is the magic bytes, the format version, the length of a JSON header
+    with everything but the codes, the header, and then the runs.
+    """
+    replay._flush()
+    replay._code = -1
+    head = {'level': replay.level, 'ticks': replay.ticks, 'physics': replay.physics,
+            'method': replay.method, 'substeps': replay.substeps, 'swept': replay.swept,
+            'teleporting': replay.teleporting, 'outcome': replay.outcome, 'final': replay.final}
+    text = json.dumps(head).encode('utf-8')
+    folder = os.path.dirname(path)
+    if folder != '' and not os.path.isdir(folder):
+        os.makedirs(folder)
+    with open(path, 'wb') as f:
+        f.write(_MAGIC + struct.pack('<HI', _VERSION, len(text)))
+        f.write(text)
+        f.write(replay.runs.tobytes())
+
+
+def load_replay(path):
+    """Returns the Replay stored in the file path.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:4] != _MAGIC:
+        raise ValueError('%s: not a replay file' % path)
+    version, size = struct.unpack_from('<HI', data, 4)
+    if version != _VERSION:
+        raise ValueError('%s: replay version %d is not supported' % (path, version))
+    head = json.loads(data[10:10+size].decode('utf-8'))
+    replay = Replay(head['level'], head['method'], head['substeps'], head['swept'], head['teleporting'])
+    replay.ticks = head['ticks']
+    replay.physics = head['physics']
+    replay.outcome = head['outcome']
+    replay.final = tuple(head['final']) if head['final'] != None else None
+    replay.runs = array('B', data[10+size:])
+    return replay
+
+
+def replay_path(name):
+    """Returns the path of the replay file called name in REPLAY_DIR.
+    """
+    return os.path.join(REPLAY_DIR, name + '.rpl')
+
+
+def replay_level(replay):
+    """Returns the number of the level that replay was recorded on, from the
+    registry in planet_levels.
+    """
+    number = get_registry().find_name(replay.level)
+    if number == 0:
+        raise ValueError('there is no level named %s' % replay.level)
+    return number
+
+
+class Recorder(object):
+    """Records the thrust codes used by a Play object into a Replay.
+
+    ATTRIBUTES:
+        replay  [Replay object] the replay being recorded
+        _back   [int>=0] the number of recorded ticks that were rewound, to be cut
+            from the replay when the next tick is recorded
+    """
+
+    def __init__(self, level, play):
+        """Initializer: Starts recording play, a Play object for the level named
+        level, from where its ship is now.
+        """
+        method, substeps, swept = play.get_integrator()
+        body = play.get_ship().get_body()
+        self.replay = Replay(level, method, substeps, swept, body.teleporting)
+        self._back = 0
+
+
+    def record(self, code, outcome, body):
+        """Records one tick with thrust code code, after which the Body body has
+        outcome outcome. Called by Play.tick.
+        """
+        if self._back > 0:
+            self.replay.cut(self.replay.ticks - self._back)
+            self._back = 0
+        self.replay.add(code)
+        if outcome != RUNNING:
+            self.replay.end(outcome, body)
+
+
+    def rewind(self, ticks):
+        """Forgets the last ticks recorded ticks, which were rewound. Called by
+        Play.rewind; the replay is cut once the run goes on, so that holding the
+        rewind key does not cut it every tick.
+        """
+        self._back = min(self.replay.ticks, self._back + ticks)
+
+
+class ReplayPlayer(object):
+    """Plays a Replay back through a Play object, one tick at a time, so that it
+    can be drawn at display speed.
+
+    ATTRIBUTES:
+        replay  [Replay object] the replay being played
+        _play   [Play object] the game it is played in
+        _codes  [array('B')] the thrust code of every tick
+        _next   [int>=0] the next tick to play
+    """
+
+    def __init__(self, replay, play):
+        """Initializer: Resets play and gets ready to play replay in it.
+        """
+        replay.check()
+        self.replay = replay
+        self._play = play
+        self._codes = replay.codes()
+        self._next = 0
+        play.reset()
+        play.set_integrator(replay.method, replay.substeps, replay.swept)
+        play.get_ship().set_teleport(replay.teleporting)
+
+
+    def done(self):
+        return self._next >= len(self._codes)
+
+
+    def played(self):
+        """Returns the number of ticks played so far.
+        """
+        return self._next
+
+
+    def tick(self):
+        """Plays one tick and returns its outcome: FINISHED, CRASHED or RUNNING.
+        After the last tick this does nothing and returns RUNNING.
+        """
+        if self.done():
+            return RUNNING
+        code = self._codes[self._next]
+        self._next += 1
+        return self._play.tick_code(code)
+
+
+def play_headless(replay, level=None):
+    """Runs replay as fast as possible with no graphics and returns a tuple
+    (outcome, steps, body), as planet_physics.run does.
+
+    level is the Level to run on; if it is None, it comes from the registry.
+    """
+    replay.check()
+    if level == None:
+        level = get_registry().spec(replay_level(replay)).to_level()
+    body = level.new_body()
+    body.teleporting = replay.teleporting
+    return run(level, replay.codes(), body, replay.substeps, replay.method, replay.swept)
@@ -0,0 +1,107 @@
+# planet_rewind.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the rewind buffer for the Planets game.
+
+Before every tick, Play saves the state of the ship's body in a RewindBuffer:
+its position, velocity, orientation and wormhole latch. The buffer is a ring of
+fixed size, REWIND_SECONDS worth of ticks, stored in one preallocated NumPy
+array per field, like PlanetTable, so saving a tick allocates nothing and the
+memory used does not grow however long the level is played. When the buffer is
+full, each new tick overwrites the oldest one.
+
+Holding REWIND_KEY steps the ship back through the saved ticks. Going back any
+number of ticks is a single lookup, since the ring is indexed directly."""
+
+import numpy as np
+from planet_constants import *
+
+
+class RewindBuffer(object):
+    """A ring of the last capacity saved states of a Body.
+
+    ATTRIBUTES:
+        capacity [int>0] the most states kept
+        x, y    [float64 array] the positions
+        xv, yv  [float64 array] the velocities
+        angle   [int16 array] the orientations in degrees
+        teleporting [bool array] the wormhole latches
+        _head   [int] the index the next state is saved at
+        _count  [int] the number of states kept, at most capacity
+    """
+
+    def __init__(self, capacity=None):
+        """Initializer: Creates an empty buffer holding capacity states, or
+        REWIND_SECONDS worth of ticks if capacity is None.
+        """
+        if capacity == None:
+            capacity = int(round(REWIND_SECONDS/TICK))
+        self.capacity = max(1, capacity)
+        self.x = np.zeros(self.capacity)
+        self.y = np.zeros(self.capacity)
+        self.xv = np.zeros(self.capacity)
+        self.yv = np.zeros(self.capacity)
+        self.angle = np.zeros(self.capacity, dtype=np.int16)
+        self.teleporting = np.zeros(self.capacity, dtype=bool)
+        self._head = 0
+        self._count = 0
+
+
+    def __len__(self):
+        return self._count
+
+
+    def push(self, body):
+        """Saves the state of the Body body, overwriting the oldest state if the
+        buffer is full.
+        """
+        i = self._head
+        self.x[i] = body.x
+        self.y[i] = body.y
+        self.xv[i] = body.xv
+        self.yv[i] = body.yv
+        self.angle[i] = body.angle
+        self.teleporting[i] = body.teleporting
+        self._head = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+
+    def restore(self, body, back=1):
+        """Puts the Body body in the state saved back states ago (1 is the last
+        one saved), and returns True, or returns False if there is no such state.
+        """
+        if back < 1 or back > self._count:
+            return False
+        i = (self._head - back) % self.capacity
+        body.x = float(self.x[i])
+        body.y = float(self.y[i])
+        body.xv = float(self.xv[i])
+        body.yv = float(self.yv[i])
+        body.angle = int(self.angle[i])
+        body.teleporting = bool(self.teleporting[i])
+        body.px = body.x
+        body.py = body.y
+        return True
+
+
+    def rewind(self, body, ticks):
+        """Puts the Body body back ticks states (or as many as are kept, if fewer),
+        and forgets the states after it, so that the next push follows it.
+        Returns the number of states gone back.
+        """
+        ticks = min(ticks, self._count)
+        if ticks <= 0:
+            return 0
+        self.restore(body, ticks)
+        self._head = (self._head - ticks) % self.capacity
+        self._count -= ticks
+        return ticks
+
+
+    def clear(self):
+        """Forgets every saved state.
+        """
+        self._head = 0
+        self._count = 0
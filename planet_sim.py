@@ -0,0 +1,116 @@
+# planet_sim.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the interpolated drawing and the simulation thread for the
+Planets game.
+
+The physics always runs in fixed ticks of TICK seconds. After every tick, Play
+publishes a snapshot of the ship: a tuple
+
+    (x, y, angle, thrusting, warped)
+
+where warped is True if the ship came out of a wormhole on that tick. Play keeps
+the snapshots of the last two ticks as one tuple (previous, current, time), and
+replaces the whole tuple at once, so a reader on another thread always sees two
+snapshots that belong together without taking a lock.
+
+When a frame is drawn, the ship is drawn between the two snapshots, at the
+fraction of a tick that has passed since the last one (see interpolate), so its
+motion is smooth at any frame rate while the physics itself never depends on the
+frame rate.
+
+By default the ticks are run by the game's Clock at the start of each frame. With
+SIM_THREAD, a Simulation runs them on its own thread at the real tick rate
+instead, so that a slow frame does not hold up the physics at all; the game
+thread then only hands it the keys held and reads its snapshots. Headless runs
+(planet_physics.run, planet_replay) need neither and draw nothing."""
+
+import threading
+import time
+from planet_constants import *
+
+
+def interpolate(prev, cur, alpha):
+    """Returns a tuple (x, y, angle, thrusting) for drawing the ship alpha of the
+    way (0 to 1) from the snapshot prev to the snapshot cur.
+
+    The angle and thrust are taken from cur, since they only have a few values.
+    If the ship warped on the current tick it is drawn at cur, rather than
+    sliding across the screen between the two wormholes.
+    """
+    if cur[4] or alpha >= 1.0:
+        return cur[:4]
+    if alpha <= 0.0:
+        return (prev[0], prev[1], cur[2], cur[3])
+    return (prev[0] + alpha*(cur[0] - prev[0]), prev[1] + alpha*(cur[1] - prev[1]), cur[2], cur[3])
+
+
+class Simulation(object):
+    """Runs the ticks of a Play on their own thread, TICK seconds apart.
+
+    The game thread sets code to the thrust code of the keys held on every frame
+    and reads outcome; the simulation thread only reads code and only writes
+    outcome once, when the level ends. Play publishes its snapshots as one tuple,
+    so none of these need a lock.
+
+    ATTRIBUTES:
+        code    [int] the thrust code used by the next tick
+        outcome [int] RUNNING until a tick returns FINISHED or CRASHED
+        _play   [Play object] the game being simulated
+        _tick   [float>0] length of one tick in seconds
+        _stop   [bool] True when the thread has been asked to stop
+        _thread [Thread object] the simulation thread
+    """
+
+    def __init__(self, play, code=0, tick=TICK):
+        self.code = code
+        self.outcome = RUNNING
+        self._play = play
+        self._tick = tick
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name='simulation')
+        self._thread.daemon = True
+        self._thread.start()
+
+
+    def _run(self):
+        """Helper to the initializer; the body of the thread.
+        Runs a tick every _tick seconds of the real clock. If it falls more than
+        MAX_TICKS ticks behind, it skips ahead, like Clock.
+        """
+        due = time.perf_counter()
+        while not self._stop:
+            now = time.perf_counter()
+            if now < due:
+                time.sleep(min(due - now, 0.002))
+                continue
+            if now - due > MAX_TICKS*self._tick:
+                due = now
+            while due <= now and not self._stop:
+                outcome = self._play.advance(self.code)
+                due += self._tick
+                if outcome != RUNNING:
+                    self.outcome = outcome
+                    return
+
+
+    def alpha(self):
+        """Returns the fraction of a tick, between 0 and 1, that has passed since
+        the last tick.
+        """
+        when = self._play.shots()[2]
+        return min(1.0, max(0.0, (time.perf_counter() - when)/self._tick))
+
+
+    def running(self):
+        """Returns True if the thread is still running ticks.
+        """
+        return self._thread.is_alive()
+
+
+    def stop(self):
+        """Stops the thread and waits for it to finish its tick.
+        """
+        self._stop = True
+        self._thread.join()
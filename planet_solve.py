@@ -0,0 +1,280 @@
+# planet_solve.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the level solver for the Planets game.
+
+The solver looks for the quickest way through a level with a beam search over the
+nine thrust codes the keys can give: coasting, and thrusting in each of the eight
+directions. Each move holds one code for a number of ticks (hold), so a search
+of a few hundred moves covers a long flight.
+
+The search goes one move at a time. From every ship in the beam, all nine moves
+are flown at once with planet_batch.rollout, which follows planet_physics.step
+exactly. Ships that crash are dropped. Ships that land on nearly the same state
+are merged: their position is rounded to SOLVE_CELL pixels and their velocity to
+SOLVE_SPEED pixels per tick, and only the best of each is kept. The best few
+hundred (the width) go on to the next move. A ship is better the closer it is
+headed to the finish, measured along the shortest way around the planets and
+through the wormholes (see distance_field). The first move on which a ship
+finishes gives the solution.
+
+Several holds and widths are tried for each level, in a pool of processes with
+one per CPU core, and the solution with the fewest ticks is the level's par. It
+is saved as a replay, so it can be watched in the game or checked by
+planet_regress. Run it from the command line:
+
+    python planet_solve.py [level ...] [--width W] [--workers N] [--golden]
+
+With no levels, every level in the registry is solved. Replays are saved to
+REPLAY_DIR as <level>-par.rpl, or to GOLDEN_DIR with --golden."""
+
+import argparse
+import heapq
+import math
+import multiprocessing
+import os
+import sys
+import time
+import numpy as np
+from planet_constants import *
+from planet_physics import *
+from planet_batch import BatchResult, rollout
+from planet_replay import *
+
+#: the thrust codes of the moves: coast, then the eight directions
+MOVES = np.array([0, KEY_UP, KEY_UP | KEY_RIGHT, KEY_RIGHT, KEY_DOWN | KEY_RIGHT, KEY_DOWN,
+                  KEY_DOWN | KEY_LEFT, KEY_LEFT, KEY_UP | KEY_LEFT], dtype=np.uint8)
+
+
+def distance_field(level, cell=SOLVE_CELL):
+    """Returns a 2D array with the distance in pixels from the center of each cell
+    of a grid of cell pixels over the screen to the finish, going around the
+    planets (with SOLVE_MARGIN pixels to spare) and through the wormholes. Cells
+    in a planet, or from which the finish cannot be reached, are inf.
+
+    The distances are found with Dijkstra's algorithm going out from the finish,
+    over steps to the eight neighbouring cells; a wormhole's cell is as far as
+    its sister's, since the ship jumps from one to the other.
+    """
+    t = level.table
+    cols = int(math.ceil(GAME_WIDTH/cell))
+    rows = int(math.ceil(GAME_HEIGHT/cell))
+    cx = (np.arange(cols) + 0.5)*cell
+    cy = (np.arange(rows) + 0.5)*cell
+    gx, gy = np.meshgrid(cx, cy)
+    blocked = np.zeros((rows, cols), dtype=bool)
+    for i in range(len(t.px)):
+        reach = math.sqrt(t.r2[i]) + SOLVE_MARGIN
+        blocked |= (gx - t.px[i])**2 + (gy - t.py[i])**2 < reach*reach
+    worm_cells = [_cell(t.wx[i], t.wy[i], cell, cols, rows) for i in range(len(t.wx))]
+    jumps = {}
+    for i in range(len(t.wx)):
+        jumps.setdefault(worm_cells[t.sister[i]], []).append(worm_cells[i])
+    dist = np.full((rows, cols), np.inf)
+    x0, y0 = _cell(level.finishx - level.finishw, level.finishy - level.finishh, cell, cols, rows)
+    x1, y1 = _cell(level.finishx + level.finishw, level.finishy + level.finishh, cell, cols, rows)
+    heap = []
+    for r in range(y0, y1 + 1):
+        for c in range(x0, x1 + 1):
+            dist[r, c] = 0.0
+            heap.append((0.0, c, r))
+    steps = [(dx, dy, cell*math.hypot(dx, dy)) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+    while len(heap) > 0:
+        d, c, r = heapq.heappop(heap)
+        if d > dist[r, c]:
+            continue
+        nexts = [(c + dx, r + dy, d + cost) for dx, dy, cost in steps]
+        nexts.extend((wc, wr, d) for wc, wr in jumps.get((c, r), []))
+        for nc, nr, nd in nexts:
+            if 0 <= nc < cols and 0 <= nr < rows and not blocked[nr, nc] and nd < dist[nr, nc]:
+                dist[nr, nc] = nd
+                heapq.heappush(heap, (nd, nc, nr))
+    return dist
+
+
+def _cell(x, y, cell, cols, rows):
+    """Helper to distance_field.
+    Returns the (column, row) of the grid cell holding the point (x,y).
+    """
+    return (min(cols - 1, max(0, int(x // cell))), min(rows - 1, max(0, int(y // cell))))
+
+
+def heuristic(field, x, y, xv, yv, ahead, cell=SOLVE_CELL):
+    """Returns an array of the distance to the finish of each ship (x[i],y[i])
+    with velocity (xv[i],yv[i]), from field (see distance_field), measured from
+    where it will be in ahead ticks if nothing pulls it.
+    """
+    rows, cols = field.shape
+    c = np.clip(((x + ahead*xv) // cell).astype(int), 0, cols - 1)
+    r = np.clip(((y + ahead*yv) // cell).astype(int), 0, rows - 1)
+    return field[r, c]
+
+
+def state_keys(x, y, xv, yv, tele):
+    """Returns an int64 array with one key per ship, equal for ships whose states
+    round to the same SOLVE_CELL and SOLVE_SPEED cells.
+    """
+    kx = np.floor(x/SOLVE_CELL).astype(np.int64) + 1024
+    ky = np.floor(y/SOLVE_CELL).astype(np.int64) + 1024
+    kxv = np.clip(np.floor(xv/SOLVE_SPEED).astype(np.int64) + 2048, 0, 4095)
+    kyv = np.clip(np.floor(yv/SOLVE_SPEED).astype(np.int64) + 2048, 0, 4095)
+    return ((((kx*4096 + ky)*4096 + kxv)*4096 + kyv) << 1) | tele.astype(np.int64)
+
+
+def solve(level, hold, width, max_ticks=SOLVE_MAX_TICKS, substeps=SUBSTEPS,
+          method=INTEGRATOR, swept=SWEPT):
+    """Searches level, a Level, holding each move for hold ticks and keeping width
+    ships after each move, and returns the list of thrust codes of the quickest
+    flight found to the finish, or None if the search ran out of ships or of
+    max_ticks ticks.
+    """
+    field = distance_field(level)
+    beam = BatchResult(1)
+    beam.x[0] = level.startx
+    beam.y[0] = level.starty
+    moves = len(MOVES)
+    parents = []
+    codes = np.repeat(MOVES, hold).reshape(moves, hold)
+    for depth in range(max(1, max_ticks // hold)):
+        n = len(beam.x)
+        start = BatchResult(n*moves)
+        for name in ('x', 'y', 'xv', 'yv', 'angle', 'teleporting'):
+            getattr(start, name)[:] = np.repeat(getattr(beam, name), moves)
+        result = rollout(level, np.tile(codes, (n, 1)), start=start, substeps=substeps,
+                         method=method, swept=swept)
+        done = np.flatnonzero(result.outcome == FINISHED)
+        if len(done) > 0:
+            first = done[np.argmin(result.steps[done])]
+            path = _path(parents, first // moves)
+            path.append(first % moves)
+            flight = []
+            for m in path[:-1]:
+                flight.extend([int(MOVES[m])]*hold)
+            flight.extend([int(MOVES[path[-1]])]*int(result.steps[first]))
+            return flight
+        alive = np.flatnonzero(result.outcome == RUNNING)
+        if len(alive) == 0:
+            return None
+        x = result.x[alive]
+        y = result.y[alive]
+        xv = result.xv[alive]
+        yv = result.yv[alive]
+        tele = result.teleporting[alive]
+        score = heuristic(field, x, y, xv, yv, hold)
+        order = np.argsort(score, kind='stable')
+        keys = state_keys(x, y, xv, yv, tele)[order]
+        unique, first = np.unique(keys, return_index=True)
+        keep = order[np.sort(first)][:width]
+        rows = alive[keep]
+        parents.append((rows // moves, rows % moves))
+        beam = BatchResult(len(rows))
+        for name in ('x', 'y', 'xv', 'yv', 'angle', 'teleporting'):
+            getattr(beam, name)[:] = getattr(result, name)[rows]
+    return None
+
+
+def _path(parents, index):
+    """Helper to solve.
+    Returns the list of move numbers that led to ship index of the beam, from the
+    list parents of (parent index, move) arrays of every depth.
+    """
+    path = []
+    for parent, move in reversed(parents):
+        path.append(int(move[index]))
+        index = int(parent[index])
+    path.reverse()
+    return path
+
+
+def _solve_job(job):
+    """Helper to solve_levels; the function given to the process pool.
+    Returns a tuple (name, hold, codes, seconds) for one level, hold and width.
+    """
+    name, hold, width = job
+    registry = get_registry()
+    level = registry.spec(registry.find_name(name)).to_level()
+    start = time.perf_counter()
+    codes = solve(level, hold, width)
+    return (name, hold, codes, time.perf_counter() - start)
+
+
+def solve_levels(names, widths=SOLVE_WIDTHS, holds=SOLVE_HOLDS, workers=None):
+    """Solves each level named in the list names with each hold in holds and each
+    width in widths, in a pool of workers processes (the number of CPU cores if
+    None), and returns a dict that maps each name to a tuple (codes, hold,
+    seconds) for its quickest solution, or (None, None, seconds) if none was
+    found. seconds is the total time spent on the level.
+    """
+    if workers == None:
+        workers = os.cpu_count() or 1
+    jobs = [(name, hold, width) for name in names for width in widths for hold in holds]
+    if workers <= 1 or len(jobs) <= 1:
+        results = [_solve_job(j) for j in jobs]
+    else:
+        with multiprocessing.Pool(min(workers, len(jobs))) as pool:
+            results = pool.map(_solve_job, jobs, 1)
+    best = {}
+    for name, hold, codes, seconds in results:
+        old = best.get(name, (None, None, 0.0))
+        total = old[2] + seconds
+        if codes != None and (old[0] == None or len(codes) < len(old[0])):
+            best[name] = (codes, hold, total)
+        else:
+            best[name] = (old[0], old[1], total)
+    return best
+
+
+def make_replay(name, codes):
+    """Returns a Replay of the thrust codes codes on the level named name, played
+    headless to record how it ends.
+    """
+    replay = Replay(name)
+    for code in codes:
+        replay.add(code)
+    outcome, steps, body = play_headless(replay)
+    replay.end(outcome, body)
+    return replay
+
+
+def main(argv=None):
+    """Runs the solver with the command line arguments argv (sys.argv if None)
+    and returns the exit status: 0 if every level was solved, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description='Find the quickest flight through each level.')
+    parser.add_argument('levels', nargs='*', help='names of the levels to solve (all if none)')
+    parser.add_argument('--width', type=int, default=None, help='ships kept after each move')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes')
+    parser.add_argument('--golden', action='store_true', help='save the replays to the golden folder')
+    args = parser.parse_args(argv)
+    registry = get_registry()
+    names = args.levels or [registry.name(n) for n in range(1, len(registry) + 1)]
+    for name in names:
+        if registry.find_name(name) == 0:
+            print('there is no level named %s' % name)
+            return 1
+    start = time.perf_counter()
+    widths = SOLVE_WIDTHS if args.width == None else (args.width,)
+    best = solve_levels(names, widths, workers=args.workers)
+    folder = GOLDEN_DIR if args.golden else REPLAY_DIR
+    failed = 0
+    print('%-8s %7s %8s %5s %8s' % ('level', 'ticks', 'par', 'hold', 'search'))
+    for name in names:
+        codes, hold, seconds = best[name]
+        if codes == None:
+            failed += 1
+            print('%-8s %7s %8s %5s %7.2fs' % (name, '-', 'unsolved', '-', seconds))
+            continue
+        replay = make_replay(name, codes)
+        if replay.outcome != FINISHED:
+            failed += 1
+            print('%-8s %7d %8s %5d %7.2fs' % (name, len(codes), 'mismatch', hold, seconds))
+            continue
+        save_replay(replay, os.path.join(folder, name + '-par.rpl'))
+        print('%-8s %7d %7.2fs %5d %7.2fs' % (name, len(codes), len(codes)*TICK, hold, seconds))
+    print('%d levels, %d unsolved, %.2f s' % (len(names), failed, time.perf_counter() - start))
+    return 1 if failed > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# planet_sprites.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the ship sprite atlas for the Planets game.
+
+The ship only ever faces one of SHIP_TURNS directions (0, 45, ..., 315 degrees),
+but drawing it as a GImage with an angle rotates its texture again every frame.
+Instead, when a level starts, the ship image is rotated once to each direction
+and the results are put side by side in one atlas picture:
+
+    row 0   the ship coasting, facing 0, 45, ..., 315 degrees
+    row 1   the ship thrusting, in the same order
+
+so the ship is drawn as a GSprite that only changes its frame (see sprite_frame)
+when it turns or starts or stops thrusting. The thrusting row is made from
+SHIP_THRUST_IMAGE, or from SHIP_IMAGE if that file does not exist.
+
+Each frame is a square big enough to hold the ship at any angle, so a rotated
+ship is not cut off. Atlases are saved as PNG files in SPRITE_DIR, named by a hash
+of the images and sizes they are made from, so they are only made once. Ghosts
+(see planet_ghosts) are drawn from a second atlas whose pixels are made
+translucent once, when it is painted, rather than every frame.
+
+Making an atlas needs Pillow, and drawing it needs GSprite from game2d. Without
+either, ship_atlas returns None and the ship is drawn rotated as before."""
+
+import hashlib
+import json
+import math
+import os
+from planet_constants import *
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def sprite_frame(angle, thrusting):
+    """Returns the number of the atlas frame showing the ship facing angle degrees
+    (rounded to the nearest of the SHIP_TURNS directions), thrusting or not.
+    """
+    turn = int(round(angle*SHIP_TURNS/360.0)) % SHIP_TURNS
+    if thrusting:
+        return SHIP_TURNS + turn
+    return turn
+
+
+def cell_size(width, height):
+    """Returns the side of a square that holds a width by height image turned to
+    any angle.
+    """
+    return int(math.ceil(math.hypot(width, height)))
+
+
+def atlas_key(sources, width, height, opacity=1.0):
+    """Returns the hash that names the atlas made from the image files sources at
+    the size width by height and opacity opacity. It changes when one of the
+    files is modified.
+    """
+    h = hashlib.sha1()
+    h.update(json.dumps([sources, width, height, SHIP_TURNS, opacity]).encode('utf-8'))
+    for source in sources:
+        path = os.path.join(IMAGE_DIR, source)
+        if os.path.exists(path):
+            h.update(str(os.path.getmtime(path)).encode('utf-8'))
+    return h.hexdigest()
+
+
+def paint_atlas(sources, width, height, path, opacity=1.0):
+    """Makes the atlas of the image files sources, one row per file, each scaled
+    to width by height and turned to each of the SHIP_TURNS directions, and saves
+    it as PNG in path. The alpha of every pixel is multiplied by opacity.
+    """
+    cell = cell_size(width, height)
+    atlas = Image.new('RGBA', (cell*SHIP_TURNS, cell*len(sources)), (0, 0, 0, 0))
+    for row in range(len(sources)):
+        picture = Image.open(os.path.join(IMAGE_DIR, sources[row])).convert('RGBA')
+        picture = picture.resize((width, height), Image.LANCZOS)
+        if opacity < 1.0:
+            picture.putalpha(picture.getchannel('A').point(lambda a: int(round(a*opacity))))
+        square = Image.new('RGBA', (cell, cell), (0, 0, 0, 0))
+        square.paste(picture, ((cell - width)//2, (cell - height)//2))
+        for turn in range(SHIP_TURNS):
+            # Image.rotate turns counterclockwise, like the angle of a GObject
+            frame = square.rotate(turn*360.0/SHIP_TURNS, resample=Image.BICUBIC)
+            atlas.paste(frame, (turn*cell, row*cell))
+    folder = os.path.dirname(path)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    temp = path + '.tmp.png'
+    atlas.save(temp)
+    os.replace(temp, path)
+
+
+#: the ship atlases made so far, as returned by ship_atlas, by opacity
+_ATLASES = {}
+
+
+def ship_atlas(opacity=1.0):
+    """Returns a tuple (path, rows, columns, cell) describing the ship's atlas
+    drawn at opacity opacity (less than 1 for ghosts), making it first if it is
+    not in SPRITE_DIR yet, or None if there is no atlas (Pillow is missing,
+    SPRITES is False or the ship image cannot be read).
+
+    cell is the side of each frame, which is also the width and height to draw
+    the sprite at.
+    """
+    if opacity in _ATLASES:
+        return _ATLASES[opacity]
+    if Image == None or not SPRITES:
+        return None
+    thrust = SHIP_THRUST_IMAGE
+    if not os.path.exists(os.path.join(IMAGE_DIR, thrust)):
+        thrust = SHIP_IMAGE
+    sources = [SHIP_IMAGE, thrust]
+    path = os.path.join(SPRITE_DIR, atlas_key(sources, SHIP_WIDTH, SHIP_HEIGHT, opacity) + '.png')
+    try:
+        if not os.path.exists(path):
+            paint_atlas(sources, SHIP_WIDTH, SHIP_HEIGHT, path, opacity)
+    except (IOError, OSError):
+        return None
+    _ATLASES[opacity] = (path, len(sources), SHIP_TURNS, cell_size(SHIP_WIDTH, SHIP_HEIGHT))
+    return _ATLASES[opacity]
@@ -0,0 +1,336 @@
+# planet_textures.py
+# Zachary Mayle
+# 10/18/26
+
+"""This module contains the shared texture cache for the Planets game.
+
+Many images are used again and again ("mars.png" is in most levels), and each
+level's background is a full screen picture. A TextureCache keeps the images
+used by each (file, size), but decodes each file only once and shares its
+texture among all the sizes it is drawn at, since a texture is the size of its
+file. The images are kept in least recently used order, and when the total size
+of the decoded files goes over TEXTURE_BUDGET the oldest ones are let go, except
+those pinned by the level being played. A file's texture is only let go with the
+last of its sizes.
+
+Reading the files is the slow part, so preload reads the files of the next level
+on a background thread while the player is looking at the READY or COMPLETE
+screen. Textures can only be made on the main thread, so the game calls pump once
+a frame to decode at most TEXTURE_PUMP of the files that have been read.
+
+game2d draws a GImage through kivy, which finds the image's texture in kivy's own
+texture cache under the image's file path. The default loader makes the texture
+through kivy in the same way, so the GImage objects use the texture that is held
+here, and kivy's cache is told to keep textures until this cache lets them go.
+
+kivy is only imported when a texture is made, so this module can be used without
+it by passing a different loader."""
+
+import io
+import os
+import threading
+from collections import OrderedDict
+from planet_constants import *
+
+
+class TextureCache(object):
+    """A least recently used cache of decoded images, keyed by (file, size), with
+    one texture for each file.
+
+    ATTRIBUTES:
+        budget  [int>0] the most bytes of decoded images to keep
+        used    [int>=0] the bytes of decoded files kept now, counting each file
+            once however many sizes use it
+        hits    [int>=0] the number of requests found in the cache
+        misses  [int>=0] the number of requests that had to decode an image
+        _loader [function] makes a texture: loader(file, size, data) returns a tuple
+            (texture, bytes), where data is the file's contents or None if it has
+            not been read yet
+        _release [function or None] called with the file and texture of a file
+            whose last entry is let go
+        _entries [OrderedDict] maps (file, size) to the texture, least recently
+            used first
+        _files  [dict] maps each file in _entries to a list [texture, bytes,
+            count], where count is the number of its entries
+        _pinned [set] the keys that are never let go
+        _read   [dict] maps a file to its contents, for files read by preload but
+            not yet decoded
+        _wanted [list] the keys that preload asked for, in order
+        _lock   [Lock] guards _read and _wanted, which the preload thread changes
+        _thread [Thread or None] the running preload thread
+    """
+
+    def __init__(self, budget=TEXTURE_BUDGET, loader=None, release=None):
+        """Initializer: Creates an empty cache that keeps at most budget bytes.
+
+        If loader is None the textures are made with kivy; see kivy_loader.
+        """
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        if loader == None:
+            loader = kivy_loader
+            release = kivy_release
+        self._loader = loader
+        self._release = release
+        self._entries = OrderedDict()
+        self._files = {}
+        self._pinned = set()
+        self._read = {}
+        self._wanted = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+
+    def get(self, source, size):
+        """Returns the texture for the image file source drawn at size (a tuple
+        (width, height)), decoding it if the file is not in the cache at any size.
+        """
+        key = (source, _size_key(size))
+        texture = self._entries.get(key)
+        if texture != None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return texture
+        shared = self._files.get(source)
+        if shared != None:
+            self.hits += 1
+            texture = shared[0]
+            shared[2] += 1
+        else:
+            self.misses += 1
+            with self._lock:
+                data = self._read.get(source)
+            texture, cost = self._loader(source, key[1], data)
+            self._files[source] = [texture, cost, 1]
+            self.used += cost
+        with self._lock:
+            if key in self._wanted:
+                self._wanted.remove(key)
+            self._drop_read(source)
+        self._entries[key] = texture
+        self._evict()
+        return texture
+
+
+    def has(self, source, size):
+        return (source, _size_key(size)) in self._entries
+
+
+    def pin(self, keys):
+        """Makes the (file, size) tuples in keys the only ones that are never let
+        go, and loads any of them that are not in the cache.
+        """
+        self._pinned = set((source, _size_key(size)) for source, size in keys)
+        for source, size in keys:
+            self.get(source, size)
+
+
+    def _evict(self):
+        """Helper to get.
+        Lets go of the least recently used entries that are not pinned until the
+        cache is within its budget. A file's texture is let go, and its bytes
+        freed, with the last entry that uses it.
+        """
+        if self.used <= self.budget:
+            return
+        for key in list(self._entries.keys()):
+            if self.used <= self.budget:
+                break
+            if key in self._pinned:
+                continue
+            texture = self._entries.pop(key)
+            shared = self._files[key[0]]
+            shared[2] -= 1
+            if shared[2] == 0:
+                del self._files[key[0]]
+                self.used -= shared[1]
+                if self._release != None:
+                    self._release(key[0], texture)
+
+
+    def preload(self, keys):
+        """Reads the files of the (file, size) tuples in keys on a background
+        thread, so that pump or get can decode them without waiting for the disk.
+
+        Files already decoded, at any size, or already read are skipped. A call made while an
+        earlier preload is running adds to what it reads.
+        """
+        todo = [(source, _size_key(size)) for source, size in keys]
+        todo = [k for k in todo if k[0] not in self._files]
+        with self._lock:
+            for k in todo:
+                if k not in self._wanted:
+                    self._wanted.append(k)
+            if self._thread != None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._preload, name='texture-preload')
+            self._thread.daemon = True
+        self._thread.start()
+
+
+    def _preload(self):
+        """Helper to preload; the body of the background thread.
+        Reads every wanted file that has not been read yet.
+        """
+        while True:
+            with self._lock:
+                source = None
+                for k in self._wanted:
+                    if k[0] not in self._read:
+                        source = k[0]
+                        break
+                if source == None:
+                    return
+            data = read_image(source)
+            with self._lock:
+                if source in [k[0] for k in self._wanted]:
+                    self._read[source] = data
+
+
+    def pump(self, count=TEXTURE_PUMP):
+        """Decodes at most count of the images that preload has read. Call this
+        once a frame on the main thread. Returns the number decoded.
+        """
+        done = 0
+        while done < count:
+            with self._lock:
+                key = None
+                for k in self._wanted:
+                    if k[0] in self._read:
+                        key = k
+                        break
+                if key == None:
+                    return done
+                if key in self._entries:
+                    self._wanted.remove(key)
+                    self._drop_read(key[0])
+                    continue
+            self.get(key[0], key[1])
+            done += 1
+        return done
+
+
+    def _drop_read(self, source):
+        """Helper to get and pump; call it holding _lock.
+        Forgets the contents of the file source once no wanted image needs them.
+        """
+        for k in self._wanted:
+            if k[0] == source:
+                return
+        self._read.pop(source, None)
+
+
+    def waiting(self):
+        """Returns the number of preloaded images that are not decoded yet.
+        """
+        with self._lock:
+            return len(self._wanted)
+
+
+def _size_key(size):
+    """Returns size as a tuple of whole pixels, so that 200.0 and 200 are the same
+    key.
+    """
+    return (int(round(size[0])), int(round(size[1])))
+
+
+def image_path(source):
+    """Returns the path of the image file source in IMAGE_DIR.
+    """
+    return os.path.join(IMAGE_DIR, source)
+
+
+def read_image(source):
+    """Returns the contents of the image file source, or None if it cannot be read
+    (the main thread will then report the error when it decodes it).
+    """
+    try:
+        with open(image_path(source), 'rb') as f:
+            return f.read()
+    except IOError:
+        return None
+
+
+def kivy_loader(source, size, data):
+    """Returns a tuple (texture, bytes) for the image file source, made by kivy
+    the same way game2d does it, so kivy's texture cache finds it when a GImage
+    is drawn. If data is not None it is the file's contents, which saves reading
+    the file again.
+
+    The texture is the size of the image file; size only tells the cache how the
+    image is used.
+    """
+    from kivy.core.image import Image as CoreImage
+    from kivy.resources import resource_find
+    _keep_kivy_textures()
+    path = resource_find(source) or image_path(source)
+    if data != None:
+        ext = os.path.splitext(source)[1][1:].lower()
+        image = CoreImage(io.BytesIO(data), ext=ext, filename=path)
+    else:
+        image = CoreImage(path)
+    texture = image.texture
+    return (texture, texture.width*texture.height*4)
+
+
+def kivy_release(source, texture):
+    """Removes the texture of the image file source from kivy's caches, so that
+    the memory is freed once no GImage uses it.
+    """
+    from kivy.cache import Cache
+    from kivy.resources import resource_find
+    path = resource_find(source) or image_path(source)
+    for category in ('kv.texture', 'kv.image'):
+        for mipmap in (0, 1):
+            Cache.remove(category, '%s|%d|%d' % (path, mipmap, 0))
+
+
+#: True once kivy has been told to keep its textures
+_KIVY_KEEPS = False
+
+
+def _keep_kivy_textures():
+    """Helper to kivy_loader.
+    Stops kivy from dropping textures after a minute unused, since this cache
+    decides how long they are kept.
+    """
+    global _KIVY_KEEPS
+    if not _KIVY_KEEPS:
+        from kivy.cache import Cache
+        Cache.register('kv.texture', limit=None, timeout=None)
+        Cache.register('kv.image', limit=None, timeout=None)
+        _KIVY_KEEPS = True
+
+
+def level_images(spec):
+    """Returns a list of the (file, size) tuples used by the LevelSpec spec from
+    planet_levels: its background, start, finish, ship, planets and wormholes.
+    """
+    keys = [(spec.background, (GAME_WIDTH, GAME_HEIGHT)),
+            (START_PIC, (START_WIDTH, START_HEIGHT)),
+            (FINISH_PIC, (FINISH_WIDTH, FINISH_HEIGHT)),
+            (SHIP_IMAGE, (SHIP_WIDTH, SHIP_HEIGHT))]
+    for x, y, m, r, image in spec.planets:
+        keys.append((image, (2*r, 2*r)))
+    if len(spec.wormholes) > 0:
+        keys.append((WORMHOLE, (WORM_D, WORM_D)))
+    result = []
+    for source, size in keys:
+        if (source, _size_key(size)) not in [(s, _size_key(z)) for s, z in result]:
+            result.append((source, size))
+    return result
+
+
+#: the cache used by the game, created by get_textures
+_TEXTURES = None
+
+
+def get_textures():
+    """Returns the game's TextureCache, creating it the first time.
+    """
+    global _TEXTURES
+    if _TEXTURES == None:
+        _TEXTURES = TextureCache()
+    return _TEXTURES
@@ -5,7 +5,15 @@
 from planet_constants import *
 from game2d import *
 from planet_play import *
+from planet_messages import *
+from planet_textures import *
+from planet_replay import *
+from planet_profile import *
+from planet_music import *
+from planet_sim import Simulation
+from planet_ghosts import load_ghosts, save_best
 import random
+import time
 
 
 class Planets(GameApp):
@@ -26,16 +34,29 @@ class Planets(GameApp):
                 the controller for a single game, which manages the paddle, ball, and bricks
         _background [GImage, or None if there is no background to display]
         _last_keys [int>=0]: the number of keys pressed last frame
-        _state  [int between 0 and 6]: TITLE_SCREEN, NEW_GAME, READY, ACTIVE,
-                FAIL, COMPLETE
+        _state  [int between 0 and 7]: TITLE_SCREEN, NEW_GAME, READY, ACTIVE,
+                FAIL, COMPLETE, REPLAY
         _level  [int>=0, <=highest level]: the game's current level, 0 if still at
                 the title screen
         _msgs   [None or list of GLabel objects]: the messages to display on screen
-        _sound  [Sound object or None]: the sound currently playing
-        _stime  [int or float>=0]: amount of time in seconds since the current
-                song started playing
-        _songs  [None or list of Sound objects]: wav files, list of songs to be played,
-                the index corresponds to the level number
+        _music  [Playlist object]: plays the songs in SONGS one after another
+        _clock  [Clock object]: turns frame times into a whole number of physics
+                ticks, so the game runs at the same speed at any frame rate
+        _textures [TextureCache object]: the shared image cache; the images of the
+                next level are read into it during the READY and COMPLETE screens
+        _recorder [Recorder object or None]: records the current run of the level
+        _sim    [Simulation object or None]: runs the ticks of the level on their
+                own thread while ACTIVE, if SIM_THREAD is True
+        _player [ReplayPlayer object or None]: plays back the last run in the
+                REPLAY state
+        _after  [int]: the state (FAIL or COMPLETE) to go back to when the replay
+                ends
+        _profiler [Profiler object or None]: the frame profiler, or None when
+                profiling is off (the P key turns it on and off)
+        _overlay [GLabel object or None]: the profiler's report, drawn on top
+        _otime  [float]: seconds until the overlay text is next updated
+        _show_preview [bool]: True if the trajectory preview is on; PREVIEW_KEY
+                turns it on and off
     """
     
     
@@ -52,12 +73,27 @@ class Planets(GameApp):
         self._state = TITLE_SCREEN
         self._level = 0
         self._msgs = None
-        self._sound = None
-        self._stime = 0.0
+        self._music = Playlist()
+        self._clock = Clock()
+        self._textures = get_textures()
+        self._recorder = None
+        self._sim = None
+        self._player = None
+        self._after = TITLE_SCREEN
+        self._profiler = None
+        self._overlay = None
+        self._otime = 0.0
+        self._show_preview = PREVIEW
+        if PROFILE:
+            self._toggle_profile()
     
     
     def update(self,dt):
         """Animates a single frame in the game."""
+        prof = self._profiler
+        if prof != None:
+            prof.frame(self._state)
+            start = time.perf_counter()
         if self._state == TITLE_SCREEN:
             self._title(dt)
         elif self._state == NEW_GAME:
@@ -70,8 +106,54 @@ class Planets(GameApp):
             self._fail(dt)
         elif self._state == COMPLETE:
             self._complete(dt)
+        elif self._state == REPLAY:
+            self._replay(dt)
+        if prof != None:
+            middle = time.perf_counter()
+            prof.add('update', middle - start)
+        if self._last_keys == 0 and self.input.is_key_down('p'):
+            self._toggle_profile()
+        if self._last_keys == 0 and self.input.is_key_down(PREVIEW_KEY):
+            self._show_preview = not self._show_preview
+            if self._game != None:
+                self._game.set_preview(self._show_preview)
         self._check_keys()
         self._song_timer(dt)
+        if prof != None:
+            prof.add('music', time.perf_counter() - middle)
+            self._update_overlay(dt)
+    
+    
+    def _toggle_profile(self):
+        """Turns the frame profiler and its overlay on, or off. Turning it off
+        writes the profile to PROFILE_DIR as JSON and CSV.
+        """
+        if self._profiler == None:
+            self._profiler = Profiler()
+            self._overlay = GLabel(text='profiling', font_size=14, linecolor=colormodel.WHITE,\
+                                   fillcolor=gray)
+            self._otime = 0.0
+        else:
+            self._profiler.stop()
+            if self._profiler.frames > 0:
+                self._profiler.dump_json(profile_path('.json'))
+                self._profiler.dump_csv(profile_path('.csv'))
+            self._profiler = None
+            self._overlay = None
+        if self._game != None:
+            self._game.set_profiler(self._profiler)
+    
+    
+    def _update_overlay(self, dt):
+        """Helper to the method update.
+        Refreshes the overlay text every PROFILE_OVERLAY seconds.
+        """
+        self._otime -= dt
+        if self._otime <= 0.0:
+            self._otime = PROFILE_OVERLAY
+            self._overlay.text = self._profiler.overlay_text()
+            self._overlay.left = 10
+            self._overlay.top = GAME_HEIGHT - 10
     
     
     def _title(self,dt):
@@ -79,66 +161,44 @@ class Planets(GameApp):
         Manages the game's tasks on the title screen.
         """
         self._game = None
-        self._msgs = [TITLE_1, TITLE_2, TITLE_3, TITLE_4]
-        self._background.source = TITLE_BACKGROUND
+        self._msgs = [TITLE_1, TITLE_2, TITLE_3, title_keys()]
+        self._background.source = asset_source(TITLE_BACKGROUND, (GAME_WIDTH, GAME_HEIGHT))
         if self._last_keys == 0:
-            if self.input.is_key_down('1'):
-                self._level = 1
-                self._state = NEW_GAME
-            elif self.input.is_key_down('2'):
-                self._level = 2
-                self._state = NEW_GAME
-            elif self.input.is_key_down('3'):
-                self._level = 3
-                self._state = NEW_GAME
-            elif self.input.is_key_down('4'):
-                self._level = 4
-                self._state = NEW_GAME
-            elif self.input.is_key_down('5'):
-                self._level = 5
-                self._state = NEW_GAME
-            elif self.input.is_key_down('6'):
-                self._level = 6
-                self._state = NEW_GAME
-            elif self.input.is_key_down('7'):
-                self._level = 7
-                self._state = NEW_GAME
-            elif self.input.is_key_down('8'):
-                self._level = 8
-                self._state = NEW_GAME
-            elif self.input.is_key_down('9'):
-                self._level = 9
-                self._state = NEW_GAME
-            elif self.input.is_key_down('a'):
-                self._level = 10
-                self._state = NEW_GAME
-            elif self.input.is_key_down('b'):
-                self._level = 11
-                self._state = NEW_GAME
-            elif self.input.is_key_down('c'):
-                self._level = 12
-                self._state = NEW_GAME
-            elif self.input.is_key_down('d'):
-                self._level = 13
-                self._state = NEW_GAME
-            elif self.input.is_key_down('x'):
-                self._level = 14
-                self._state = NEW_GAME
-            elif self.input.is_key_down('y'):
-                self._level = 15
-                self._state = NEW_GAME
-            #ADD MORE IF STATEMENTS HERE AFTER ADDING NEW LEVELS!!!
+            registry = get_registry()
+            for level in range(1, len(registry) + 1):
+                if self.input.is_key_down(registry.key(level)):
+                    self._level = level
+                    self._state = NEW_GAME
+                    break
     
     
     def _new_game(self):
-        self._background.source = BACKGROUNDS[self._level]
+        start = time.perf_counter()
+        self._stop_sim()
+        spec = get_registry().spec(self._level)
+        LEVELS.forget(self._level)
+        self._background.source = asset_source(spec.background, (GAME_WIDTH, GAME_HEIGHT))
         self._game = LEVELS[self._level]
+        layers = self._game.build_layers(self._background.source)
+        if GHOSTS:
+            replays, names = load_ghosts(spec.name, self._game.get_integrator())
+            self._game.set_ghosts(replays, names)
+        ship = self._game.build_sprites()
+        if layers != None:
+            self._textures.pin(layers + ship)
+        else:
+            self._textures.pin(asset_images(level_images(spec)) + ship)
         self._game.reset()
+        self._game.set_profiler(self._profiler)
+        self._game.set_preview(self._show_preview)
         self._state = READY
+        if self._profiler != None:
+            self._profiler.add('load', time.perf_counter() - start)
     
     
     def _ready(self,dt):
         self._msgs = [READY_1]
+        self._preload_next()
         if self._last_keys == 0:
             up = self.input.is_key_down('up')
             down = self.input.is_key_down('down')
@@ -147,24 +207,115 @@ class Planets(GameApp):
             space = self.input.is_key_down('spacebar')
             if up or down or right or left or space:
                 self._state = ACTIVE
+                self._clock.reset()
+                self._recorder = Recorder(get_registry().name(self._level), self._game)
+                self._game.set_recorder(self._recorder)
     
     
     def _active(self,dt):
         self._msgs = None
-        self._game.update_ship(self.input)
-        self._game.teleport()
-        if self._game.finish():
-            self._state = COMPLETE
-        elif self._game.planet_collide():
-            self._state = FAIL
+        if self.input.is_key_down(REWIND_KEY):
+            self._rewind(dt)
+            return
+        if SIM_THREAD and self._sim == None:
+            self._sim = Simulation(self._game, input_code(self.input))
+        if self._sim != None:
+            self._sim.code = input_code(self.input)
+            self._end_level(self._sim.outcome)
+            return
+        for i in range(self._clock.ticks(dt)):
+            outcome = self._game.tick(self.input)
+            if outcome != RUNNING:
+                self._end_level(outcome)
+                break
+    
+    
+    def _rewind(self, dt):
+        """Helper to the method _active.
+        Moves the ship back REWIND_SPEED ticks for every tick of dt, while the
+        rewind key is held. The simulation thread, if any, is stopped, and started
+        again when the key is let go.
+        """
+        self._stop_sim()
+        for i in range(self._clock.ticks(dt)):
+            self._game.rewind(REWIND_SPEED)
+    
+    
+    def _stop_sim(self):
+        """Stops the simulation thread, if there is one, and returns True if
+        there was. The ghosts and the rewind buffer are only changed with it
+        stopped, since its ticks change them too.
+        """
+        if self._sim == None:
+            return False
+        self._sim.stop()
+        self._sim = None
+        return True
+    
+    
+    def _end_level(self, outcome):
+        """Helper to the method _active.
+        Goes to the COMPLETE or FAIL screen if outcome is FINISHED or CRASHED, and
+        saves the run. Does nothing if outcome is RUNNING.
+        """
+        if outcome == RUNNING:
+            return
+        if self._stop_sim():
+            self._game.get_ship().sync()
+        self._state = COMPLETE if outcome == FINISHED else FAIL
+        self._end_recording()
+    
+    
+    def _end_recording(self):
+        """Stops recording the run that just ended and saves it as the level's
+        last replay, and as its best if it finished faster than any run before.
+        """
+        self._game.set_recorder(None)
+        replay = self._recorder.replay
+        save_replay(replay, replay_path(replay.level + '-last'))
+        save_best(replay)
+    
+    
+    def _watch(self):
+        """Starts playing back the last run from the FAIL or COMPLETE screen.
+        """
+        self._after = self._state
+        self._player = ReplayPlayer(self._recorder.replay, self._game)
+        self._state = REPLAY
+        self._clock.reset()
+    
+    
+    def _replay(self,dt):
+        """Helper to the method update.
+        Plays the last run at normal speed, then goes back to the screen it was
+        started from. Any key stops it early; the run is then cut to the tick
+        the ship stopped at, so that a rewind from there also cuts it from the
+        right tick.
+        """
+        self._msgs = None
+        for i in range(self._clock.ticks(dt)):
+            outcome = self._player.tick()
+            if outcome != RUNNING or self._player.done():
+                self._state = self._after
+                break
+        if self._last_keys == 0 and self.input.key_count > 0:
+            if not self._player.done():
+                self._recorder.replay.cut(self._player.played())
+            self._state = self._after
     
     
     def _fail(self,dt):
         self._msgs = [FAIL_1,FAIL_2]
-        if self._last_keys == 0:
+        if self.input.is_key_down(REWIND_KEY) and self._game.can_rewind():
+            self._game.set_recorder(self._recorder)
+            self._state = ACTIVE
+            self._clock.reset()
+        elif self._last_keys == 0:
             if self.input.is_key_down('spacebar'):
                 self._state = READY
                 self._game.reset()
+            elif self.input.is_key_down('r'):
+                self._watch()
             elif self.input.is_key_down('m'):
                 self._state = TITLE_SCREEN
                 self._level = 0
@@ -172,19 +323,40 @@ class Planets(GameApp):
     
     def _complete(self,dt):
         self._msgs = [COMPLETE_1,COMPLETE_2]
+        self._preload_next()
         if self._last_keys == 0:
             if self.input.is_key_down('spacebar'):
-                if self._level < MAX_LEVEL:
+                if self._level < len(LEVELS) - 1:
                     self._level += 1
                     self._state = NEW_GAME
                 else:
                     self._level = 0
                     self._state = TITLE_SCREEN
+            elif self.input.is_key_down('r'):
+                self._watch()
             elif self.input.is_key_down('m'):
                 self._level = 0
                 self._state = TITLE_SCREEN
     
     
+    def _preload_next(self):
+        """Starts reading the images of the next level in the background, and
+        decodes a few of those already read. Called every frame of the READY and
+        COMPLETE screens, so that _new_game does not wait for the disk.
+        """
+        if self._level < len(LEVELS) - 1 and self._textures.waiting() == 0:
+            keys = asset_images(level_images(get_registry().spec(self._level + 1)))
+            keys = [k for k in keys if not self._textures.has(k[0], k[1])]
+            if len(keys) > 0:
+                self._textures.preload(keys)
+        if self._profiler != None:
+            start = time.perf_counter()
+            self._textures.pump()
+            self._profiler.add('textures', time.perf_counter() - start)
+        else:
+            self._textures.pump()
+    
+    
     def _check_keys(self):
         """Records the number of keys currently being pressed in the attribute
         _last_keys. Must call this method at the end of every frame."""
@@ -193,27 +365,10 @@ class Planets(GameApp):
     
     
     def _song_timer(self, dt):
-        """Plays the game's music and keeps track of how long each song has been playing.
-        When a song ends, this method begins the next song.
+        """Plays the game's music. The playlist reads the next song in the
+        background and starts it when the current one ends.
         """
-        if self._sound == None:
-            song = SONGS[0]
-            index = SONGS.index(song)
-            self._sound = Sound(song)
-            self._sound.volume = SOUND_VOLUME[index]
-            self._stime = SOUND_LENGTH[index]
-            self._sound.play()
-        else:
-            index = SONGS.index(self._sound.source)
-            self._stime -= dt
-            if self._stime <= 0.0:
-                index += 1
-                if index >= len(SONGS):
-                    index = 0
-                self._sound = Sound(SONGS[index])
-                self._sound.volume = SOUND_VOLUME[index]
-                self._stime = SOUND_LENGTH[index]
-                self._sound.play()
+        self._music.update(dt)
     
     
     def draw(self):
@@ -227,10 +382,22 @@ class Planets(GameApp):
         need to add a draw method to class Play.  We suggest the latter.  See the example 
         subcontroller.py from class.
         """
-        if self._background.source != None:
+        if self._profiler != None:
+            start = time.perf_counter()
+        if self._background.source != None and not (self._game != None and self._game.has_layers()):
             self._background.draw(self.view)
         if self._game != None:
-            self._game.draw(self.view)
+            if not INTERPOLATE:
+                self._game.draw(self.view)
+            elif self._sim != None:
+                self._game.draw(self.view, self._sim.alpha())
+            elif self._state in (ACTIVE, REPLAY):
+                self._game.draw(self.view, self._clock.alpha())
+            else:
+                self._game.draw(self.view, 1.0)
         if self._msgs != None:
             for i in self._msgs:
-                i.draw(self.view)
\ No newline at end of file
+                i.draw(self.view)
+        if self._profiler != None:
+            self._overlay.draw(self.view)
+            self._profiler.add('draw', time.perf_counter() - start)
\ No newline at end of file
@@ -0,0 +1,10 @@
+# conftest.py
+# Zachary Mayle
+# 10/18/26
+
+"""Lets the tests import the game's modules from the folder above."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
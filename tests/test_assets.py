@@ -0,0 +1,27 @@
+# test_assets.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_assets: building some images adds them to the manifest
+without losing the ones built before."""
+
+import os
+import pytest
+import planet_assets
+
+
+def test_build_pairs_merges_manifest(tmp_path, monkeypatch):
+    Image = pytest.importorskip('PIL.Image')
+    images = tmp_path / 'Images'
+    images.mkdir()
+    for name in ('a.png', 'b.png'):
+        Image.new('RGBA', (64, 64), (255, 0, 0, 255)).save(str(images / name))
+    monkeypatch.setattr(planet_assets, 'IMAGE_DIR', str(images))
+    monkeypatch.setattr(planet_assets, 'ASSET_DIR', str(tmp_path / 'Assets'))
+    monkeypatch.setattr(planet_assets, 'ASSET_MANIFEST', str(tmp_path / 'Assets' / 'assets.json'))
+    planet_assets.build([('a.png', (32, 32))])
+    planet_assets.build([('b.png', (16, 16))])
+    manifest = planet_assets.read_manifest(planet_assets.ASSET_MANIFEST)
+    for source, size in [('a.png', (32, 32)), ('b.png', (16, 16))]:
+        entry = manifest[planet_assets.entry_name(source, size)]
+        assert os.path.exists(os.path.join(planet_assets.ASSET_DIR, entry['file']))
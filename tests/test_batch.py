@@ -0,0 +1,76 @@
+# test_batch.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_batch: every ship of a rollout must end exactly where
+planet_physics.run takes it, with every setting."""
+
+import numpy as np
+import pytest
+from planet_constants import *
+from planet_physics import *
+from planet_levels import get_registry
+from planet_batch import rollout
+
+
+def _flights(seed, count, ticks):
+    """Returns a (count, ticks) array of random thrust codes held a few ticks each.
+    """
+    rng = np.random.RandomState(seed)
+    moves = rng.randint(16, size=(count, ticks // 6 + 1))
+    return np.repeat(moves, 6, axis=1)[:, :ticks].astype(np.uint8)
+
+
+def _check(level, codes, **settings):
+    result = rollout(level, codes, **settings)
+    for i in range(len(codes)):
+        outcome, steps, body = run(level, codes[i], None, settings.get('substeps', SUBSTEPS),
+                                   settings.get('method', INTEGRATOR), settings.get('swept', SWEPT))
+        assert (result.outcome[i], result.steps[i]) == (outcome, steps)
+        assert (result.x[i], result.y[i]) == (body.x, body.y)
+
+
+@pytest.mark.parametrize('settings', [{}, {'swept': True}, {'method': VERLET, 'substeps': 2}])
+def test_rollout_matches_run_on_every_level(settings):
+    registry = get_registry()
+    for n in range(1, len(registry) + 1):
+        _check(registry.spec(n).to_level(), _flights(n, 24, 400), **settings)
+
+
+def test_rollout_matches_run_with_many_planets():
+    rng = np.random.RandomState(7)
+    planets = [(rng.uniform(200, 1200), rng.uniform(100, 650), rng.uniform(0, 5), rng.uniform(10, 40))
+               for i in range(12)]
+    level = Level((100, 375), (1300, 375), planets, [((700, 100), (700, 650))])
+    _check(level, _flights(1, 64, 400))
+    _check(level, _flights(2, 64, 400), swept=True)
+
+
+def test_rollout_continues_from_start():
+    level = get_registry().spec(10).to_level()
+    codes = _flights(3, 32, 300)
+    whole = rollout(level, codes)
+    half = rollout(level, codes[:, :150])
+    rest = rollout(level, codes[:, 150:], start=half)
+    for i in range(len(codes)):
+        if half.outcome[i] == RUNNING:
+            assert (rest.outcome[i], rest.x[i], rest.y[i]) == (whole.outcome[i], whole.x[i], whole.y[i])
+        else:
+            assert (half.outcome[i], half.x[i]) == (whole.outcome[i], whole.x[i])
+
+
+def test_swept_rollout_through_wormholes_matches_run():
+    registry = get_registry()
+    for n in range(1, len(registry) + 1):
+        spec = registry.spec(n)
+        if len(spec.wormholes) > 0:
+            _check(spec.to_level(), _flights(n, 48, 600), swept=True)
+
+
+def test_swept_rollout_warping_into_a_planet_matches_run():
+    level = Level((100, 375), (1300, 375), [(1000, 200, 0.0, 60.0)], [((300, 375), (1020, 200))])
+    codes = np.full((1, 60), KEY_RIGHT, dtype=np.uint8)
+    _check(level, codes, swept=True)
+    result = rollout(level, codes, swept=True)
+    assert result.outcome[0] == CRASHED
+    assert (result.x[0], result.y[0]) == (1020.0, 200.0)
@@ -0,0 +1,35 @@
+# test_bench.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_bench: compare reports the paths that got slower, and a
+missing baseline is an error rather than a crash."""
+
+from planet_constants import *
+from planet_bench import *
+
+
+def _results(times):
+    return {'meta': {}, 'results': dict((k, {'us': v, 'best': v}) for k, v in times.items())}
+
+
+def test_compare_reports_regressions():
+    base = _results({'L1/step': 10.0, 'L1/gravity': 4.0, 'L2/step': 10.0})
+    new = _results({'L1/step': 13.0, 'L1/gravity': 2.0, 'L2/step': 11.0, 'L3/step': 99.0})
+    lines, failed = compare(new, base, 0.2)
+    assert failed == 1
+    assert len(lines) == 3
+    assert [l for l in lines if 'REGRESSION' in l][0].startswith('L1/step')
+
+
+def test_shipped_baseline_reads():
+    data = json.load(open(BENCH_BASELINE))
+    assert len(data['results']) > 0
+
+
+def test_missing_baseline_exits_with_status_1(tmp_path, capsys):
+    new = str(tmp_path / 'new.json')
+    with open(new, 'w') as f:
+        json.dump(_results({'L1/step': 1.0}), f)
+    assert main(['compare', new, '--baseline', str(tmp_path / 'none.json')]) == 1
+    assert 'cannot read the baseline' in capsys.readouterr().out
@@ -0,0 +1,52 @@
+# test_env.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_env: a VecEnv steps every environment exactly as a PlanetEnv
+does, and an episode pays out when the ship finishes."""
+
+import numpy as np
+import pytest
+from planet_constants import *
+from planet_levels import get_registry
+from planet_solve import MOVES, solve
+from planet_env import *
+
+
+def test_vec_env_matches_single_envs():
+    registry = get_registry()
+    names = [registry.name(n) for n in (1, 2, 3, 1, 5)]
+    single = [PlanetEnv(name, max_ticks=120) for name in names]
+    vec = VecEnv(names, workers=2, max_ticks=120)
+    try:
+        obs = vec.reset()
+        assert np.array_equal(obs, np.array([env.reset() for env in single]))
+        rng = np.random.RandomState(24)
+        ends = 0
+        for t in range(400):
+            actions = rng.randint(len(ACTIONS), size=len(names))
+            obs, reward, done, outcome = vec.step(actions)
+            for i, env in enumerate(single):
+                want, r, d, info = env.step(actions[i])
+                assert (reward[i], done[i], outcome[i]) == (np.float32(r), d, info['outcome'])
+                if d:
+                    want = env.reset()
+                    ends += 1
+                assert np.array_equal(obs[i], want)
+        assert ends >= len(names)
+    finally:
+        vec.close()
+
+
+def test_solver_flight_earns_finish_reward():
+    registry = get_registry()
+    env = PlanetEnv(registry.name(1))
+    codes = solve(env.level, SOLVE_HOLDS[1], SOLVE_WIDTHS[0])
+    index = dict((int(code), action) for action, code in enumerate(MOVES))
+    total = 0.0
+    for code in codes:
+        obs, reward, done, info = env.step(index[code])
+        total += reward
+    assert done and info == {'outcome': FINISHED, 'ticks': len(codes)}
+    assert total == pytest.approx(ENV_FINISH_REWARD + (len(codes) - 1)*ENV_TICK_REWARD)
+    assert obs.shape == (obs_size(),) and obs[0] == np.float32(env._body.x)
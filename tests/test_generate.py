@@ -0,0 +1,46 @@
+# test_generate.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_generate: a seed always gives the same level, however many
+processes check it, and the level can be finished in its par."""
+
+import multiprocessing
+import os
+import planet_generate
+from planet_constants import *
+from planet_physics import run
+from planet_solve import solve
+
+
+def test_seed_gives_same_finishable_level(tmp_path, monkeypatch):
+    monkeypatch.setattr(planet_generate, 'GEN_DIR', str(tmp_path / 'one'))
+    spec, info = planet_generate.generate(7, workers=1)
+    assert planet_generate.rejected(spec) == None
+    assert planet_generate.layout(7, info['attempt']).to_data() == spec.to_data()
+    assert 0.0 <= info['difficulty'] <= 1.0
+    level = spec.to_level()
+    codes = solve(level, SOLVE_HOLDS[1], SOLVE_WIDTHS[0])
+    assert run(level, codes)[:2] == (FINISHED, info['par'])
+
+    assert planet_generate.load_generated(7)[1] == info
+    monkeypatch.setattr(planet_generate, 'GEN_DIR', str(tmp_path / 'two'))
+    again, again_info = planet_generate.generate(7, workers=3)
+    assert (again.to_data(), again_info) == (spec.to_data(), info)
+
+
+def _save_often(args):
+    """Saves the level of seed args[2] to the folder args[0] a few times."""
+    folder, data, seed = args
+    planet_generate.GEN_DIR = folder
+    spec = planet_generate.parse_level(data, '', 'G%d' % seed)
+    for i in range(20):
+        planet_generate._save(seed, spec, {'par': 1, 'difficulty': 0.0, 'attempt': 0})
+
+
+def test_processes_save_same_seed_together(tmp_path):
+    data = planet_generate.layout(3, 0).to_data()
+    folder = str(tmp_path / 'Generated')
+    with multiprocessing.Pool(4) as pool:
+        pool.map(_save_often, [(folder, data, 3)]*4)
+    assert os.listdir(folder) == ['G3.json']
@@ -0,0 +1,69 @@
+# test_ghosts.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_ghosts: every ghost must fly its replay the way it was
+recorded, and go back exactly when rewound."""
+
+import os
+import random
+from planet_constants import *
+from planet_replay import *
+from planet_ghosts import Ghosts
+
+
+def _replays(name, count):
+    """Returns the golden replay of the level named name followed by count random
+    replays of it, each starting with a piece of the golden one.
+    """
+    golden = load_replay(os.path.join(GOLDEN_DIR, name + '-par.rpl'))
+    codes = golden.codes()
+    rng = random.Random(3)
+    replays = [golden]
+    for i in range(count):
+        replay = Replay(name)
+        for code in codes[:rng.randrange(len(codes))]:
+            replay.add(code)
+        for j in range(rng.randrange(200)):
+            replay.add(rng.choice([0, KEY_UP, KEY_DOWN, KEY_LEFT, KEY_RIGHT]))
+        replays.append(replay)
+    return replays
+
+
+def _level(name):
+    registry = get_registry()
+    return registry.spec(registry.find_name(name)).to_level()
+
+
+def test_ghosts_end_like_their_replays():
+    level = _level('L2')
+    replays = _replays('L2', 12)
+    ghosts = Ghosts(level, replays)
+    while ghosts.tick < max(ghosts.lengths):
+        ghosts.advance()
+    for i in range(len(replays)):
+        outcome, steps, body = play_headless(replays[i], level)
+        assert ghosts.state.outcome[i] == outcome
+        assert (ghosts.state.x[i], ghosts.state.y[i]) == (body.x, body.y)
+
+
+def test_rewind_goes_back_exactly():
+    level = _level('L5')
+    replays = _replays('L5', 6)
+    ghosts = Ghosts(level, replays)
+    seen = []
+    for i in range(60):
+        seen.append((ghosts.state.x.copy(), ghosts.state.y.copy(), ghosts.state.outcome.copy()))
+        ghosts.advance()
+    assert ghosts.rewind(25) == 25
+    assert ghosts.tick == 35
+    x, y, outcome = seen[35]
+    assert (ghosts.state.x == x).all() and (ghosts.state.y == y).all()
+    assert (ghosts.state.outcome == outcome).all()
+    for i in range(25):
+        ghosts.advance()
+    straight = Ghosts(level, replays)
+    for i in range(60):
+        straight.advance()
+    assert ghosts.tick == straight.tick == 60
+    assert (ghosts.state.x == straight.state.x).all() and (ghosts.state.y == straight.state.y).all()
@@ -0,0 +1,39 @@
+# test_grid.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_grid: a level with a spatial grid flies exactly like the same
+level tested against every planet and wormhole."""
+
+import random
+import pytest
+from planet_constants import *
+from planet_physics import *
+
+
+def _crowded_level(rng):
+    """Returns a Level with more than GRID_MIN small planets and three wormhole
+    pairs, all placed at random.
+    """
+    planets = [(rng.uniform(200, 1300), rng.uniform(50, 700), rng.uniform(0.0, 0.3), rng.uniform(8, 30))
+               for i in range(GRID_MIN + 8)]
+    wormholes = [((rng.uniform(200, 1300), rng.uniform(50, 700)), (rng.uniform(200, 1300), rng.uniform(50, 700)))
+                 for i in range(3)]
+    return Level((60, 375), (1340, 375), planets, wormholes)
+
+
+@pytest.mark.parametrize('swept', [False, True])
+def test_grid_matches_full_scan(swept):
+    rng = random.Random(6)
+    for n in range(5):
+        level = _crowded_level(rng)
+        assert level.grid != None
+        for flight in range(20):
+            codes = [rng.choice([0, 1, 2, 4, 8, 5, 9])]*30 + [rng.choice([0, 8, 9, 10])]*400
+            grid = run(level, codes, swept=swept)
+            saved = level.grid
+            level.grid = None
+            full = run(level, codes, swept=swept)
+            level.grid = saved
+            assert grid[:2] == full[:2]
+            assert (grid[2].x, grid[2].y) == (full[2].x, full[2].y)
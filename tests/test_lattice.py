@@ -0,0 +1,27 @@
+# test_lattice.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_lattice: a saved lattice leaves only whole files behind and
+loads back to the same field."""
+
+import os
+import numpy as np
+import planet_lattice
+from planet_kernel import PlanetTable
+
+
+def test_saved_lattice_reloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(planet_lattice, 'LATTICE_DIR', str(tmp_path))
+    table = PlanetTable([(400.0, 300.0, 1.0, 60.0), (1000.0, 500.0, 2.0, 80.0)])
+    made = planet_lattice.GravityLattice(table, step=20.0)
+    names = sorted(os.listdir(str(tmp_path)))
+    assert [os.path.splitext(n)[1] for n in names] == ['.json', '.npy']
+    assert made.path == str(tmp_path / names[1])
+
+    loaded = planet_lattice.GravityLattice(table, step=20.0)
+    assert loaded.report == made.report
+    assert np.array_equal(loaded.ax, made.ax) and np.array_equal(loaded.ay, made.ay)
+    ax, ay = loaded.interpolate([700.0], [100.0])
+    ex, ey = planet_lattice.exact_field(table, [700.0], [100.0])
+    assert abs(ax[0] - ex[0]) + abs(ay[0] - ey[0]) < 0.01*(abs(ex[0]) + abs(ey[0]))
@@ -0,0 +1,42 @@
+# test_layers.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_layers: a layer is the static objects painted in place, and it
+is painted again only when one of them changes."""
+
+import os
+import pytest
+import planet_layers
+from planet_constants import *
+
+
+def test_layers_painted_once_in_place(tmp_path, monkeypatch):
+    Image = pytest.importorskip('PIL.Image')
+    images = tmp_path / 'Images'
+    images.mkdir()
+    for name, color in (('back.png', (0, 0, 255, 255)), ('planet.png', (255, 0, 0, 255)),
+                        ('worm.png', (0, 255, 0, 255))):
+        Image.new('RGBA', (32, 32), color).save(str(images / name))
+    monkeypatch.setattr(planet_layers, 'IMAGE_DIR', str(images))
+    monkeypatch.setattr(planet_layers, 'LAYER_DIR', str(tmp_path / 'Layers'))
+    items = ([('planet.png', 200.0, 600.0, 100.0, 100.0)], [], [], [('worm.png', 1000.0, 100.0, 50.0, 50.0)])
+    bottom, top = planet_layers.layer_files('back.png', items)
+    with Image.open(bottom) as picture:
+        assert picture.size == (GAME_WIDTH, GAME_HEIGHT)
+        assert picture.getpixel((200, GAME_HEIGHT - 600)) == (255, 0, 0, 255)
+        assert picture.getpixel((1000, GAME_HEIGHT - 100)) == (0, 0, 255, 255)
+    with Image.open(top) as picture:
+        assert picture.getpixel((1000, GAME_HEIGHT - 100)) == (0, 255, 0, 255)
+        assert picture.getpixel((200, GAME_HEIGHT - 600))[3] == 0
+
+    painted = []
+    real = planet_layers.paint
+    monkeypatch.setattr(planet_layers, 'paint', lambda i, p: painted.append(p) or real(i, p))
+    assert planet_layers.layer_files('back.png', items) == (bottom, top)
+    assert painted == []
+    path = str(images / 'planet.png')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert planet_layers.layer_files('back.png', items) == (painted[0], top)
+    assert painted[0] != bottom
@@ -0,0 +1,79 @@
+# test_levels.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_levels: the compiled cache is kept while the level files
+keep their times and lengths, and nothing is read on import."""
+
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import pytest
+import planet_levels
+
+
+def _write_levels(folder):
+    """Writes a registry of two levels to folder and returns its path."""
+    for name, y in (('A.json', 300), ('B.json', 400)):
+        level = {'name': name[0], 'background': 'space.jpg', 'start': [50, 50], 'finish': [1350, 700],
+                 'planets': [{'x': 700, 'y': y, 'mass': 1, 'radius': 100, 'image': 'mars.png'}]}
+        (folder / name).write_text(json.dumps(level))
+    registry = folder / 'levels.json'
+    registry.write_text(json.dumps({'levels': [{'key': '1', 'file': 'A.json'}, {'key': '2', 'file': 'B.json'}]}))
+    return str(registry)
+
+
+def test_cache_reused_until_a_file_changes(tmp_path, monkeypatch):
+    registry = _write_levels(tmp_path)
+    cache = str(tmp_path / 'levels.bin')
+    assert planet_levels.LevelRegistry(registry, cache).spec(2).planets[0][1] == 400
+    compiled = []
+    real = planet_levels.compile_levels
+    monkeypatch.setattr(planet_levels, 'compile_levels', lambda r, c: compiled.append(r) or real(r, c))
+    read = []
+    real_read = planet_levels.read_file
+    monkeypatch.setattr(planet_levels, 'read_file', lambda name: read.append(name) or real_read(name))
+    assert len(planet_levels.LevelRegistry(registry, cache)) == 2
+    assert compiled == []
+    assert read == [registry]
+
+    stamp = planet_levels.source_stamp(registry)
+    level = str(tmp_path / 'B.json')
+    with open(level) as f:
+        text = f.read()
+    with open(level, 'w') as f:
+        f.write(text.replace('400', '450'))
+    st = os.stat(level)
+    os.utime(level, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert planet_levels.source_stamp(registry) != stamp
+    assert planet_levels.LevelRegistry(registry, cache).spec(2).planets[0][1] == 450
+    assert compiled == [registry]
+
+
+def _compile_often(paths):
+    """Compiles the registry paths[0] into the cache paths[1] a few times."""
+    for i in range(20):
+        planet_levels.compile_levels(paths[0], paths[1])
+
+
+def test_processes_rebuild_cache_together(tmp_path):
+    registry = _write_levels(tmp_path)
+    cache = str(tmp_path / 'Cache' / 'levels.bin')
+    with multiprocessing.Pool(4) as pool:
+        pool.map(_compile_often, [(registry, cache)]*4)
+    assert os.listdir(str(tmp_path / 'Cache')) == ['levels.bin']
+    assert planet_levels.LevelRegistry(registry, cache).spec(1).planets[0][1] == 300
+
+
+def test_import_makes_no_registry():
+    pytest.importorskip('game2d')
+    code = ('import planets, planet_levels, planet_messages\n'
+            'assert planet_levels._REGISTRY == None\n'
+            'planet_messages.title_keys()\n'
+            'assert planet_levels._REGISTRY != None\n')
+    folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([folder] + sys.path)
+    subprocess.check_call([sys.executable, '-c', code], cwd=folder, env=env)
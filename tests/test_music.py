@@ -0,0 +1,107 @@
+# test_music.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_music: the songs follow one another on time, with the next
+Sound made before the frame that starts it."""
+
+import threading
+import wave
+import planet_music
+
+
+class _Sound(object):
+    """A Sound that only records when it was made and played."""
+
+    def __init__(self, source, log, clock):
+        self.source = source
+        self.volume = 1.0
+        self._log = log
+        self._clock = clock
+        log.append(('make', source, clock()))
+
+    def play(self):
+        self._log.append(('play', self.source, self._clock()))
+
+
+def test_songs_follow_on_time(tmp_path, monkeypatch):
+    for name in ('a.wav', 'b.wav'):
+        with wave.open(str(tmp_path / name), 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(1)
+            f.setframerate(8000)
+            f.writeframes(b'\x80'*8000)
+    monkeypatch.setattr(planet_music, 'SOUND_DIR', str(tmp_path))
+    now = [0.0]
+    clock = lambda: now[0]
+    log = []
+    playlist = planet_music.Playlist(['a.wav', 'b.wav'], [1.0, 0.5], lambda s: _Sound(s, log, clock), clock)
+    dt = 1.0/60.0
+    while now[0] < 2.5:
+        playlist.update(dt)
+        if playlist._thread != None:
+            playlist._thread.join()
+        now[0] += dt
+    plays = [(source, when) for event, source, when in log if event == 'play']
+    assert [source for source, when in plays] == ['a.wav', 'b.wav', 'a.wav']
+    for (source, when), start in zip(plays, (0.0, 1.0, 2.0)):
+        assert abs(when - start) <= 0.5*dt + 1e-9
+    for i in (1, 2):
+        made = [w for e, s, w in log if e == 'make' and s == plays[i][0] and plays[i - 1][1] < w]
+        assert made[0] < plays[i][1]
+
+
+def _songs(folder):
+    """Writes two one-second songs to folder and returns their names."""
+    for name in ('a.wav', 'b.wav'):
+        with wave.open(str(folder / name), 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(1)
+            f.setframerate(8000)
+            f.writeframes(b'\x80'*8000)
+    return ['a.wav', 'b.wav']
+
+
+def test_update_only_makes_first_song(tmp_path, monkeypatch):
+    monkeypatch.setattr(planet_music, 'SOUND_DIR', str(tmp_path))
+    now = [0.0]
+    clock = lambda: now[0]
+    log = []
+    frame = threading.current_thread()
+    release = threading.Event()
+
+    def make(source):
+        if threading.current_thread() != frame:
+            release.wait()
+        made = _Sound(source, log, clock)
+        log.append(('thread', source, threading.current_thread() == frame))
+        return made
+
+    playlist = planet_music.Playlist(_songs(tmp_path), [1.0, 1.0], make, clock)
+    dt = 1.0/60.0
+    while now[0] < 1.5:
+        playlist.update(dt)
+        now[0] += dt
+    # the second song is still being made, so the first one has ended and the
+    # frames went on without it
+    assert [s for e, s, w in log if e == 'play'] == ['a.wav']
+    release.set()
+    playlist._thread.join()
+    playlist.update(dt)
+    while now[0] < 4.5:
+        playlist.update(dt)
+        if playlist._thread != None:
+            playlist._thread.join()
+        now[0] += dt
+    plays = [(s, w) for e, s, w in log if e == 'play']
+    assert [s for s, w in plays] == ['a.wav', 'b.wav', 'a.wav', 'b.wav']
+    assert abs(plays[2][1] - plays[1][1] - 1.0) <= dt
+    on_frame = [s for e, s, mine in log if e == 'thread' and mine]
+    assert on_frame == ['a.wav']
+
+
+def test_warm_file_reads_whole_file(tmp_path):
+    path = tmp_path / 'song.wav'
+    path.write_bytes(b'x'*1000)
+    assert planet_music.warm_file(str(path), 64) == 1000
+    assert planet_music.warm_file(str(tmp_path / 'missing.wav')) == None
@@ -0,0 +1,128 @@
+# test_physics.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_physics: the headless physics must end every run the way the
+original per-frame update in Play did."""
+
+import os
+import random
+import subprocess
+import sys
+import pytest
+from planet_constants import *
+from planet_physics import *
+from planet_levels import get_registry
+
+
+def _original_run(spec, codes):
+    """Returns (outcome, steps) for flying the thrust codes codes through the
+    LevelSpec spec with the update of the original game: move, gravity from
+    each planet, thrust, bounce, then teleport, finish and collide.
+    """
+    x, y = float(spec.start[0]), float(spec.start[1])
+    xv = yv = 0.0
+    tele = spec_tele = False
+    worms = []
+    for a, b in spec.wormholes:
+        worms.append((a, b))
+        worms.append((b, a))
+    for n, code in enumerate(codes):
+        x += xv
+        y += yv
+        for px, py, m, r, image in spec.planets:
+            dx = x - px
+            dy = y - py
+            d = (dx**2.0 + dy**2.0)**0.5
+            force = (G*m*SHIP_MASS)/(d**2.0)
+            xv += -force*(dx/d)/SHIP_MASS
+            yv += -force*(dy/d)/SHIP_MASS
+        angle, ax, ay = THRUST[code]
+        if angle >= 0:
+            xv += ax
+            yv += ay
+        if x < 0 or x > GAME_WIDTH:
+            xv = -xv
+        if y < 0 or y > GAME_HEIGHT:
+            yv = -yv
+        touching = False
+        for (wx, wy), (sx, sy) in worms:
+            warp = ((x - wx)**2.0 + (y - wy)**2.0)**0.5 < 0.5*WORM_D
+            touching = touching or warp
+            if warp and not tele:
+                tele = True
+                x, y = float(sx), float(sy)
+        if not touching:
+            tele = False
+        if abs(x - spec.finish[0]) < 0.5*FINISH_WIDTH and abs(y - spec.finish[1]) < 0.5*FINISH_HEIGHT:
+            return (FINISHED, n + 1)
+        hit = any(((x - px)**2.0 + (y - py)**2.0)**0.5 < r for px, py, m, r, image in spec.planets)
+        if hit or x > GAME_WIDTH or x < 0 or y > GAME_HEIGHT or y < 0:
+            return (CRASHED, n + 1)
+    return (RUNNING, len(codes))
+
+
+def _random_codes(rng, ticks):
+    """Returns ticks random thrust codes, each held for 8 to 32 ticks.
+    """
+    codes = []
+    while len(codes) < ticks:
+        codes.extend([rng.choice([0, 1, 2, 4, 8, 5, 9, 6, 10])]*rng.randint(8, 32))
+    return codes[:ticks]
+
+
+def test_default_step_keeps_original_outcomes():
+    registry = get_registry()
+    rng = random.Random(5)
+    for n in range(1, len(registry) + 1):
+        spec = registry.spec(n)
+        level = spec.to_level()
+        for flight in range(40):
+            codes = _random_codes(rng, 1500)
+            outcome, steps, body = run(level, codes)
+            assert (outcome, steps) == _original_run(spec, codes), (spec.name, flight)
+
+
+def test_swept_catches_tunneling():
+    # a ship moving 350 pixels a tick jumps over a 40 pixel planet unless swept
+    level = Level((100, 375), (1300, 375), [(400, 375, 0.0, 20.0)])
+    body = level.new_body()
+    body.xv = 350.0
+    assert step(level, body, 0, swept=False) == RUNNING
+    body = level.new_body()
+    body.xv = 350.0
+    assert step(level, body, 0, swept=True) == CRASHED
+    assert body.x == pytest.approx(380.0)
+
+
+def test_physics_runs_without_game2d():
+    code = ('import sys\n'
+            'sys.modules["game2d"] = None\n'
+            'from planet_physics import *\n'
+            'level = Level((100, 375), (1300, 375), [(700, 200, 1.0, 50.0)])\n'
+            'outcome, steps, body = run(level, [KEY_RIGHT]*400)\n'
+            'assert outcome != RUNNING and "game2d" not in [m for m in sys.modules if sys.modules[m]]\n')
+    folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.check_call([sys.executable, '-c', code], cwd=folder)
+
+
+@pytest.mark.parametrize('fps', [30, 50, 60, 144])
+def test_clock_runs_same_ticks_at_any_frame_rate(fps):
+    clock = Clock()
+    assert sum(clock.ticks(1.0/fps) for i in range(3*fps)) == 180
+    assert 0.0 <= clock.alpha() < 1.0
+    assert Clock().ticks(1.0) == MAX_TICKS
+
+
+def test_verlet_keeps_orbit_energy():
+    drift = {}
+    for method in (EULER, VERLET):
+        level = Level((100, 375), (1300, 700), [(700, 375, 1.0, 10.0)])
+        body = Body(900.0, 375.0)
+        body.yv = (G/200.0)**0.5
+        start = energy(level, body)
+        drift[method] = 0.0
+        for n in range(2000):
+            assert step(level, body, 0, 1, method) == RUNNING
+            drift[method] = max(drift[method], abs(energy(level, body) - start))
+    assert drift[VERLET] < 1e-5 < drift[EULER]
@@ -0,0 +1,29 @@
+# test_preview.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_preview: the path kept up to date one tick at a time must be
+the path predicted from scratch."""
+
+from planet_constants import *
+from planet_physics import step
+from planet_levels import get_registry
+from planet_preview import Preview
+
+
+def test_incremental_path_matches_full_prediction():
+    registry = get_registry()
+    for n in (1, 5, len(registry)):
+        level = registry.spec(n).to_level()
+        body = level.new_body()
+        kept = Preview(level, steps=120)
+        codes = [KEY_RIGHT]*40 + [KEY_UP]*25 + [0]*60
+        for code in codes:
+            kept.update(body, code)
+            fresh = Preview(level, steps=120)
+            fresh.update(body, code)
+            assert list(kept._states) == list(fresh._states)
+            assert kept.end == fresh.end
+            if step(level, body, code) != RUNNING:
+                break
+        assert kept.recomputed <= 3
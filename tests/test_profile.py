@@ -0,0 +1,106 @@
+# test_profile.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_profile: frames land in the right bins, the physics counters
+are kept per frame, and the slowest frames are kept whole."""
+
+import csv
+import json
+import threading
+import pytest
+import planet_physics
+import planet_profile
+from planet_constants import *
+from planet_physics import Level, run
+
+
+def test_frames_counters_and_worst(tmp_path, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(planet_profile.time, 'perf_counter', lambda: now[0])
+    level = Level((100, 375), (1300, 375), [(700, 200, 1.0, 50.0)])
+    profiler = planet_profile.Profiler()
+    times = [10.0]*20 + [40.0] + [10.0]*20 + [300.0] + [5.0]*(PROFILE_WORST + 5)
+    for ms in times:
+        profiler.frame(ACTIVE)
+        counts = profiler.new_counts()
+        planet_physics.count_into(counts)
+        run(level, [0]*3)
+        planet_physics.count_into(None)
+        run(level, [0]*3)
+        profiler.add('physics', 0.001, counts)
+        now[0] += ms/1000.0
+    profiler.frame(READY)
+    profiler.stop()
+
+    report = profiler.report()
+    active = report['states']['ACTIVE']
+    assert active['frames'] == len(times) == report['frames']
+    assert sum(active['histogram']) == len(times)
+    assert active['histogram'][-1] == 1
+    assert active['worst_ms'] == pytest.approx(300.0)
+    worst = profiler.worst_frames()
+    assert len(worst) == PROFILE_WORST
+    assert [w['ms'] for w in worst[:2]] == pytest.approx([300.0, 40.0])
+    assert worst[0]['counts']['gravity'] == 3 and worst[0]['counts']['collisions'] == 3
+    assert worst[0]['sections']['physics'] == pytest.approx(1.0)
+
+    path = str(tmp_path / 'out' / 'profile.json')
+    profiler.dump_json(path)
+    with open(path) as f:
+        assert json.load(f)['frames'] == len(times)
+    path = str(tmp_path / 'profile.csv')
+    profiler.dump_csv(path)
+    with open(str(tmp_path / 'profile-worst.csv')) as f:
+        rows = list(csv.reader(f))
+    assert len(rows) == PROFILE_WORST + 1 and rows[1][2] == '300.000'
+
+
+
+def test_counts_from_another_thread():
+    level = Level((100, 375), (1300, 375), [(700, 200, 1.0, 50.0)])
+    profiler = planet_profile.Profiler()
+    ticks = 2000
+
+    def simulate():
+        for i in range(ticks):
+            counts = profiler.new_counts()
+            planet_physics.count_into(counts)
+            run(level, [0])
+            planet_physics.count_into(None)
+            profiler.add('physics', 0.0, counts)
+
+    mine = profiler.new_counts()
+    planet_physics.count_into(mine)
+    try:
+        thread = threading.Thread(target=simulate)
+        profiler.frame(ACTIVE)
+        thread.start()
+        seen = 0
+        while thread.is_alive():
+            run(level, [0]*5)
+            profiler.frame(ACTIVE)
+            seen += profiler.last['counts']['collisions']
+        thread.join()
+        profiler.frame(ACTIVE)
+        seen += profiler.last['counts']['collisions']
+    finally:
+        planet_physics.count_into(None)
+    assert seen == ticks
+    assert mine['collisions'] == 5*(profiler.frames - 1)
+
+
+def test_preview_not_counted_as_physics():
+    pytest.importorskip('game2d')
+    from planet_levels import get_registry
+    from planet_play import make_play
+    play = make_play(get_registry().spec(1))
+    play.set_preview(True)
+    profiler = planet_profile.Profiler()
+    play.set_profiler(profiler)
+    for code in [KEY_RIGHT]*5 + [KEY_UP]*5:
+        profiler.frame(ACTIVE)
+        play.advance(code)
+    profiler.frame(ACTIVE)
+    assert profiler.last['counts']['collisions'] == SUBSTEPS
+    assert 'preview' in profiler.last['sections'] and 'physics' in profiler.last['sections']
@@ -0,0 +1,34 @@
+# test_quadtree.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_quadtree: Barnes-Hut gravity is exact with a zero opening
+angle and close to the exact sum with the default one."""
+
+import numpy as np
+from planet_constants import *
+from planet_kernel import PlanetTable
+from planet_quadtree import QuadTree, compare
+from planet_physics import Level
+
+
+def test_tree_close_to_exact_sum():
+    rng = np.random.RandomState(7)
+    n = 2000
+    table = PlanetTable([(x, y, m, 2.0) for x, y, m in
+                         zip(rng.uniform(0, 1400, n), rng.uniform(0, 750, n), rng.uniform(0, 1, n))])
+    x = rng.uniform(0, 1400, 500)
+    y = rng.uniform(0, 750, 500)
+    assert compare(table, QuadTree(table, 0.0), x, y)[0] < 1e-12
+    means = [compare(table, QuadTree(table, theta), x, y)[1] for theta in (0.3, BH_THETA, 1.0)]
+    assert means == sorted(means)
+    assert means[1] < 0.02
+
+
+def test_small_levels_keep_exact_gravity():
+    planets = [(100.0*i, 300.0, 1.0, 10.0) for i in range(1, 11)]
+    level = Level((50, 50), (1350, 700), planets)
+    level.set_theta(BH_THETA)
+    assert level.tree == None
+    level.set_theta(BH_THETA, smallest=5)
+    assert level.tree != None
@@ -0,0 +1,37 @@
+# test_regress.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_regress: the golden replays pass, and --update rewrites a
+replay that no longer matches into one that does."""
+
+import os
+from planet_constants import *
+from planet_replay import *
+from planet_regress import *
+
+
+def test_golden_replays_pass():
+    paths = find_replays(GOLDEN_DIR)
+    assert len(paths) > 0
+    for result in run_all(paths, workers=1):
+        assert result['ok'], result['problem']
+
+
+def test_update_cuts_and_rewrites(tmp_path):
+    path = find_replays(GOLDEN_DIR)[0]
+    replay = load_replay(path)
+    ticks = replay.ticks
+    replay.cut(ticks // 2)
+    replay.outcome = FINISHED
+    replay.final = (0.0, 0.0)
+    for code in [0]*ticks:
+        replay.add(code)
+    stale = str(tmp_path / os.path.basename(path))
+    save_replay(replay, stale)
+    assert not check_replay(stale)['ok']
+    result = check_replay(stale, update=True)
+    assert result['updated']
+    fixed = load_replay(stale)
+    assert fixed.ticks == result['got_steps'] < replay.ticks
+    assert check_replay(stale)['ok']
@@ -0,0 +1,54 @@
+# test_replay.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_replay: the run-length codes and the replay file give back
+every tick, and a replay plays back to the run it recorded."""
+
+import random
+import pytest
+import planet_replay
+from planet_constants import *
+from planet_physics import *
+from planet_replay import *
+
+
+def test_codes_round_trip(tmp_path):
+    rng = random.Random(11)
+    codes = []
+    for length in (1, 2, 15, 16, 17, 142, 143, 144, 20000):
+        codes.extend([rng.choice([0, 1, 2, 4, 8, 5, 6, 9, 10])]*length)
+    replay = Replay('L1')
+    for code in codes:
+        replay.add(code)
+    assert list(replay.codes()) == codes
+    assert replay.ticks == len(codes)
+    assert len(replay.runs) < len(codes) // 100
+    path = str(tmp_path / 'run.rpl')
+    save_replay(replay, path)
+    loaded = load_replay(path)
+    assert list(loaded.codes()) == codes
+    assert (loaded.level, loaded.ticks, loaded.method) == ('L1', len(codes), replay.method)
+
+
+def test_headless_playback_repeats_run(monkeypatch):
+    level = Level((100, 375), (1300, 375), [(700, 300, 1.0, 60.0)], [((400, 600), (900, 150))])
+    rng = random.Random(3)
+    replay = Replay('test')
+    body = level.new_body()
+    outcome = RUNNING
+    while outcome == RUNNING and replay.ticks < 3000:
+        code = rng.choice([0, 1, 2, 4, 8, 9, 10])
+        for i in range(rng.randint(5, 40)):
+            replay.add(code)
+            outcome = step(level, body, code)
+            if outcome != RUNNING:
+                break
+    replay.end(outcome, body)
+    result = play_headless(replay, level)
+    assert result[:2] == (outcome, replay.ticks)
+    assert (result[2].x, result[2].y) == replay.final
+
+    monkeypatch.setattr(planet_replay, 'G', G + 1.0)
+    with pytest.raises(ValueError):
+        play_headless(replay, level)
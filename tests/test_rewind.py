@@ -0,0 +1,57 @@
+# test_rewind.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_rewind: going back through the ring gives the exact earlier
+states, and a rewound recording plays back to where the ship is."""
+
+import pytest
+from planet_constants import *
+from planet_physics import step
+from planet_levels import get_registry
+from planet_rewind import RewindBuffer
+
+
+def _state(body):
+    return (body.x, body.y, body.xv, body.yv, body.angle, body.teleporting)
+
+
+def test_rewind_restores_exact_states():
+    level = get_registry().spec(2).to_level()
+    body = level.new_body()
+    ring = RewindBuffer(50)
+    seen = []
+    for i in range(80):
+        seen.append(_state(body))
+        ring.push(body)
+        step(level, body, KEY_RIGHT if i < 40 else KEY_UP)
+    assert len(ring) == 50
+    assert ring.rewind(body, 20) == 20
+    assert _state(body) == seen[60]
+    assert ring.rewind(body, 100) == 30
+    assert _state(body) == seen[30]
+    assert ring.rewind(body, 1) == 0
+
+
+def test_rewind_after_stopped_replay_cuts_recording():
+    pytest.importorskip('game2d')
+    from planet_play import make_play
+    from planet_replay import Recorder, ReplayPlayer, play_headless
+    spec = get_registry().spec(2)
+    play = make_play(spec)
+    recorder = Recorder(spec.name, play)
+    play.set_recorder(recorder)
+    for i in range(120):
+        play.tick_code(KEY_RIGHT if i < 60 else KEY_DOWN)
+    play.set_recorder(None)
+    player = ReplayPlayer(recorder.replay, play)
+    for i in range(70):
+        player.tick()
+    recorder.replay.cut(player.played())
+    play.set_recorder(recorder)
+    play.rewind(10)
+    play.tick_code(0)
+    assert recorder.replay.ticks == 61
+    outcome, steps, body = play_headless(recorder.replay)
+    ship = play.get_ship().get_body()
+    assert (body.x, body.y) == (ship.x, ship.y)
@@ -0,0 +1,41 @@
+# test_sim.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_sim: the ship is drawn between its last two ticks, and drawn
+where its body is when the ticks run without the game thread."""
+
+import pytest
+from planet_constants import *
+from planet_sim import interpolate
+
+
+def test_interpolate_between_snapshots():
+    prev = (100.0, 200.0, 0, False, False)
+    cur = (110.0, 180.0, 45, True, False)
+    assert interpolate(prev, cur, 0.0) == (100.0, 200.0, 45, True)
+    assert interpolate(prev, cur, 1.0) == cur[:4]
+    assert interpolate(prev, cur, 0.5) == (105.0, 190.0, 45, True)
+    warped = cur[:4] + (True,)
+    assert interpolate(prev, warped, 0.25) == cur[:4]
+
+
+class _View(object):
+    """A view that draws nothing."""
+
+    def draw(self, *args):
+        pass
+
+
+def test_draw_without_alpha_moves_ship_to_last_tick():
+    pytest.importorskip('game2d')
+    from planet_levels import get_registry
+    from planet_play import make_play
+    play = make_play(get_registry().spec(1))
+    for i in range(30):
+        play.advance(KEY_RIGHT)
+    ship = play.get_ship()
+    body = ship.get_body()
+    assert (ship.x, ship.y) != (body.x, body.y)
+    play.draw(_View())
+    assert (ship.x, ship.y) == (body.x, body.y)
@@ -0,0 +1,28 @@
+# test_solve.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_solve: the solver's flights finish their levels, the same in
+a pool as in one process, and save as replays that play back the same way."""
+
+from planet_constants import *
+from planet_physics import run
+from planet_levels import get_registry
+from planet_replay import *
+from planet_solve import *
+
+
+def test_solutions_finish_and_replay():
+    registry = get_registry()
+    names = [registry.name(n) for n in (1, 2)]
+    best = solve_levels(names, widths=(256,), holds=(8, 16), workers=1)
+    pooled = solve_levels(names, widths=(256,), holds=(8, 16), workers=2)
+    for name in names:
+        codes, hold, seconds = best[name]
+        assert pooled[name][:2] == (codes, hold)
+        level = registry.spec(registry.find_name(name)).to_level()
+        assert run(level, codes)[:2] == (FINISHED, len(codes))
+        assert codes == solve(level, hold, 256)
+        replay = make_replay(name, codes)
+        assert (replay.outcome, replay.ticks) == (FINISHED, len(codes))
+        assert play_headless(replay)[:2] == (FINISHED, len(codes))
@@ -0,0 +1,49 @@
+# test_sprites.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_sprites: each heading picks the right frame, and the frames
+hold the ship turned the way a rotated GImage would be."""
+
+import pytest
+import planet_sprites
+from planet_constants import *
+
+
+def test_sprite_frame_rounds_to_nearest_turn():
+    step = 360.0/SHIP_TURNS
+    for turn in range(SHIP_TURNS):
+        assert planet_sprites.sprite_frame(turn*step, False) == turn
+        assert planet_sprites.sprite_frame(turn*step + 0.4*step, True) == SHIP_TURNS + turn
+    assert planet_sprites.sprite_frame(-step, False) == SHIP_TURNS - 1
+    assert planet_sprites.sprite_frame(360.0 - 0.1*step, False) == 0
+
+
+def test_atlas_frames_are_turned(tmp_path, monkeypatch):
+    Image = pytest.importorskip('PIL.Image')
+    images = tmp_path / 'Images'
+    images.mkdir()
+    ship = Image.new('RGBA', (SHIP_WIDTH, SHIP_HEIGHT), (0, 0, 255, 255))
+    ship.paste((255, 0, 0, 255), (SHIP_WIDTH//2, 0, SHIP_WIDTH, SHIP_HEIGHT))
+    ship.save(str(images / SHIP_IMAGE))
+    monkeypatch.setattr(planet_sprites, 'IMAGE_DIR', str(images))
+    monkeypatch.setattr(planet_sprites, 'SPRITE_DIR', str(tmp_path / 'Sprites'))
+    monkeypatch.setattr(planet_sprites, '_ATLASES', {})
+    path, rows, columns, cell = planet_sprites.ship_atlas()
+    assert (rows, columns) == (2, SHIP_TURNS)
+    quarter = SHIP_TURNS//4
+    with Image.open(path) as atlas:
+        assert atlas.size == (cell*SHIP_TURNS, 2*cell)
+        middle = cell//2
+        # facing 0 the red half is on the right; a quarter turn counterclockwise
+        # moves it to the top
+        assert atlas.getpixel((middle + 12, middle)) == (255, 0, 0, 255)
+        assert atlas.getpixel((middle - 12, middle)) == (0, 0, 255, 255)
+        assert atlas.getpixel((quarter*cell + middle, middle - 12)) == (255, 0, 0, 255)
+        assert atlas.getpixel((quarter*cell + middle, middle + 12)) == (0, 0, 255, 255)
+        # without a thrust image, the thrusting row is the same ship
+        assert atlas.getpixel((middle + 12, cell + middle)) == (255, 0, 0, 255)
+
+    ghost = planet_sprites.ship_atlas(GHOST_OPACITY)
+    with Image.open(ghost[0]) as atlas:
+        assert atlas.getpixel((middle + 12, middle))[3] == int(round(255*GHOST_OPACITY))
@@ -0,0 +1,46 @@
+# test_textures.py
+# Zachary Mayle
+# 10/18/26
+
+"""Tests for planet_textures: each file is decoded and counted once, however many
+sizes use it, and is only let go with the last of them."""
+
+from planet_textures import TextureCache
+
+
+class _Loader(object):
+    """Makes a texture for each file that is just its name, costing 100 bytes,
+    and remembers which files were decoded and released."""
+
+    def __init__(self):
+        self.loaded = []
+        self.released = []
+
+    def load(self, source, size, data):
+        self.loaded.append(source)
+        return ('texture of ' + source, 100)
+
+    def release(self, source, texture):
+        self.released.append(source)
+
+
+def test_sizes_share_one_texture():
+    loader = _Loader()
+    cache = TextureCache(1000, loader.load, loader.release)
+    assert cache.get('mars.png', (100, 100)) == cache.get('mars.png', (60, 60))
+    assert loader.loaded == ['mars.png']
+    assert cache.used == 100
+
+
+def test_pinned_size_keeps_file():
+    loader = _Loader()
+    cache = TextureCache(250, loader.load, loader.release)
+    cache.pin([('mars.png', (100, 100))])
+    cache.get('mars.png', (60, 60))
+    cache.get('venus.png', (60, 60))
+    cache.get('earth.png', (60, 60))
+    cache.get('moon.png', (60, 60))
+    assert 'mars.png' not in loader.released
+    assert cache.has('mars.png', (100, 100))
+    assert cache.used <= 250
+    assert loader.released == ['venus.png', 'earth.png']